@@ -1,9 +1,13 @@
+import hashlib
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from ..core.config import settings
 from ..core.security import decode_token
 from ..schemas.user import User, UserRole
+from ..services.dataset_registry import registry
 from ..services.user_service import get_user_by_email
+from ..services.worker_pool import WorkerPool
 
 security = HTTPBearer()
 
@@ -59,7 +63,55 @@ def require_role(allowed_roles: list[UserRole]):
     return role_checker
 
 
+def get_worker_pool(request: Request) -> WorkerPool:
+    """Get the worker pool of the running app (created by its lifespan)."""
+    pool = getattr(request.app.state, "worker_pool", None)
+    if pool is None:
+        raise RuntimeError("Worker pool no iniciado: la app debe correr con su lifespan")
+    return pool
+
+
 # Convenience dependencies
 require_admin = require_role(["admin"])
 require_editor = require_role(["admin", "editor"])
 require_viewer = require_role(["admin", "editor", "viewer"])
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
+
+
+def dataset_etag(*datasets: str):
+    """Dependency for read endpoints: ETag from the loaded data of the datasets and the query.
+
+    A request whose If-None-Match matches is answered with 304 before the
+    endpoint runs. Until every dataset is loaded (or found without source
+    files) no ETag is sent.
+    """
+    async def etag_checker(
+        request: Request,
+        response: Response,
+        current_user: User = Depends(get_current_user),
+    ) -> None:
+        if not settings.ETAG_ENABLED:
+            return
+
+        # La version se reinicia con el proceso: la ETag usa el id de los datos cargados
+        tokens = [registry.token(name) for name in datasets]
+        if not all(tokens):
+            return
+
+        # Parametros vacios y en otro orden dan la misma respuesta
+        query = sorted((key, value) for key, value in request.query_params.multi_items() if value != "")
+        key = repr((request.url.path, query, list(zip(datasets, tokens))))
+        etag = f'W/"{hashlib.sha1(key.encode()).hexdigest()[:20]}"'
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and _etag_matches(if_none_match, etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return etag_checker
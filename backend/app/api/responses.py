@@ -0,0 +1,55 @@
+"""
+Respuesta JSON rapida para los endpoints con payloads grandes.
+
+FastAPI pasa el resultado de cada endpoint por `jsonable_encoder` (o por la
+validacion del `response_model`) antes de serializarlo, recorriendo cada valor
+en Python. Los servicios ya entregan datos listos para JSON, asi que los
+endpoints pesados (listados, /stats, evolucion, resumen del dashboard)
+devuelven `json_response(...)`: el resultado se serializa una sola vez con
+orjson, que soporta numpy y fechas de forma nativa. Sin orjson instalado se
+usa el JSONResponse normal.
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """Encode the pandas/numpy values orjson does not handle by itself."""
+    if value is pd.NaT or value is pd.NA:
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse serialized with orjson (numpy values, dates and non-str keys included)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(content: Any, response: Response) -> FastJSONResponse:
+    """Serialize a service result directly, skipping FastAPI's encoding and response_model validation.
+
+    `response` is the endpoint's `Response` parameter; the headers set on it by
+    the dependencies (ETag) are copied to the new response.
+    """
+    result = FastJSONResponse(content, status_code=response.status_code or 200)
+    result.raw_headers.extend(response.raw_headers)
+    return result
@@ -3,15 +3,17 @@ from ...schemas.user import User, LoginRequest
 from ...schemas.token import Token
 from ...services.user_service import authenticate_user
 from ...core.security import create_access_token
-from ..deps import get_current_user
+from ...services.worker_pool import WorkerPool
+from ..deps import get_current_user, get_worker_pool
 
 router = APIRouter(prefix="/auth", tags=["Autenticacion"])
 
 
 @router.post("/login", response_model=dict)
-async def login(credentials: LoginRequest):
+async def login(credentials: LoginRequest, pool: WorkerPool = Depends(get_worker_pool)):
     """Authenticate user and return access token."""
-    user = authenticate_user(credentials.email, credentials.password)
+    # bcrypt es lento a proposito: no bloquear el event loop
+    user = await pool.run("auth.login", authenticate_user, credentials.email, credentials.password)
 
     if not user:
         raise HTTPException(
@@ -2,7 +2,7 @@
 API endpoints para el modulo de Control de Perdidas (Calidad).
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, Response, HTTPException
 from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
 import pandas as pd
@@ -10,13 +10,20 @@ import io
 from ...schemas.user import User
 from ...services import calidad_service
 from ...utils.excel_formatter import create_formatted_excel, get_column_config_calidad
-from ..deps import get_current_user
+from ...services.worker_pool import WorkerPool
+from ...utils.sort_index import InvalidCursor
+from ..deps import get_current_user, dataset_etag, get_worker_pool
+from ..responses import json_response
 
 router = APIRouter(prefix="/calidad", tags=["Control de Perdidas"])
 
+# ETag por version de los datos: los GET repetidos responden 304 sin recalcular
+etag = Depends(dataset_etag(*calidad_service.STATS_DATASETS))
 
-@router.get("")
+
+@router.get("", dependencies=[etag])
 async def get_calidad(
+    response: Response,
     search: Optional[str] = Query(None, description="Buscar por cliente, nombre, medidor, etc"),
     tipo_sistema: Optional[str] = Query(None, description="Filtrar por tipo (MONOFASICO/TRIFASICO)"),
     tipo_resultado: Optional[str] = Query(None, description="Filtrar por resultado"),
@@ -29,95 +36,116 @@ async def get_calidad(
     limit: int = Query(50, ge=1, le=500, description="Registros por pagina"),
     sort_by: str = Query("id", description="Campo para ordenar"),
     order: str = Query("desc", description="Orden (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la pagina siguiente (next_cursor de la respuesta anterior)"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get paginated list of Control de Perdidas inspections."""
-    return calidad_service.get_calidad_filtered_data(
-        search=search,
-        tipo_sistema=tipo_sistema,
-        tipo_resultado=tipo_resultado,
-        comuna=comuna,
-        contratista=contratista,
-        inspector=inspector,
-        mes=mes,
-        anio=anio,
-        page=page,
-        limit=limit,
-        sort_by=sort_by,
-        order=order,
-    )
+    try:
+        result = await pool.run(
+            "calidad.list", calidad_service.get_calidad_filtered_data,
+            search=search,
+            tipo_sistema=tipo_sistema,
+            tipo_resultado=tipo_resultado,
+            comuna=comuna,
+            contratista=contratista,
+            inspector=inspector,
+            mes=mes,
+            anio=anio,
+            page=page,
+            limit=limit,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result, response)
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[etag])
 async def get_stats(
+    response: Response,
     tipo_sistema: Optional[str] = Query(None, description="Filtrar por tipo sistema"),
     comuna: Optional[str] = Query(None, description="Filtrar por comuna"),
     contratista: Optional[str] = Query(None, description="Filtrar por contratista"),
     mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
     anio: Optional[int] = Query(None, description="Filtrar por año"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """Get aggregated statistics for Control de Perdidas."""
-    return calidad_service.get_calidad_stats(
+    result = await pool.run(
+        "calidad.stats", calidad_service.get_calidad_stats,
         tipo_sistema=tipo_sistema,
         comuna=comuna,
         contratista=contratista,
         mes=mes,
         anio=anio,
     )
+    return json_response(result, response)
 
 
-@router.get("/comunas", response_model=List[str])
+@router.get("/comunas", response_model=List[str], dependencies=[etag])
 async def get_comunas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique comunas."""
-    return calidad_service.get_calidad_comunas()
+    return await pool.run("calidad.comunas", calidad_service.get_calidad_comunas)
 
 
-@router.get("/inspectores", response_model=List[Dict[str, Any]])
+@router.get("/inspectores", response_model=List[Dict[str, Any]], dependencies=[etag])
 async def get_inspectores(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of inspectors with their stats."""
-    return calidad_service.get_calidad_inspectores()
+    return await pool.run("calidad.inspectores", calidad_service.get_calidad_inspectores)
 
 
-@router.get("/contratistas", response_model=List[str])
+@router.get("/contratistas", response_model=List[str], dependencies=[etag])
 async def get_contratistas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique contratistas."""
-    return calidad_service.get_calidad_contratistas()
+    return await pool.run("calidad.contratistas", calidad_service.get_calidad_contratistas)
 
 
-@router.get("/resultados", response_model=List[str])
+@router.get("/resultados", response_model=List[str], dependencies=[etag])
 async def get_resultados(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique resultado types."""
-    return calidad_service.get_calidad_resultados()
+    return await pool.run("calidad.resultados", calidad_service.get_calidad_resultados)
 
 
-@router.get("/periodos")
+@router.get("/periodos", dependencies=[etag])
 async def get_periodos(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, List[int]]:
     """Get available months and years."""
-    return calidad_service.get_calidad_periodos()
+    return await pool.run("calidad.periodos", calidad_service.get_calidad_periodos)
 
 
-@router.get("/evolucion")
+@router.get("/evolucion", dependencies=[etag])
 async def get_evolucion(
+    response: Response,
     tipo_sistema: Optional[str] = Query(None, description="Filtrar por tipo sistema"),
     contratista: Optional[str] = Query(None, description="Filtrar por contratista"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
     """Get monthly evolution of quality metrics."""
-    return calidad_service.get_calidad_evolucion(
+    result = await pool.run(
+        "calidad.evolucion", calidad_service.get_calidad_evolucion,
         tipo_sistema=tipo_sistema,
         contratista=contratista,
     )
+    return json_response(result, response)
 
 
 @router.get("/export")
@@ -131,51 +159,56 @@ async def export_data(
     inspector: Optional[str] = None,
     mes: Optional[int] = None,
     anio: Optional[int] = None,
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Export filtered data to CSV or Excel."""
-    result = calidad_service.get_calidad_filtered_data(
-        search=search,
-        tipo_sistema=tipo_sistema,
-        tipo_resultado=tipo_resultado,
-        comuna=comuna,
-        contratista=contratista,
-        inspector=inspector,
-        mes=mes,
-        anio=anio,
-        page=1,
-        limit=100000,
-    )
-
-    df = pd.DataFrame(result["items"])
-
-    if df.empty:
-        raise HTTPException(status_code=404, detail="No hay datos para exportar")
-
-    if format == "excel":
-        output = create_formatted_excel(
-            df=df,
-            sheet_name="Control Perdidas",
-            title="Informe de Control de Pérdidas",
-            column_config=get_column_config_calidad()
+    # Filtrar y armar el archivo fuera del event loop
+    def build():
+        result = calidad_service.get_calidad_filtered_data(
+            search=search,
+            tipo_sistema=tipo_sistema,
+            tipo_resultado=tipo_resultado,
+            comuna=comuna,
+            contratista=contratista,
+            inspector=inspector,
+            mes=mes,
+            anio=anio,
+            page=1,
+            limit=100000,
         )
 
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": "attachment; filename=control_perdidas.xlsx"
-            }
-        )
-    else:
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
-
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": "attachment; filename=control_perdidas.csv"
-            }
-        )
+        df = pd.DataFrame(result["items"])
+
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No hay datos para exportar")
+
+        if format == "excel":
+            output = create_formatted_excel(
+                df=df,
+                sheet_name="Control Perdidas",
+                title="Informe de Control de Pérdidas",
+                column_config=get_column_config_calidad()
+            )
+
+            return StreamingResponse(
+                output,
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                headers={
+                    "Content-Disposition": "attachment; filename=control_perdidas.xlsx"
+                }
+            )
+        else:
+            output = io.StringIO()
+            df.to_csv(output, index=False)
+            output.seek(0)
+
+            return StreamingResponse(
+                iter([output.getvalue()]),
+                media_type="text/csv",
+                headers={
+                    "Content-Disposition": "attachment; filename=control_perdidas.csv"
+                }
+            )
+
+    return await pool.run("calidad.export", build)
\ No newline at end of file
@@ -2,7 +2,7 @@
 API endpoints para el modulo de Corte y Reposicion.
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, Response, HTTPException
 from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
 import pandas as pd
@@ -10,13 +10,20 @@ import io
 from ...schemas.user import User
 from ...services import corte_service
 from ...utils.excel_formatter import create_formatted_excel, get_column_config_corte
-from ..deps import get_current_user
+from ...services.worker_pool import WorkerPool
+from ...utils.sort_index import InvalidCursor
+from ..deps import get_current_user, dataset_etag, get_worker_pool
+from ..responses import json_response
 
 router = APIRouter(prefix="/corte", tags=["Corte y Reposicion"])
 
+# ETag por version de los datos: los GET repetidos responden 304 sin recalcular
+etag = Depends(dataset_etag("corte"))
 
-@router.get("")
+
+@router.get("", dependencies=[etag])
 async def get_corte(
+    response: Response,
     search: Optional[str] = Query(None, description="Buscar por suministro, nombre, medidor, etc"),
     zona: Optional[str] = Query(None, description="Filtrar por zona"),
     centro_operativo: Optional[str] = Query(None, description="Filtrar por centro operativo"),
@@ -30,38 +37,49 @@ async def get_corte(
     limit: int = Query(50, ge=1, le=500, description="Registros por pagina"),
     sort_by: str = Query("id", description="Campo para ordenar"),
     order: str = Query("desc", description="Orden (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la pagina siguiente (next_cursor de la respuesta anterior)"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get paginated list of Corte y Reposicion inspections."""
-    return corte_service.get_corte_filtered_data(
-        search=search,
-        zona=zona,
-        centro_operativo=centro_operativo,
-        comuna=comuna,
-        inspector=inspector,
-        situacion_encontrada=situacion_encontrada,
-        motivo_multa=motivo_multa,
-        mes=mes,
-        anio=anio,
-        page=page,
-        limit=limit,
-        sort_by=sort_by,
-        order=order,
-    )
+    try:
+        result = await pool.run(
+            "corte.list", corte_service.get_corte_filtered_data,
+            search=search,
+            zona=zona,
+            centro_operativo=centro_operativo,
+            comuna=comuna,
+            inspector=inspector,
+            situacion_encontrada=situacion_encontrada,
+            motivo_multa=motivo_multa,
+            mes=mes,
+            anio=anio,
+            page=page,
+            limit=limit,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result, response)
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[etag])
 async def get_stats(
+    response: Response,
     zona: Optional[str] = Query(None, description="Filtrar por zona"),
     centro_operativo: Optional[str] = Query(None, description="Filtrar por centro operativo"),
     comuna: Optional[str] = Query(None, description="Filtrar por comuna"),
     inspector: Optional[str] = Query(None, description="Filtrar por inspector"),
     mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
     anio: Optional[int] = Query(None, description="Filtrar por anio"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """Get aggregated statistics for Corte y Reposicion."""
-    return corte_service.get_corte_stats(
+    result = await pool.run(
+        "corte.stats", corte_service.get_corte_stats,
         zona=zona,
         centro_operativo=centro_operativo,
         comuna=comuna,
@@ -69,67 +87,78 @@ async def get_stats(
         mes=mes,
         anio=anio,
     )
+    return json_response(result, response)
 
 
-@router.get("/zonas", response_model=List[str])
+@router.get("/zonas", response_model=List[str], dependencies=[etag])
 async def get_zonas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique zonas."""
-    return corte_service.get_corte_zonas()
+    return await pool.run("corte.zonas", corte_service.get_corte_zonas)
 
 
-@router.get("/centros-operativos", response_model=List[str])
+@router.get("/centros-operativos", response_model=List[str], dependencies=[etag])
 async def get_centros_operativos(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique centros operativos."""
-    return corte_service.get_corte_centros_operativos()
+    return await pool.run("corte.centros_operativos", corte_service.get_corte_centros_operativos)
 
 
-@router.get("/comunas", response_model=List[str])
+@router.get("/comunas", response_model=List[str], dependencies=[etag])
 async def get_comunas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique comunas."""
-    return corte_service.get_corte_comunas()
+    return await pool.run("corte.comunas", corte_service.get_corte_comunas)
 
 
-@router.get("/inspectores", response_model=List[Dict[str, Any]])
+@router.get("/inspectores", response_model=List[Dict[str, Any]], dependencies=[etag])
 async def get_inspectores(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of inspectors with their stats."""
-    return corte_service.get_corte_inspectores()
+    return await pool.run("corte.inspectores", corte_service.get_corte_inspectores)
 
 
-@router.get("/situaciones", response_model=List[str])
+@router.get("/situaciones", response_model=List[str], dependencies=[etag])
 async def get_situaciones(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique situacion_encontrada values."""
-    return corte_service.get_corte_situaciones()
+    return await pool.run("corte.situaciones", corte_service.get_corte_situaciones)
 
 
-@router.get("/periodos")
+@router.get("/periodos", dependencies=[etag])
 async def get_periodos(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, List[int]]:
     """Get available months and years."""
-    return corte_service.get_corte_periodos()
+    return await pool.run("corte.periodos", corte_service.get_corte_periodos)
 
 
-@router.get("/evolucion")
+@router.get("/evolucion", dependencies=[etag])
 async def get_evolucion(
+    response: Response,
     zona: Optional[str] = Query(None, description="Filtrar por zona"),
     centro_operativo: Optional[str] = Query(None, description="Filtrar por centro operativo"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> List[Dict[str, Any]]:
     """Get monthly evolution of corte metrics."""
-    return corte_service.get_corte_evolucion(
+    result = await pool.run(
+        "corte.evolucion", corte_service.get_corte_evolucion,
         zona=zona,
         centro_operativo=centro_operativo,
     )
+    return json_response(result, response)
 
 
 @router.get("/export")
@@ -144,52 +173,57 @@ async def export_data(
     motivo_multa: Optional[str] = None,
     mes: Optional[int] = None,
     anio: Optional[int] = None,
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Export filtered data to CSV or Excel."""
-    result = corte_service.get_corte_filtered_data(
-        search=search,
-        zona=zona,
-        centro_operativo=centro_operativo,
-        comuna=comuna,
-        inspector=inspector,
-        situacion_encontrada=situacion_encontrada,
-        motivo_multa=motivo_multa,
-        mes=mes,
-        anio=anio,
-        page=1,
-        limit=100000,
-    )
-
-    df = pd.DataFrame(result["items"])
-
-    if df.empty:
-        raise HTTPException(status_code=404, detail="No hay datos para exportar")
-
-    if format == "excel":
-        output = create_formatted_excel(
-            df=df,
-            sheet_name="Corte y Reposicion",
-            title="Informe de Corte y Reposición",
-            column_config=get_column_config_corte()
+    # Filtrar y armar el archivo fuera del event loop
+    def build():
+        result = corte_service.get_corte_filtered_data(
+            search=search,
+            zona=zona,
+            centro_operativo=centro_operativo,
+            comuna=comuna,
+            inspector=inspector,
+            situacion_encontrada=situacion_encontrada,
+            motivo_multa=motivo_multa,
+            mes=mes,
+            anio=anio,
+            page=1,
+            limit=100000,
         )
 
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": "attachment; filename=corte_reposicion.xlsx"
-            }
-        )
-    else:
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
-
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": "attachment; filename=corte_reposicion.csv"
-            }
-        )
+        df = pd.DataFrame(result["items"])
+
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No hay datos para exportar")
+
+        if format == "excel":
+            output = create_formatted_excel(
+                df=df,
+                sheet_name="Corte y Reposicion",
+                title="Informe de Corte y Reposición",
+                column_config=get_column_config_corte()
+            )
+
+            return StreamingResponse(
+                output,
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                headers={
+                    "Content-Disposition": "attachment; filename=corte_reposicion.xlsx"
+                }
+            )
+        else:
+            output = io.StringIO()
+            df.to_csv(output, index=False)
+            output.seek(0)
+
+            return StreamingResponse(
+                iter([output.getvalue()]),
+                media_type="text/csv",
+                headers={
+                    "Content-Disposition": "attachment; filename=corte_reposicion.csv"
+                }
+            )
+
+    return await pool.run("corte.export", build)
\ No newline at end of file
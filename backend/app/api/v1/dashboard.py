@@ -3,13 +3,19 @@ API endpoints para el Dashboard principal.
 Proporciona un resumen de todos los modulos.
 """
 
-from fastapi import APIRouter, Depends
-from typing import Dict, Any
+from fastapi import APIRouter, Depends, Response
+from typing import Dict, Any, List
+import asyncio
 import os
 from datetime import datetime
+from ...core.config import settings
 from ...schemas.user import User
 from ...services import data_service, lecturas_service, teleco_service, calidad_service, corte_service
-from ..deps import get_current_user
+from ...services.dataset_registry import registry
+from ...services.result_cache import stats_cache
+from ...services.worker_pool import WorkerPool
+from ..deps import get_current_user, dataset_etag, get_worker_pool
+from ..responses import json_response
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
 
@@ -25,30 +31,60 @@ def get_file_update_time(filepath: str) -> str:
     return None
 
 
-@router.get("/summary")
+# Datasets que leen los cinco resumenes: otros datasets no cambian la respuesta
+SUMMARY_DATASETS = ["nncc", "lecturas", "teleco", *calidad_service.STATS_DATASETS, "corte"]
+
+
+def _load_summary_datasets() -> None:
+    for name in SUMMARY_DATASETS:
+        registry.get(name)
+
+
+@router.get("/summary", dependencies=[Depends(dataset_etag(*SUMMARY_DATASETS))])
 async def get_dashboard_summary(
+    response: Response,
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
-    """Get summary statistics for all modules."""
+    """Get summary statistics for all modules (cached per dataset versions)."""
+    versions = tuple(registry.version(name) for name in SUMMARY_DATASETS)
+    if not all(versions):
+        # Cargar antes de armar la clave: lo que queda en version 0 es un
+        # dataset sin archivos fuente, y su resumen vacio tambien se guarda
+        await pool.run("dashboard.load", _load_summary_datasets)
+        versions = tuple(registry.version(name) for name in SUMMARY_DATASETS)
+
+    key = ("dashboard_summary", (), versions)
+    if settings.STATS_CACHE_ENABLED:
+        summary = stats_cache.get(key)
+        if summary is not None:
+            return json_response(summary, response)
+
+    summary = await _build_dashboard_summary(pool)
 
-    base_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-        "data"
+    # Solo se guarda si ningun dataset cambio mientras se armaba
+    after = tuple(registry.version(name) for name in SUMMARY_DATASETS)
+    if settings.STATS_CACHE_ENABLED and after == versions:
+        stats_cache.put(key, summary, tuple(SUMMARY_DATASETS))
+    return json_response(summary, response)
+
+
+async def _build_dashboard_summary(pool: WorkerPool) -> Dict[str, Any]:
+    """Compute the KPIs of the five modules concurrently in the worker pool."""
+    # Un nombre por modulo: el limite por endpoint no los serializa
+    nncc_stats, lecturas_stats, teleco_stats, calidad_stats, corte_stats = await asyncio.gather(
+        pool.run("dashboard.nncc", data_service.get_summary),
+        pool.run("dashboard.lecturas", lecturas_service.get_lecturas_summary),
+        pool.run("dashboard.teleco", teleco_service.get_teleco_summary),
+        pool.run("dashboard.calidad", calidad_service.get_calidad_summary),
+        pool.run("dashboard.corte", corte_service.get_corte_summary),
     )
 
-    # === NNCC Stats ===
-    nncc_stats = data_service.get_stats()
-    nncc_csv_path = os.path.join(base_path, "2025-05 INFORME NNCC (2024-2029) DIC 2025.csv")
-    nncc_updated = get_file_update_time(nncc_csv_path)
-
-    # === Lecturas Stats ===
-    lecturas_stats = lecturas_service.get_lecturas_stats()
-    lecturas_files = [
-        os.path.join(base_path, "informe_lectura_ORDENES_ORDENES.csv"),
-        os.path.join(base_path, "informe_lectura_SEC_SEC.csv"),
-        os.path.join(base_path, "informe_lectura_VIRTUAL_VIRTUAL VISIT.csv"),
-        os.path.join(base_path, "informe_lectura_VIRTUAL_VISITA VIRTUAL.csv"),
-    ]
+    # === NNCC ===
+    nncc_updated = get_file_update_time(data_service.get_source_files()[0])
+
+    # === Lecturas ===
+    lecturas_files = lecturas_service.get_lecturas_source_files()
     # Get most recent update time
     lecturas_updated = None
     for f in lecturas_files:
@@ -56,27 +92,19 @@ async def get_dashboard_summary(
         if t and (lecturas_updated is None or t > lecturas_updated):
             lecturas_updated = t
 
-    # === Teleco Stats ===
-    teleco_stats = teleco_service.get_teleco_stats()
-    teleco_csv_path = os.path.join(base_path, "informe_teleco.csv")
-    teleco_updated = get_file_update_time(teleco_csv_path)
-
-    # === Control de Perdidas Stats ===
-    calidad_stats = calidad_service.get_calidad_stats()
-    calidad_files = [
-        os.path.join(base_path, "informe_calidad_mono_BASE.csv"),
-        os.path.join(base_path, "informe_calidad_tri_BASE.csv"),
-    ]
+    # === Teleco ===
+    teleco_updated = get_file_update_time(teleco_service.get_teleco_source_files()[0])
+
+    # === Control de Perdidas ===
+    calidad_files = calidad_service.get_calidad_source_files(include_inspecciones=False)
     calidad_updated = None
     for f in calidad_files:
         t = get_file_update_time(f)
         if t and (calidad_updated is None or t > calidad_updated):
             calidad_updated = t
 
-    # === Corte y Reposicion Stats ===
-    corte_stats = corte_service.get_corte_stats()
-    corte_csv_path = os.path.join(base_path, "informe_corte.csv")
-    corte_updated = get_file_update_time(corte_csv_path)
+    # === Corte y Reposicion ===
+    corte_updated = get_file_update_time(corte_service.get_corte_source_files()[0])
 
     # === Build Response ===
     return {
@@ -170,3 +198,28 @@ async def get_dashboard_summary(
             ]),
         }
     }
+
+
+@router.get("/datasets")
+async def get_datasets_info(
+    current_user: User = Depends(get_current_user),
+) -> List[Dict[str, Any]]:
+    """Get load status, version, load time and memory of every dataset."""
+    return registry.info()
+
+
+@router.get("/cache")
+async def get_cache_info(
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Get size and hit/miss counters of the stats result cache."""
+    return stats_cache.info()
+
+
+@router.get("/workers")
+async def get_workers_info(
+    pool: WorkerPool = Depends(get_worker_pool),
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Get pool size and per-endpoint concurrency, queue and run time counters."""
+    return pool.info()
@@ -2,7 +2,7 @@
 API endpoints para el modulo de Lecturas.
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, Response, HTTPException
 from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
 import pandas as pd
@@ -10,13 +10,20 @@ import io
 from ...schemas.user import User
 from ...services import lecturas_service
 from ...utils.excel_formatter import create_formatted_excel, get_column_config_lecturas
-from ..deps import get_current_user
+from ...services.worker_pool import WorkerPool
+from ...utils.sort_index import InvalidCursor
+from ..deps import get_current_user, dataset_etag, get_worker_pool
+from ..responses import json_response
 
 router = APIRouter(prefix="/lecturas", tags=["Lecturas"])
 
+# ETag por version de los datos: los GET repetidos responden 304 sin recalcular
+etag = Depends(dataset_etag("lecturas"))
 
-@router.get("")
+
+@router.get("", dependencies=[etag])
 async def get_lecturas(
+    response: Response,
     search: Optional[str] = Query(None, description="Buscar por cliente, nombre, orden, etc"),
     sector: Optional[str] = Query(None, description="Filtrar por sector (ORIENTE/PONIENTE)"),
     inspector: Optional[str] = Query(None, description="Filtrar por inspector"),
@@ -32,87 +39,143 @@ async def get_lecturas(
     limit: int = Query(50, ge=1, le=500, description="Registros por pagina"),
     sort_by: str = Query("fecha_ingreso", description="Campo para ordenar"),
     order: str = Query("desc", description="Orden (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la pagina siguiente (next_cursor de la respuesta anterior)"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get paginated list of Lecturas with filters."""
-    return lecturas_service.get_lecturas_filtered_data(
-        search=search,
+    try:
+        result = await pool.run(
+            "lecturas.list", lecturas_service.get_lecturas_filtered_data,
+            search=search,
+            sector=sector,
+            inspector=inspector,
+            estado_plazo=estado_plazo,
+            hallazgo=hallazgo,
+            origen=origen,
+            comuna=comuna,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            mes=mes,
+            anio=anio,
+            page=page,
+            limit=limit,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result, response)
+
+
+def _check_dias(dias: int) -> None:
+    if dias not in lecturas_service.EVOLUCION_DIAS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"dias debe ser uno de {lecturas_service.EVOLUCION_DIAS}",
+        )
+
+
+@router.get("/stats", dependencies=[etag])
+async def get_stats(
+    response: Response,
+    sector: Optional[str] = Query(None, description="Filtrar por sector"),
+    origen: Optional[str] = Query(None, description="Filtrar por origen (ORDENES/SEC)"),
+    fecha_desde: Optional[str] = Query(None, description="Fecha desde (YYYY-MM-DD)"),
+    fecha_hasta: Optional[str] = Query(None, description="Fecha hasta (YYYY-MM-DD)"),
+    mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
+    anio: Optional[int] = Query(None, description="Filtrar por año"),
+    dias: int = Query(30, description="Ventana de la evolucion diaria (7, 30, 90 o 365 dias)"),
+    pool: WorkerPool = Depends(get_worker_pool),
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Get aggregated statistics for Lecturas."""
+    _check_dias(dias)
+    result = await pool.run(
+        "lecturas.stats", lecturas_service.get_lecturas_stats,
         sector=sector,
-        inspector=inspector,
-        estado_plazo=estado_plazo,
-        hallazgo=hallazgo,
         origen=origen,
-        comuna=comuna,
         fecha_desde=fecha_desde,
         fecha_hasta=fecha_hasta,
         mes=mes,
         anio=anio,
-        page=page,
-        limit=limit,
-        sort_by=sort_by,
-        order=order,
+        dias=dias,
     )
+    return json_response(result, response)
 
 
-@router.get("/stats")
-async def get_stats(
+@router.get("/evolucion", dependencies=[etag])
+async def get_evolucion(
+    response: Response,
     sector: Optional[str] = Query(None, description="Filtrar por sector"),
     origen: Optional[str] = Query(None, description="Filtrar por origen (ORDENES/SEC)"),
     fecha_desde: Optional[str] = Query(None, description="Fecha desde (YYYY-MM-DD)"),
     fecha_hasta: Optional[str] = Query(None, description="Fecha hasta (YYYY-MM-DD)"),
     mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
     anio: Optional[int] = Query(None, description="Filtrar por año"),
+    dias: int = Query(30, description="Ventana en dias (7, 30, 90 o 365)"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
-) -> Dict[str, Any]:
-    """Get aggregated statistics for Lecturas."""
-    return lecturas_service.get_lecturas_stats(
+) -> List[Dict[str, Any]]:
+    """Get daily evolution of Lecturas orders."""
+    _check_dias(dias)
+    result = await pool.run(
+        "lecturas.evolucion", lecturas_service.get_lecturas_evolucion,
         sector=sector,
         origen=origen,
         fecha_desde=fecha_desde,
         fecha_hasta=fecha_hasta,
         mes=mes,
         anio=anio,
+        dias=dias,
     )
+    return json_response(result, response)
 
 
-@router.get("/sectores", response_model=List[str])
+@router.get("/sectores", response_model=List[str], dependencies=[etag])
 async def get_sectores(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique sectores."""
-    return lecturas_service.get_lecturas_sectores()
+    return await pool.run("lecturas.sectores", lecturas_service.get_lecturas_sectores)
 
 
-@router.get("/inspectors", response_model=List[Dict[str, Any]])
+@router.get("/inspectors", response_model=List[Dict[str, Any]], dependencies=[etag])
 async def get_inspectors(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of inspectors with their stats."""
-    return lecturas_service.get_lecturas_inspectors()
+    return await pool.run("lecturas.inspectors", lecturas_service.get_lecturas_inspectors)
 
 
-@router.get("/hallazgos", response_model=List[str])
+@router.get("/hallazgos", response_model=List[str], dependencies=[etag])
 async def get_hallazgos(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique hallazgos."""
-    return lecturas_service.get_lecturas_hallazgos()
+    return await pool.run("lecturas.hallazgos", lecturas_service.get_lecturas_hallazgos)
 
 
-@router.get("/comunas", response_model=List[str])
+@router.get("/comunas", response_model=List[str], dependencies=[etag])
 async def get_comunas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique comunas."""
-    return lecturas_service.get_lecturas_comunas()
+    return await pool.run("lecturas.comunas", lecturas_service.get_lecturas_comunas)
 
 
-@router.get("/periodos")
+@router.get("/periodos", dependencies=[etag])
 async def get_periodos(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, List[int]]:
     """Get available months and years."""
-    return lecturas_service.get_lecturas_periodos()
+    return await pool.run("lecturas.periodos", lecturas_service.get_lecturas_periodos)
 
 
 @router.get("/export")
@@ -127,52 +190,57 @@ async def export_data(
     fecha_hasta: Optional[str] = Query(None, description="Fecha hasta (YYYY-MM-DD)"),
     mes: Optional[int] = None,
     anio: Optional[int] = None,
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Export filtered data to CSV or Excel."""
-    result = lecturas_service.get_lecturas_filtered_data(
-        search=search,
-        sector=sector,
-        inspector=inspector,
-        hallazgo=hallazgo,
-        origen=origen,
-        fecha_desde=fecha_desde,
-        fecha_hasta=fecha_hasta,
-        mes=mes,
-        anio=anio,
-        page=1,
-        limit=100000,
-    )
-
-    df = pd.DataFrame(result["items"])
-
-    if df.empty:
-        raise HTTPException(status_code=404, detail="No hay datos para exportar")
-
-    if format == "excel":
-        output = create_formatted_excel(
-            df=df,
-            sheet_name="Lecturas",
-            title="Informe de Lecturas",
-            column_config=get_column_config_lecturas()
+    # Filtrar y armar el archivo fuera del event loop
+    def build():
+        result = lecturas_service.get_lecturas_filtered_data(
+            search=search,
+            sector=sector,
+            inspector=inspector,
+            hallazgo=hallazgo,
+            origen=origen,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            mes=mes,
+            anio=anio,
+            page=1,
+            limit=100000,
         )
 
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": "attachment; filename=lecturas.xlsx"
-            }
-        )
-    else:
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
-
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": "attachment; filename=lecturas.csv"
-            }
-        )
+        df = pd.DataFrame(result["items"])
+
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No hay datos para exportar")
+
+        if format == "excel":
+            output = create_formatted_excel(
+                df=df,
+                sheet_name="Lecturas",
+                title="Informe de Lecturas",
+                column_config=get_column_config_lecturas()
+            )
+
+            return StreamingResponse(
+                output,
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                headers={
+                    "Content-Disposition": "attachment; filename=lecturas.xlsx"
+                }
+            )
+        else:
+            output = io.StringIO()
+            df.to_csv(output, index=False)
+            output.seek(0)
+
+            return StreamingResponse(
+                iter([output.getvalue()]),
+                media_type="text/csv",
+                headers={
+                    "Content-Disposition": "attachment; filename=lecturas.csv"
+                }
+            )
+
+    return await pool.run("lecturas.export", build)
\ No newline at end of file
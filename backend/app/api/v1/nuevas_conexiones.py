@@ -1,19 +1,30 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, Query, Response, HTTPException, UploadFile, File
 from fastapi.responses import StreamingResponse
+import anyio
 from typing import Optional, List, Dict, Any
 import pandas as pd
 import io
 from ...schemas.user import User
 from ...schemas.nuevas_conexiones import PaginatedResponse, InspeccionesStats
-from ...services import data_service
+from ...services import data_service, upload_service
 from ...utils.excel_formatter import create_formatted_excel, get_column_config_nncc
-from ..deps import get_current_user, require_editor
+from ...services.worker_pool import WorkerPool
+from ...utils.sort_index import InvalidCursor
+from ..deps import get_current_user, require_editor, dataset_etag, get_worker_pool
+from ..responses import json_response
 
 router = APIRouter(prefix="/nuevas-conexiones", tags=["Informe NNCC"])
 
+# ETag por version de los datos: los GET repetidos responden 304 sin recalcular
+etag = Depends(dataset_etag("nncc"))
 
-@router.get("", response_model=PaginatedResponse)
+# Tamano de los bloques al recibir un archivo (1 MB)
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+@router.get("", response_model=PaginatedResponse, dependencies=[etag])
 async def get_inspecciones(
+    response: Response,
     search: Optional[str] = Query(None, description="Buscar por cliente, comuna, inspector, etc"),
     zona: Optional[str] = Query(None, description="Filtrar por zona"),
     inspector: Optional[str] = Query(None, description="Filtrar por inspector"),
@@ -28,39 +39,50 @@ async def get_inspecciones(
     limit: int = Query(50, ge=1, le=500, description="Registros por pagina"),
     sort_by: str = Query("fecha_inspeccion", description="Campo para ordenar"),
     order: str = Query("desc", description="Orden (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la pagina siguiente (next_cursor de la respuesta anterior)"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get paginated list of NNCC inspections with filters."""
-    return data_service.get_filtered_data(
-        search=search,
-        zona=zona,
-        inspector=inspector,
-        estado=estado,
-        comuna=comuna,
-        base=base,
-        fecha_desde=fecha_desde,
-        fecha_hasta=fecha_hasta,
-        mes=mes,
-        anio=anio,
-        page=page,
-        limit=limit,
-        sort_by=sort_by,
-        order=order,
-    )
+    try:
+        result = await pool.run(
+            "nncc.list", data_service.get_filtered_data,
+            search=search,
+            zona=zona,
+            inspector=inspector,
+            estado=estado,
+            comuna=comuna,
+            base=base,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            mes=mes,
+            anio=anio,
+            page=page,
+            limit=limit,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result, response)
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[etag])
 async def get_stats(
+    response: Response,
     zona: Optional[str] = Query(None, description="Filtrar por zona"),
     base: Optional[str] = Query(None, description="Filtrar por base/periodo"),
     fecha_desde: Optional[str] = Query(None, description="Fecha desde (YYYY-MM-DD)"),
     fecha_hasta: Optional[str] = Query(None, description="Fecha hasta (YYYY-MM-DD)"),
     mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
     anio: Optional[int] = Query(None, description="Filtrar por año"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """Get aggregated statistics for NNCC inspections with optional filters."""
-    return data_service.get_stats(
+    result = await pool.run(
+        "nncc.stats", data_service.get_stats,
         zona=zona,
         base=base,
         fecha_desde=fecha_desde,
@@ -68,46 +90,79 @@ async def get_stats(
         mes=mes,
         anio=anio,
     )
+    return json_response(result, response)
 
 
-@router.get("/comunas", response_model=List[str])
+@router.get("/comunas", response_model=List[str], dependencies=[etag])
 async def get_comunas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique comunas."""
-    return data_service.get_comunas()
+    return await pool.run("nncc.comunas", data_service.get_comunas)
 
 
-@router.get("/zonas", response_model=List[str])
+@router.get("/comunas/ranking", response_model=List[Dict[str, Any]], dependencies=[etag])
+async def get_comunas_ranking(
+    zona: Optional[str] = Query(None, description="Filtrar por zona"),
+    base: Optional[str] = Query(None, description="Filtrar por base/periodo"),
+    fecha_desde: Optional[str] = Query(None, description="Fecha desde (YYYY-MM-DD)"),
+    fecha_hasta: Optional[str] = Query(None, description="Fecha hasta (YYYY-MM-DD)"),
+    mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
+    anio: Optional[int] = Query(None, description="Filtrar por año"),
+    limit: Optional[int] = Query(None, ge=1, description="Cantidad maxima de comunas"),
+    min_total: int = Query(5, ge=1, description="Minimo de inspecciones para incluir una comuna"),
+    pool: WorkerPool = Depends(get_worker_pool),
+    current_user: User = Depends(get_current_user),
+):
+    """Get comunas ranked by problems (mal ejecutados, disconformes, no cumple norma)."""
+    return await pool.run(
+        "nncc.comunas_ranking", data_service.get_comunas_ranking,
+        zona=zona,
+        base=base,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+        mes=mes,
+        anio=anio,
+        limit=limit,
+        min_total=min_total,
+    )
+
+
+@router.get("/zonas", response_model=List[str], dependencies=[etag])
 async def get_zonas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique zonas."""
-    return data_service.get_zonas()
+    return await pool.run("nncc.zonas", data_service.get_zonas)
 
 
-@router.get("/inspectors", response_model=List[Dict[str, Any]])
+@router.get("/inspectors", response_model=List[Dict[str, Any]], dependencies=[etag])
 async def get_inspectors(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of inspectors with their stats."""
-    return data_service.get_inspectors()
+    return await pool.run("nncc.inspectors", data_service.get_inspectors)
 
 
-@router.get("/bases", response_model=List[str])
+@router.get("/bases", response_model=List[str], dependencies=[etag])
 async def get_bases(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique bases."""
-    return data_service.get_bases()
+    return await pool.run("nncc.bases", data_service.get_bases)
 
 
-@router.get("/periodos")
+@router.get("/periodos", dependencies=[etag])
 async def get_periodos(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, List[int]]:
     """Get available months and years."""
-    return data_service.get_periodos()
+    return await pool.run("nncc.periodos", data_service.get_periodos)
 
 
 @router.get("/export")
@@ -122,64 +177,76 @@ async def export_data(
     fecha_hasta: Optional[str] = Query(None, description="Fecha hasta (YYYY-MM-DD)"),
     mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
     anio: Optional[int] = Query(None, description="Filtrar por año"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Export filtered data to CSV or Excel."""
-    # Get all filtered data (no pagination for export)
-    result = data_service.get_filtered_data(
-        search=search,
-        zona=zona,
-        inspector=inspector,
-        estado=estado,
-        base=base,
-        fecha_desde=fecha_desde,
-        fecha_hasta=fecha_hasta,
-        mes=mes,
-        anio=anio,
-        page=1,
-        limit=100000,  # Large limit for export
-    )
+    # Filtrar y armar el archivo fuera del event loop
+    def build():
+        # Get all filtered data (no pagination for export)
+        result = data_service.get_filtered_data(
+            search=search,
+            zona=zona,
+            inspector=inspector,
+            estado=estado,
+            base=base,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            mes=mes,
+            anio=anio,
+            page=1,
+            limit=100000,  # Large limit for export
+        )
 
-    df = pd.DataFrame(result["items"])
+        df = pd.DataFrame(result["items"])
 
-    if df.empty:
-        raise HTTPException(status_code=404, detail="No hay datos para exportar")
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No hay datos para exportar")
 
-    if format == "excel":
-        output = create_formatted_excel(
-            df=df,
-            sheet_name="Informe NNCC",
-            title="Informe de Nuevas Conexiones",
-            column_config=get_column_config_nncc()
-        )
+        if format == "excel":
+            output = create_formatted_excel(
+                df=df,
+                sheet_name="Informe NNCC",
+                title="Informe de Nuevas Conexiones",
+                column_config=get_column_config_nncc()
+            )
 
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": "attachment; filename=informe_nncc.xlsx"
-            }
-        )
-    else:
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
-
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": "attachment; filename=informe_nncc.csv"
-            }
-        )
+            return StreamingResponse(
+                output,
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                headers={
+                    "Content-Disposition": "attachment; filename=informe_nncc.xlsx"
+                }
+            )
+        else:
+            output = io.StringIO()
+            df.to_csv(output, index=False)
+            output.seek(0)
+
+            return StreamingResponse(
+                iter([output.getvalue()]),
+                media_type="text/csv",
+                headers={
+                    "Content-Disposition": "attachment; filename=informe_nncc.csv"
+                }
+            )
 
+    return await pool.run("nncc.export", build)
 
-@router.post("/upload")
+
+@router.post("/upload", status_code=202)
 async def upload_file(
     file: UploadFile = File(...),
     current_user: User = Depends(require_editor),
 ):
-    """Upload Excel/CSV file to update data (editor or admin only)."""
+    """
+    Upload Excel/CSV file to update data (editor or admin only).
+
+    Starlette ya dejo el archivo completo en un temporal (en memoria o en disco);
+    aqui se copia por bloques al directorio de cargas, sin tenerlo entero en
+    memoria, y se procesa en segundo plano. El estado se consulta en
+    GET /upload/{job_id}.
+    """
     if not file.filename:
         raise HTTPException(status_code=400, detail="No se proporciono archivo")
 
@@ -192,26 +259,45 @@ async def upload_file(
             detail=f"Formato no soportado. Use: {', '.join(allowed_extensions)}"
         )
 
-    try:
-        contents = await file.read()
-
-        if file_ext == '.csv':
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            df = pd.read_excel(io.BytesIO(contents))
-
-        # Reload data cache
-        data_service.load_data(force_reload=True)
-
-        return {
-            "message": "Archivo procesado exitosamente",
-            "filename": file.filename,
-            "rows": len(df),
-            "columns": len(df.columns)
-        }
+    job = upload_service.create_job(file.filename, file_ext)
+    job_id = job["job_id"]
 
+    try:
+        received = 0
+        # Abrir, escribir y cerrar en threads: nada de I/O de disco en el event loop
+        async with await anyio.open_file(upload_service.get_job_path(job_id), 'wb') as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                await out.write(chunk)
+                received += len(chunk)
+                upload_service.update_job(job_id, bytes_received=received)
     except Exception as e:
+        upload_service.fail_job(job_id, f"Error al recibir archivo: {str(e)}")
         raise HTTPException(
             status_code=500,
-            detail=f"Error al procesar archivo: {str(e)}"
+            detail=f"Error al recibir archivo: {str(e)}"
         )
+
+    upload_service.submit_job(job_id)
+
+    return {
+        "message": "Archivo recibido, procesando en segundo plano",
+        "job_id": job_id,
+        "status": "queued",
+        "filename": file.filename,
+        "bytes_received": received,
+    }
+
+
+@router.get("/upload/{job_id}")
+async def get_upload_status(
+    job_id: str,
+    current_user: User = Depends(require_editor),
+):
+    """Get the processing status of an uploaded file."""
+    job = upload_service.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Carga no encontrada")
+    return job
@@ -2,7 +2,7 @@
 API endpoints para el modulo de Telecomunicaciones.
 """
 
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, Response, HTTPException
 from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
 import pandas as pd
@@ -10,13 +10,20 @@ import io
 from ...schemas.user import User
 from ...services import teleco_service
 from ...utils.excel_formatter import create_formatted_excel, get_column_config_teleco
-from ..deps import get_current_user
+from ...services.worker_pool import WorkerPool
+from ...utils.sort_index import InvalidCursor
+from ..deps import get_current_user, dataset_etag, get_worker_pool
+from ..responses import json_response
 
 router = APIRouter(prefix="/teleco", tags=["Telecomunicaciones"])
 
+# ETag por version de los datos: los GET repetidos responden 304 sin recalcular
+etag = Depends(dataset_etag("teleco"))
 
-@router.get("")
+
+@router.get("", dependencies=[etag])
 async def get_teleco(
+    response: Response,
     search: Optional[str] = Query(None, description="Buscar por empresa, comuna, etc"),
     empresa: Optional[str] = Query(None, description="Filtrar por empresa"),
     comuna: Optional[str] = Query(None, description="Filtrar por comuna"),
@@ -31,39 +38,50 @@ async def get_teleco(
     limit: int = Query(50, ge=1, le=500, description="Registros por pagina"),
     sort_by: str = Query("fecha_inspeccion", description="Campo para ordenar"),
     order: str = Query("desc", description="Orden (asc/desc)"),
+    cursor: Optional[str] = Query(None, description="Cursor de la pagina siguiente (next_cursor de la respuesta anterior)"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get paginated list of Telecomunicaciones with filters."""
-    return teleco_service.get_teleco_filtered_data(
-        search=search,
-        empresa=empresa,
-        comuna=comuna,
-        inspector=inspector,
-        resultado=resultado,
-        tiene_plano=tiene_plano,
-        fecha_desde=fecha_desde,
-        fecha_hasta=fecha_hasta,
-        mes=mes,
-        anio=anio,
-        page=page,
-        limit=limit,
-        sort_by=sort_by,
-        order=order,
-    )
+    try:
+        result = await pool.run(
+            "teleco.list", teleco_service.get_teleco_filtered_data,
+            search=search,
+            empresa=empresa,
+            comuna=comuna,
+            inspector=inspector,
+            resultado=resultado,
+            tiene_plano=tiene_plano,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            mes=mes,
+            anio=anio,
+            page=page,
+            limit=limit,
+            sort_by=sort_by,
+            order=order,
+            cursor=cursor,
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return json_response(result, response)
 
 
-@router.get("/stats")
+@router.get("/stats", dependencies=[etag])
 async def get_stats(
+    response: Response,
     empresa: Optional[str] = Query(None, description="Filtrar por empresa"),
     comuna: Optional[str] = Query(None, description="Filtrar por comuna"),
     fecha_desde: Optional[str] = Query(None, description="Fecha desde (YYYY-MM-DD)"),
     fecha_hasta: Optional[str] = Query(None, description="Fecha hasta (YYYY-MM-DD)"),
     mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
     anio: Optional[int] = Query(None, description="Filtrar por año"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, Any]:
     """Get aggregated statistics for Telecomunicaciones."""
-    return teleco_service.get_teleco_stats(
+    result = await pool.run(
+        "teleco.stats", teleco_service.get_teleco_stats,
         empresa=empresa,
         comuna=comuna,
         fecha_desde=fecha_desde,
@@ -71,38 +89,43 @@ async def get_stats(
         mes=mes,
         anio=anio,
     )
+    return json_response(result, response)
 
 
-@router.get("/empresas", response_model=List[str])
+@router.get("/empresas", response_model=List[str], dependencies=[etag])
 async def get_empresas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique empresas."""
-    return teleco_service.get_teleco_empresas()
+    return await pool.run("teleco.empresas", teleco_service.get_teleco_empresas)
 
 
-@router.get("/comunas", response_model=List[str])
+@router.get("/comunas", response_model=List[str], dependencies=[etag])
 async def get_comunas(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of unique comunas."""
-    return teleco_service.get_teleco_comunas()
+    return await pool.run("teleco.comunas", teleco_service.get_teleco_comunas)
 
 
-@router.get("/inspectors", response_model=List[Dict[str, Any]])
+@router.get("/inspectors", response_model=List[Dict[str, Any]], dependencies=[etag])
 async def get_inspectors(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Get list of inspectors with their stats."""
-    return teleco_service.get_teleco_inspectors()
+    return await pool.run("teleco.inspectors", teleco_service.get_teleco_inspectors)
 
 
-@router.get("/periodos")
+@router.get("/periodos", dependencies=[etag])
 async def get_periodos(
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ) -> Dict[str, List[int]]:
     """Get available months and years."""
-    return teleco_service.get_teleco_periodos()
+    return await pool.run("teleco.periodos", teleco_service.get_teleco_periodos)
 
 
 @router.get("/export")
@@ -117,52 +140,57 @@ async def export_data(
     fecha_hasta: Optional[str] = Query(None, description="Fecha hasta (YYYY-MM-DD)"),
     mes: Optional[int] = Query(None, description="Filtrar por mes (1-12)"),
     anio: Optional[int] = Query(None, description="Filtrar por año"),
+    pool: WorkerPool = Depends(get_worker_pool),
     current_user: User = Depends(get_current_user),
 ):
     """Export filtered data to CSV or Excel."""
-    result = teleco_service.get_teleco_filtered_data(
-        search=search,
-        empresa=empresa,
-        comuna=comuna,
-        resultado=resultado,
-        tiene_plano=tiene_plano,
-        fecha_desde=fecha_desde,
-        fecha_hasta=fecha_hasta,
-        mes=mes,
-        anio=anio,
-        page=1,
-        limit=100000,
-    )
-
-    df = pd.DataFrame(result["items"])
-
-    if df.empty:
-        raise HTTPException(status_code=404, detail="No hay datos para exportar")
-
-    if format == "excel":
-        output = create_formatted_excel(
-            df=df,
-            sheet_name="Telecomunicaciones",
-            title="Informe de Telecomunicaciones",
-            column_config=get_column_config_teleco()
+    # Filtrar y armar el archivo fuera del event loop
+    def build():
+        result = teleco_service.get_teleco_filtered_data(
+            search=search,
+            empresa=empresa,
+            comuna=comuna,
+            resultado=resultado,
+            tiene_plano=tiene_plano,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            mes=mes,
+            anio=anio,
+            page=1,
+            limit=100000,
         )
 
-        return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": "attachment; filename=telecomunicaciones.xlsx"
-            }
-        )
-    else:
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
-
-        return StreamingResponse(
-            iter([output.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": "attachment; filename=telecomunicaciones.csv"
-            }
-        )
+        df = pd.DataFrame(result["items"])
+
+        if df.empty:
+            raise HTTPException(status_code=404, detail="No hay datos para exportar")
+
+        if format == "excel":
+            output = create_formatted_excel(
+                df=df,
+                sheet_name="Telecomunicaciones",
+                title="Informe de Telecomunicaciones",
+                column_config=get_column_config_teleco()
+            )
+
+            return StreamingResponse(
+                output,
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                headers={
+                    "Content-Disposition": "attachment; filename=telecomunicaciones.xlsx"
+                }
+            )
+        else:
+            output = io.StringIO()
+            df.to_csv(output, index=False)
+            output.seek(0)
+
+            return StreamingResponse(
+                iter([output.getvalue()]),
+                media_type="text/csv",
+                headers={
+                    "Content-Disposition": "attachment; filename=telecomunicaciones.csv"
+                }
+            )
+
+    return await pool.run("teleco.export", build)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 import os
 
 
@@ -17,8 +17,55 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://127.0.0.1:3000"]
 
-    # Data paths
-    DATA_DIR: str = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
+    # Data paths (carpeta data/ en la raiz del repositorio)
+    DATA_DIR: str = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+        "data"
+    )
+
+    # Snapshots Parquet de los datos normalizados (por defecto en <data>/.snapshots)
+    SNAPSHOT_ENABLED: bool = True
+    SNAPSHOT_DIR: Optional[str] = None
+
+    # Archivos subidos pendientes de procesar (por defecto en <data>/.uploads)
+    UPLOAD_DIR: Optional[str] = None
+
+    # Recarga incremental: si un CSV solo crecio al final, se normalizan solo las filas nuevas
+    INCREMENTAL_RELOAD_ENABLED: bool = True
+
+    # Carga de todos los datasets en paralelo al iniciar la app
+    PREWARM_ENABLED: bool = True
+    PREWARM_WORKERS: int = 4
+
+    # Reglas (patrones) de los motivos de rechazo de Telecomunicaciones
+    TELECO_MOTIVOS_FILE: str = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "teleco_motivos_rechazo.json"
+    )
+
+    # Cache LRU de los resultados de /stats (tamano maximo en bytes)
+    STATS_CACHE_ENABLED: bool = True
+    STATS_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # ETag en los endpoints de lectura (version de los datasets + query); If-None-Match -> 304
+    ETAG_ENABLED: bool = True
+
+    # Compresion de las respuestas (brotli si esta instalado y el cliente lo acepta, si no gzip)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    GZIP_LEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+
+    # Pool de threads para el trabajo de pandas de los endpoints (no bloquea el event loop).
+    # Limite de llamadas simultaneas por endpoint; WORKER_ENDPOINT_LIMITS lo cambia por
+    # endpoint ("lecturas.export") o por accion ("export")
+    WORKER_POOL_ENABLED: bool = True
+    WORKER_POOL_SIZE: int = 4
+    WORKER_ENDPOINT_LIMIT: int = 2
+    WORKER_ENDPOINT_LIMITS: Dict[str, int] = {"export": 1}
+
+    # Recarga automatica cuando cambian los CSV de data/ (segundos entre revisiones)
+    DATA_WATCH_ENABLED: bool = True
+    DATA_WATCH_INTERVAL: float = 30.0
 
     class Config:
         env_file = ".env"
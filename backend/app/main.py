@@ -1,7 +1,32 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from .core.config import settings
+from .api.compression import CompressionMiddleware
 from .api.v1.router import api_router
+from .services.data_watcher import data_watcher
+from .services.dataset_registry import registry
+from .services.worker_pool import create_worker_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Un pool por lifespan: el executor y los semaforos no sobreviven al event loop
+    app.state.worker_pool = create_worker_pool()
+
+    # Cargar los datasets en segundo plano; /health responde "not ready" hasta que terminen
+    if settings.PREWARM_ENABLED:
+        registry.start_prewarm(max_workers=settings.PREWARM_WORKERS)
+    else:
+        registry.mark_ready()
+
+    if settings.DATA_WATCH_ENABLED:
+        data_watcher.start()
+    yield
+    data_watcher.stop()
+    app.state.worker_pool.shutdown()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
@@ -9,6 +34,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -20,6 +46,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compresion gzip/brotli segun Accept-Encoding
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+    )
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
@@ -35,4 +70,7 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    datasets = {info["name"]: info["loaded"] for info in registry.info()}
+    if not registry.is_ready():
+        return JSONResponse(status_code=503, content={"status": "not ready", "datasets": datasets})
+    return {"status": "healthy", "datasets": datasets}
@@ -51,6 +51,7 @@ class PaginatedResponse(BaseModel):
     page: int
     limit: int
     pages: int
+    next_cursor: Optional[str] = None
 
 
 class InspectorStats(BaseModel):
@@ -8,110 +8,166 @@ import numpy as np
 import os
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-
-# Global dataframe caches
-_df_calidad_mono_cache: Optional[pd.DataFrame] = None
-_df_calidad_tri_cache: Optional[pd.DataFrame] = None
-_df_inspecciones_mono_cache: Optional[pd.DataFrame] = None
-_df_inspecciones_tri_cache: Optional[pd.DataFrame] = None
+from ..utils.snapshot import read_snapshot, write_snapshot
+from ..utils.append_ingest import read_appended, apply_appended, source_layout
+from ..utils.source_files import resolve_source, read_source
+from ..core.config import settings
+from ..utils.categorical import to_categorical, match_contains, count_values
+from ..utils.filter_index import filter_mask
+from ..utils.search_index import get_search_index
+from ..utils.group_metrics import group_metrics, rate
+from ..utils.records import frame_records
+from ..utils.sort_index import paginate, warm_on_change
+from .dataset_registry import registry
+from .result_cache import cached_stats
+
+# Columnas de baja cardinalidad que se guardan como categoricas
+CATEGORICAL_COLUMNS = [
+    'tipo_sistema', 'tipo_resultado', 'estado_suministro', 'estado_propiedad',
+    'comuna', 'inspector', 'contratista', 'giro', 'modelo_corresponde',
+    'medidor_corresponde', 'perno_normalizado', 'estado_acometida', 'estado_caja',
+    'estado_tapa',
+]
+
+# Columnas donde busca el parametro `search` (indice invertido)
+SEARCH_COLUMNS = ['cliente', 'nombre_cliente', 'direccion', 'comuna', 'medidor', 'inspector']
+
+# Columnas con filtros de igualdad (indice bitmap)
+FILTER_COLUMNS = ['tipo_sistema', 'comuna', 'contratista', 'mes', 'anio']
+
+# Claves de get_calidad_stats que muestra el resumen del dashboard
+SUMMARY_KEYS = [
+    'total_solicitadas', 'total_ejecutadas', 'pendientes', 'tasa_ejecucion', 'monofasico', 'trifasico',
+    'por_resultado', 'por_contratista', 'anomalias',
+]
+
+# Datasets que leen las estadisticas y los listados (para el cache de /stats y
+# la ETag). Incluye la BASE combinada: se rehace despues de que mono o tri
+# cambian de version, y un resultado calculado en medio no debe quedar con la
+# clave de las versiones nuevas
+STATS_DATASETS = ["calidad_mono", "calidad_tri", "inspecciones_mono", "inspecciones_tri", "calidad"]
+
+# Dataset -> archivo fuente
+CALIDAD_FILENAMES = {
+    "calidad_mono": "informe_calidad_mono_BASE.csv",
+    "calidad_tri": "informe_calidad_tri_BASE.csv",
+    "inspecciones_mono": "informe_calidad_mono_INSPECCIONES.csv",
+    "inspecciones_tri": "informe_calidad_tri_INSPECCIONES.csv",
+}
 
 
 def get_data_path() -> str:
     """Get the data directory path."""
-    return os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-        "data"
-    )
-
-
-def load_calidad_mono(force_reload: bool = False) -> pd.DataFrame:
-    """Load BASE monofasico data."""
-    global _df_calidad_mono_cache
+    return settings.DATA_DIR
 
-    if _df_calidad_mono_cache is not None and not force_reload:
-        return _df_calidad_mono_cache
 
-    path = os.path.join(get_data_path(), "informe_calidad_mono_BASE.csv")
+def get_calidad_source_file(name: str) -> str:
+    """Get the source file path of a Control de Perdidas dataset."""
+    return resolve_source(os.path.join(get_data_path(), CALIDAD_FILENAMES[name]))
 
-    if not os.path.exists(path):
-        print(f"File not found: {path}")
-        return pd.DataFrame()
 
-    df = pd.read_csv(path, encoding='utf-8', low_memory=False)
-    df['tipo_sistema'] = 'MONOFASICO'
-    df['id'] = range(1, len(df) + 1)
+def get_calidad_source_files(include_inspecciones: bool = True) -> List[str]:
+    """Get the source CSV paths for Control de Perdidas."""
+    names = ["calidad_mono", "calidad_tri"]
+    if include_inspecciones:
+        names += ["inspecciones_mono", "inspecciones_tri"]
+    return [get_calidad_source_file(name) for name in names]
 
-    # Normalizar columnas
-    df = normalize_columns(df)
 
-    _df_calidad_mono_cache = df
-    print(f"Loaded Calidad Mono BASE: {len(df)} records")
-    return df
+def load_calidad_mono(force_reload: bool = False) -> pd.DataFrame:
+    """Load BASE monofasico data."""
+    return registry.get("calidad_mono", force_reload=force_reload)
 
 
 def load_calidad_tri(force_reload: bool = False) -> pd.DataFrame:
     """Load BASE trifasico data."""
-    global _df_calidad_tri_cache
+    return registry.get("calidad_tri", force_reload=force_reload)
+
+
+def load_inspecciones_mono(force_reload: bool = False) -> pd.DataFrame:
+    """Load inspecciones monofasico data."""
+    return registry.get("inspecciones_mono", force_reload=force_reload)
+
 
-    if _df_calidad_tri_cache is not None and not force_reload:
-        return _df_calidad_tri_cache
+def load_inspecciones_tri(force_reload: bool = False) -> pd.DataFrame:
+    """Load inspecciones trifasico data."""
+    return registry.get("inspecciones_tri", force_reload=force_reload)
 
-    path = os.path.join(get_data_path(), "informe_calidad_tri_BASE.csv")
+
+def _read_base(name: str, tipo_sistema: str, label: str) -> pd.DataFrame:
+    """Read and normalize a BASE CSV (or its snapshot)."""
+    path = get_calidad_source_file(name)
 
     if not os.path.exists(path):
         print(f"File not found: {path}")
         return pd.DataFrame()
 
-    df = pd.read_csv(path, encoding='utf-8', low_memory=False)
-    df['tipo_sistema'] = 'TRIFASICO'
-    df['id'] = range(1, len(df) + 1)
+    snapshot = read_snapshot(name, [path])
+    if snapshot is not None:
+        return snapshot
 
-    # Normalizar columnas
-    df = normalize_columns(df)
+    normalize = lambda frames: _normalize_base(frames[0], tipo_sistema)
+
+    # Si el CSV solo crecio, normalizar solo las filas nuevas
+    current = registry.current(name)
+    appended = read_appended(name, [path], current, encoding='utf-8', low_memory=False)
+    if appended is not None:
+        return apply_appended(name, [path], appended, current, normalize, 'id')
+
+    frames = [read_source(path, encoding='utf-8', low_memory=False)]
+    layout = source_layout(frames)
+    df = normalize(frames)
 
-    _df_calidad_tri_cache = df
-    print(f"Loaded Calidad Tri BASE: {len(df)} records")
+    df = write_snapshot(name, [path], df, layout)
+    print(f"Loaded Calidad {label} BASE: {len(df)} records")
     return df
 
 
-def load_inspecciones_mono(force_reload: bool = False) -> pd.DataFrame:
-    """Load inspecciones monofasico data."""
-    global _df_inspecciones_mono_cache
+def _normalize_base(df: pd.DataFrame, tipo_sistema: str) -> pd.DataFrame:
+    """Normalize a raw BASE CSV."""
+    df['tipo_sistema'] = tipo_sistema
+    df['id'] = range(1, len(df) + 1)
+
+    # Normalizar columnas
+    return normalize_columns(df)
 
-    if _df_inspecciones_mono_cache is not None and not force_reload:
-        return _df_inspecciones_mono_cache
 
-    path = os.path.join(get_data_path(), "informe_calidad_mono_INSPECCIONES.csv")
+def _read_inspecciones(name: str, tipo_sistema: str, label: str) -> pd.DataFrame:
+    """Read an INSPECCIONES CSV (or its snapshot)."""
+    path = get_calidad_source_file(name)
 
     if not os.path.exists(path):
         return pd.DataFrame()
 
-    df = pd.read_csv(path, encoding='utf-8', low_memory=False)
-    df['tipo_sistema'] = 'MONOFASICO'
+    snapshot = read_snapshot(name, [path])
+    if snapshot is not None:
+        return snapshot
 
-    _df_inspecciones_mono_cache = df
-    print(f"Loaded Inspecciones Mono: {len(df)} records")
-    return df
+    normalize = lambda frames: frames[0].assign(tipo_sistema=tipo_sistema)
 
+    # Si el CSV solo crecio, leer solo las filas nuevas
+    current = registry.current(name)
+    appended = read_appended(name, [path], current, encoding='utf-8', low_memory=False)
+    if appended is not None:
+        return apply_appended(name, [path], appended, current, normalize)
 
-def load_inspecciones_tri(force_reload: bool = False) -> pd.DataFrame:
-    """Load inspecciones trifasico data."""
-    global _df_inspecciones_tri_cache
+    frames = [read_source(path, encoding='utf-8', low_memory=False)]
+    layout = source_layout(frames)
+    df = normalize(frames)
 
-    if _df_inspecciones_tri_cache is not None and not force_reload:
-        return _df_inspecciones_tri_cache
+    df = write_snapshot(name, [path], df, layout)
+    print(f"Loaded Inspecciones {label}: {len(df)} records")
+    return df
 
-    path = os.path.join(get_data_path(), "informe_calidad_tri_INSPECCIONES.csv")
 
-    if not os.path.exists(path):
-        return pd.DataFrame()
+def _source_files(name: str):
+    return lambda: [get_calidad_source_file(name)]
 
-    df = pd.read_csv(path, encoding='utf-8', low_memory=False)
-    df['tipo_sistema'] = 'TRIFASICO'
 
-    _df_inspecciones_tri_cache = df
-    print(f"Loaded Inspecciones Tri: {len(df)} records")
-    return df
+registry.register("calidad_mono", lambda: _read_base("calidad_mono", "MONOFASICO", "Mono"), _source_files("calidad_mono"))
+registry.register("calidad_tri", lambda: _read_base("calidad_tri", "TRIFASICO", "Tri"), _source_files("calidad_tri"))
+registry.register("inspecciones_mono", lambda: _read_inspecciones("inspecciones_mono", "MONOFASICO", "Mono"), _source_files("inspecciones_mono"))
+registry.register("inspecciones_tri", lambda: _read_inspecciones("inspecciones_tri", "TRIFASICO", "Tri"), _source_files("inspecciones_tri"))
 
 
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -178,19 +234,17 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
         df['mes'] = df['fecha_inspeccion'].dt.month
         df['anio'] = df['fecha_inspeccion'].dt.year
 
-    return df
+    df = to_categorical(df, CATEGORICAL_COLUMNS)
 
+    return df
 
-def load_all_calidad_data(force_reload: bool = False) -> pd.DataFrame:
-    """Load and combine all calidad BASE data."""
-    df_mono = load_calidad_mono(force_reload)
-    df_tri = load_calidad_tri(force_reload)
 
-    dfs = []
-    if not df_mono.empty:
-        dfs.append(df_mono)
-    if not df_tri.empty:
-        dfs.append(df_tri)
+def _combine_base() -> pd.DataFrame:
+    """Combine the BASE datasets (mono + tri) currently in memory."""
+    # Solo lee los DataFrames ya cargados, sin tomar los locks de calidad_mono
+    # y calidad_tri: se llama desde sus notificaciones de cambio
+    dfs = [df for df in (registry.current("calidad_mono"), registry.current("calidad_tri"))
+           if df is not None and not df.empty]
 
     if not dfs:
         return pd.DataFrame()
@@ -199,17 +253,44 @@ def load_all_calidad_data(force_reload: bool = False) -> pd.DataFrame:
     df = pd.concat(dfs, ignore_index=True)
     df['id'] = range(1, len(df) + 1)
 
-    return df
+    # concat de categoricas con categorias distintas vuelve a object
+    return to_categorical(df, CATEGORICAL_COLUMNS)
+
+
+def _rebuild_combined(name: str) -> None:
+    # Cada nueva version de mono o tri rehace la combinacion con las versiones actuales
+    if name in ("calidad_mono", "calidad_tri"):
+        registry.reload("calidad")
+
+
+# BASE combinada: dataset derivado, sin archivos fuente propios
+registry.register("calidad", _combine_base, lambda: [])
+registry.on_change(_rebuild_combined)
+# Orden por defecto del listado, listo antes del primer request
+warm_on_change(registry, "calidad", ["id"])
+
+
+def load_all_calidad_data(force_reload: bool = False) -> pd.DataFrame:
+    """Load and combine all calidad BASE data."""
+    # Al cargarse (o recargarse) mono y tri ya se rehace la combinacion
+    load_calidad_mono(force_reload)
+    load_calidad_tri(force_reload)
+    return registry.get("calidad")
 
 
+@cached_stats("calidad", STATS_DATASETS)
 def get_calidad_stats(
     tipo_sistema: Optional[str] = None,
     comuna: Optional[str] = None,
     contratista: Optional[str] = None,
     mes: Optional[int] = None,
     anio: Optional[int] = None,
+    detail: bool = True,
 ) -> Dict[str, Any]:
-    """Get comprehensive statistics for Control de Perdidas."""
+    """Get comprehensive statistics for Control de Perdidas.
+
+    With `detail=False` the secondary breakdowns and the installation quality counts are left empty.
+    """
 
     # Cargar datos de BASE (inspecciones ejecutadas)
     df = load_all_calidad_data()
@@ -260,22 +341,13 @@ def get_calidad_stats(
         return empty_response
 
     # Aplicar filtros
-    mask = pd.Series([True] * len(df))
-
-    if tipo_sistema and 'tipo_sistema' in df.columns:
-        mask &= df['tipo_sistema'].str.upper() == tipo_sistema.upper()
-
-    if comuna and 'comuna' in df.columns:
-        mask &= df['comuna'].str.upper() == comuna.upper()
-
-    if contratista and 'contratista' in df.columns:
-        mask &= df['contratista'].str.upper() == contratista.upper()
-
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
-
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
+    mask = filter_mask(df, FILTER_COLUMNS, {
+        'tipo_sistema': tipo_sistema,
+        'comuna': comuna,
+        'contratista': contratista,
+        'mes': mes,
+        'anio': anio,
+    })
 
     df_filtered = df[mask].copy()
 
@@ -297,66 +369,45 @@ def get_calidad_stats(
     # Por Tipo Resultado
     por_resultado = []
     if 'tipo_resultado' in df_filtered.columns:
-        resultados = df_filtered[df_filtered['tipo_resultado'] != '']['tipo_resultado'].value_counts()
+        resultados = count_values(df_filtered[df_filtered['tipo_resultado'] != '']['tipo_resultado'])
         for r, c in resultados.items():
             por_resultado.append({"resultado": r, "cantidad": int(c)})
 
     # Por Estado Propiedad
     por_estado_propiedad = []
-    if 'estado_propiedad' in df_filtered.columns:
-        estados = df_filtered[df_filtered['estado_propiedad'] != '']['estado_propiedad'].value_counts()
+    if detail and 'estado_propiedad' in df_filtered.columns:
+        estados = count_values(df_filtered[df_filtered['estado_propiedad'] != '']['estado_propiedad'])
         for e, c in estados.items():
             por_estado_propiedad.append({"estado": e, "cantidad": int(c)})
 
     # Por Estado Suministro
     por_estado_suministro = []
-    if 'estado_suministro' in df_filtered.columns:
-        estados = df_filtered[df_filtered['estado_suministro'] != '']['estado_suministro'].value_counts()
+    if detail and 'estado_suministro' in df_filtered.columns:
+        estados = count_values(df_filtered[df_filtered['estado_suministro'] != '']['estado_suministro'])
         for e, c in estados.items():
             por_estado_suministro.append({"estado": e, "cantidad": int(c)})
 
     # Por Comuna
     por_comuna = []
-    if 'comuna' in df_filtered.columns:
-        comunas = df_filtered[df_filtered['comuna'] != '']['comuna'].value_counts()
+    if detail and 'comuna' in df_filtered.columns:
+        comunas = count_values(df_filtered[df_filtered['comuna'] != '']['comuna'])
         for com, c in comunas.items():
             por_comuna.append({"comuna": com, "cantidad": int(c)})
 
     # Por Inspector
     por_inspector = []
-    if 'inspector' in df_filtered.columns:
-        inspectores = df_filtered[df_filtered['inspector'] != '']['inspector'].value_counts()
-        for insp, c in inspectores.items():
-            # Calcular tasa de normalidad por inspector
-            insp_df = df_filtered[df_filtered['inspector'] == insp]
-            normales = len(insp_df[insp_df['tipo_resultado'].str.contains('NORMAL', case=False, na=False)])
-            tasa_normal = round((normales / c * 100), 1) if c > 0 else 0
-            por_inspector.append({
-                "inspector": insp,
-                "cantidad": int(c),
-                "normales": int(normales),
-                "tasa_normalidad": tasa_normal
-            })
+    if detail and 'inspector' in df_filtered.columns:
+        por_inspector = _normalidad_records(_normalidad_metrics(df_filtered, 'inspector'), 'inspector')
 
     # Por Contratista
     por_contratista = []
     if 'contratista' in df_filtered.columns:
-        contratistas = df_filtered[df_filtered['contratista'] != '']['contratista'].value_counts()
-        for cont, c in contratistas.items():
-            cont_df = df_filtered[df_filtered['contratista'] == cont]
-            normales = len(cont_df[cont_df['tipo_resultado'].str.contains('NORMAL', case=False, na=False)])
-            tasa_normal = round((normales / c * 100), 1) if c > 0 else 0
-            por_contratista.append({
-                "contratista": cont,
-                "cantidad": int(c),
-                "normales": int(normales),
-                "tasa_normalidad": tasa_normal
-            })
+        por_contratista = _normalidad_records(_normalidad_metrics(df_filtered, 'contratista'), 'contratista')
 
     # Por Giro (tipo de cliente)
     por_giro = []
-    if 'giro' in df_filtered.columns:
-        giros = df_filtered[df_filtered['giro'] != '']['giro'].value_counts().head(10)
+    if detail and 'giro' in df_filtered.columns:
+        giros = count_values(df_filtered[df_filtered['giro'] != '']['giro']).head(10)
         for g, c in giros.items():
             por_giro.append({"giro": g, "cantidad": int(c)})
 
@@ -397,7 +448,7 @@ def get_calidad_stats(
     }
 
     for campo, prefijo in [('estado_acometida', 'acometida'), ('estado_caja', 'caja'), ('estado_tapa', 'tapa')]:
-        if campo in df_filtered.columns:
+        if detail and campo in df_filtered.columns:
             calidad_instalacion[f"{prefijo}_normal"] = int(len(df_filtered[
                 df_filtered[campo].str.contains('NORMAL', case=False, na=False)
             ]))
@@ -517,6 +568,12 @@ def get_calidad_stats(
     }
 
 
+def get_calidad_summary() -> Dict[str, Any]:
+    """Get the Control de Perdidas KPIs shown in the dashboard summary."""
+    stats = get_calidad_stats(detail=False)
+    return {key: stats[key] for key in SUMMARY_KEYS}
+
+
 def get_calidad_filtered_data(
     search: Optional[str] = None,
     tipo_sistema: Optional[str] = None,
@@ -529,7 +586,8 @@ def get_calidad_filtered_data(
     page: int = 1,
     limit: int = 50,
     sort_by: str = "id",
-    order: str = "desc"
+    order: str = "desc",
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Get filtered and paginated calidad data."""
     df = load_all_calidad_data()
@@ -540,58 +598,31 @@ def get_calidad_filtered_data(
             "total": 0,
             "page": page,
             "limit": limit,
-            "pages": 0
+            "pages": 0,
+            "next_cursor": None
         }
 
     # Aplicar filtros
-    mask = pd.Series([True] * len(df))
+    mask = filter_mask(df, FILTER_COLUMNS, {
+        'tipo_sistema': tipo_sistema,
+        'comuna': comuna,
+        'contratista': contratista,
+        'mes': mes,
+        'anio': anio,
+    })
 
     if search:
-        search_mask = pd.Series([False] * len(df))
-        search_cols = ['cliente', 'nombre_cliente', 'direccion', 'comuna', 'medidor', 'inspector']
-        for col in search_cols:
-            if col in df.columns:
-                search_mask |= df[col].astype(str).str.contains(search, case=False, na=False)
-        mask &= search_mask
-
-    if tipo_sistema and 'tipo_sistema' in df.columns:
-        mask &= df['tipo_sistema'].str.upper() == tipo_sistema.upper()
+        mask &= get_search_index(df, SEARCH_COLUMNS).search(search)
 
     if tipo_resultado and 'tipo_resultado' in df.columns:
-        mask &= df['tipo_resultado'].str.contains(tipo_resultado, case=False, na=False)
-
-    if comuna and 'comuna' in df.columns:
-        mask &= df['comuna'].str.upper() == comuna.upper()
-
-    if contratista and 'contratista' in df.columns:
-        mask &= df['contratista'].str.upper() == contratista.upper()
+        mask &= match_contains(df['tipo_resultado'], tipo_resultado)
 
     if inspector and 'inspector' in df.columns:
-        mask &= df['inspector'].str.contains(inspector, case=False, na=False)
-
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
+        mask &= match_contains(df['inspector'], inspector)
 
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
-
-    filtered_df = df[mask].copy()
-
-    # Ordenar
-    if sort_by in filtered_df.columns:
-        filtered_df = filtered_df.sort_values(
-            by=sort_by,
-            ascending=(order == "asc"),
-            na_position='last'
-        )
-
-    # Paginar
-    total = len(filtered_df)
-    pages = (total + limit - 1) // limit
-    start = (page - 1) * limit
-    end = start + limit
-
-    paginated_df = filtered_df.iloc[start:end]
+    # Pagina sobre el orden precalculado de sort_by: sin copiar ni ordenar las filas filtradas
+    result_page = paginate(df, mask, sort_by, order, page, limit, cursor)
+    paginated_df = df.iloc[result_page.positions]
 
     # Seleccionar columnas para respuesta
     output_cols = ['id', 'tipo_sistema', 'cliente', 'nombre_cliente', 'direccion',
@@ -600,20 +631,16 @@ def get_calidad_filtered_data(
                    'voltaje', 'error_porcentaje', 'giro']
     output_cols = [c for c in output_cols if c in paginated_df.columns]
 
-    items = paginated_df[output_cols].to_dict(orient='records')
-
-    # Limpiar valores NaN
-    for item in items:
-        for key, value in item.items():
-            if pd.isna(value):
-                item[key] = None
+    # Valores NaN como None
+    items = frame_records(paginated_df[output_cols])
 
     return {
         "items": items,
-        "total": total,
-        "page": page,
+        "total": result_page.total,
+        "page": result_page.page,
         "limit": limit,
-        "pages": pages
+        "pages": result_page.pages,
+        "next_cursor": result_page.next_cursor
     }
 
 
@@ -631,22 +658,28 @@ def get_calidad_inspectores() -> List[Dict[str, Any]]:
     if 'inspector' not in df.columns:
         return []
 
-    inspectores = []
-    df_insp = df[df['inspector'] != '']
-    inspector_counts = df_insp['inspector'].value_counts()
-
-    for insp, count in inspector_counts.items():
-        if insp and insp.strip():
-            insp_df = df_insp[df_insp['inspector'] == insp]
-            normales = len(insp_df[insp_df['tipo_resultado'].str.contains('NORMAL', case=False, na=False)])
-            tasa = round((normales / count * 100), 1) if count > 0 else 0
-            inspectores.append({
-                "inspector": insp,
-                "cantidad": int(count),
-                "tasa_normalidad": tasa
-            })
+    return _normalidad_records(_normalidad_metrics(df, 'inspector'), 'inspector')
+
 
-    return inspectores
+def _normalidad_metrics(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """Inspections and NORMAL results per inspector or contratista."""
+    sums = {}
+    if 'tipo_resultado' in df.columns:
+        sums['normales'] = match_contains(df['tipo_resultado'], 'NORMAL')
+    return group_metrics(df, key, sums)
+
+
+def _normalidad_records(metrics: pd.DataFrame, key: str) -> List[Dict[str, Any]]:
+    records = []
+    for value, row in metrics.iterrows():
+        normales = int(row.get('normales', 0))
+        records.append({
+            key: value,
+            "cantidad": int(row['cantidad']),
+            "normales": normales,
+            "tasa_normalidad": rate(normales, int(row['cantidad'])),
+        })
+    return records
 
 
 def get_calidad_contratistas() -> List[str]:
@@ -692,13 +725,7 @@ def get_calidad_evolucion(
         return []
 
     # Aplicar filtros
-    mask = pd.Series([True] * len(df))
-
-    if tipo_sistema and 'tipo_sistema' in df.columns:
-        mask &= df['tipo_sistema'].str.upper() == tipo_sistema.upper()
-
-    if contratista and 'contratista' in df.columns:
-        mask &= df['contratista'].str.upper() == contratista.upper()
+    mask = filter_mask(df, FILTER_COLUMNS, {'tipo_sistema': tipo_sistema, 'contratista': contratista})
 
     df_filtered = df[mask].copy()
 
@@ -8,43 +8,83 @@ import numpy as np
 import os
 from typing import Optional, Dict, Any, List
 from datetime import datetime
+from ..utils.snapshot import read_snapshot, write_snapshot
+from ..utils.append_ingest import read_appended, apply_appended, source_layout
+from ..utils.source_files import resolve_source, read_source
+from ..core.config import settings
+from ..utils.categorical import to_categorical, match_equals, match_contains, count_values
+from ..utils.filter_index import filter_mask
+from ..utils.search_index import get_search_index
+from ..utils.group_metrics import group_metrics, rate
+from ..utils.records import frame_records
+from ..utils.sort_index import paginate, warm_on_change
+from .dataset_registry import registry
+from .result_cache import cached_stats
 
-# Global dataframe cache
-_df_corte_cache: Optional[pd.DataFrame] = None
+# Columnas donde busca el parametro `search` (indice invertido)
+SEARCH_COLUMNS = ['suministro', 'nombre_cliente', 'direccion', 'comuna', 'inspector', 'nro_medidor']
 
+# Columnas con filtros de igualdad (indice bitmap)
+FILTER_COLUMNS = ['zona', 'centro_operativo', 'comuna', 'mes', 'anio']
 
-def get_data_path() -> str:
-    """Get the data directory path."""
-    return os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-        "data"
-    )
+# Claves de get_corte_stats que muestra el resumen del dashboard
+SUMMARY_KEYS = [
+    'total', 'bien_ejecutados', 'no_ejecutados', 'tasa_calidad', 'con_multa', 'sin_multa', 'tasa_multa',
+    'factible_cortar', 'no_factible_cortar', 'por_zona', 'por_situacion_encontrada', 'por_mes',
+]
+
+
+def get_corte_source_files() -> List[str]:
+    """Get the source CSV paths for Corte y Reposicion."""
+    return [resolve_source(os.path.join(settings.DATA_DIR, "informe_corte.csv"))]
 
 
 def load_corte_data(force_reload: bool = False) -> pd.DataFrame:
     """Load corte data from CSV."""
-    global _df_corte_cache
+    return registry.get("corte", force_reload=force_reload)
 
-    if _df_corte_cache is not None and not force_reload:
-        return _df_corte_cache
 
-    path = os.path.join(get_data_path(), "informe_corte.csv")
+def _read_corte() -> pd.DataFrame:
+    """Read and normalize the Corte CSV (or its snapshot)."""
+    path = get_corte_source_files()[0]
 
     if not os.path.exists(path):
         print(f"File not found: {path}")
         return pd.DataFrame()
 
-    df = pd.read_csv(path, encoding='utf-8', low_memory=False)
-    df['id'] = range(1, len(df) + 1)
+    snapshot = read_snapshot("corte", [path])
+    if snapshot is not None:
+        return snapshot
 
-    # Normalizar columnas
-    df = normalize_columns(df)
+    # Si el CSV solo crecio, normalizar solo las filas nuevas
+    current = registry.current("corte")
+    appended = read_appended("corte", [path], current, encoding='utf-8', low_memory=False)
+    if appended is not None:
+        return apply_appended("corte", [path], appended, current, _normalize_corte, 'id')
+
+    frames = [read_source(path, encoding='utf-8', low_memory=False)]
+    layout = source_layout(frames)
+    df = _normalize_corte(frames)
 
-    _df_corte_cache = df
+    df = write_snapshot("corte", [path], df, layout)
     print(f"Loaded Corte data: {len(df)} records")
     return df
 
 
+def _normalize_corte(frames: List[Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """Normalize the raw Corte CSV."""
+    df = frames[0]
+    df['id'] = range(1, len(df) + 1)
+
+    # Normalizar columnas
+    return normalize_columns(df)
+
+
+registry.register("corte", _read_corte, get_corte_source_files)
+# Orden por defecto del listado, listo antes del primer request
+warm_on_change(registry, "corte", ["id"])
+
+
 def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Normalize column names and values."""
     # Mapeo de columnas
@@ -99,6 +139,7 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     for col in text_cols:
         if col in df.columns:
             df[col] = df[col].fillna('').astype(str).str.strip().str.upper()
+    df = to_categorical(df, text_cols)
 
     # Parsear fechas
     date_cols = ['fecha_asignado', 'fecha_vence', 'fecha_inspeccion']
@@ -114,6 +155,7 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+@cached_stats("corte", ["corte"])
 def get_corte_stats(
     zona: Optional[str] = None,
     centro_operativo: Optional[str] = None,
@@ -121,8 +163,12 @@ def get_corte_stats(
     inspector: Optional[str] = None,
     mes: Optional[int] = None,
     anio: Optional[int] = None,
+    detail: bool = True,
 ) -> Dict[str, Any]:
-    """Get comprehensive statistics for Corte y Reposicion."""
+    """Get comprehensive statistics for Corte y Reposicion.
+
+    With `detail=False` the secondary breakdowns are left empty.
+    """
 
     df = load_corte_data()
 
@@ -156,25 +202,16 @@ def get_corte_stats(
         return empty_response
 
     # Aplicar filtros
-    mask = pd.Series([True] * len(df))
-
-    if zona and 'zona' in df.columns:
-        mask &= df['zona'].str.upper() == zona.upper()
-
-    if centro_operativo and 'centro_operativo' in df.columns:
-        mask &= df['centro_operativo'].str.upper() == centro_operativo.upper()
-
-    if comuna and 'comuna' in df.columns:
-        mask &= df['comuna'].str.upper() == comuna.upper()
+    mask = filter_mask(df, FILTER_COLUMNS, {
+        'zona': zona,
+        'centro_operativo': centro_operativo,
+        'comuna': comuna,
+        'mes': mes,
+        'anio': anio,
+    })
 
     if inspector and 'inspector' in df.columns:
-        mask &= df['inspector'].str.contains(inspector, case=False, na=False)
-
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
-
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
+        mask &= match_contains(df['inspector'], inspector)
 
     df_filtered = df[mask].copy()
 
@@ -195,32 +232,32 @@ def get_corte_stats(
     tasa_calidad = round((bien_ejecutados / total * 100), 1) if total > 0 else 0
 
     # Multas
-    con_multa = len(df_filtered[df_filtered['multa'].str.upper() == 'SI'])
-    sin_multa = len(df_filtered[df_filtered['multa'].str.upper() == 'NO'])
+    con_multa = len(df_filtered[match_equals(df_filtered['multa'], 'SI')])
+    sin_multa = len(df_filtered[match_equals(df_filtered['multa'], 'NO')])
     tasa_multa = round((con_multa / total * 100), 1) if total > 0 else 0
 
     # Factibilidad de corte
-    factible_cortar = len(df_filtered[df_filtered['es_factible_cortar'].str.upper() == 'SI'])
-    no_factible_cortar = len(df_filtered[df_filtered['es_factible_cortar'].str.upper() == 'NO'])
+    factible_cortar = len(df_filtered[match_equals(df_filtered['es_factible_cortar'], 'SI')])
+    no_factible_cortar = len(df_filtered[match_equals(df_filtered['es_factible_cortar'], 'NO')])
 
     # Por Situacion Encontrada
     por_situacion_encontrada = []
     if 'situacion_encontrada' in df_filtered.columns:
-        situaciones = df_filtered[df_filtered['situacion_encontrada'] != '']['situacion_encontrada'].value_counts()
+        situaciones = count_values(df_filtered[df_filtered['situacion_encontrada'] != '']['situacion_encontrada'])
         for s, c in situaciones.items():
             por_situacion_encontrada.append({"situacion": s, "cantidad": int(c)})
 
     # Por Situacion a Inspeccionar
     por_situacion_a_inspeccionar = []
-    if 'situacion_a_inspeccionar' in df_filtered.columns:
-        situaciones = df_filtered[df_filtered['situacion_a_inspeccionar'] != '']['situacion_a_inspeccionar'].value_counts()
+    if detail and 'situacion_a_inspeccionar' in df_filtered.columns:
+        situaciones = count_values(df_filtered[df_filtered['situacion_a_inspeccionar'] != '']['situacion_a_inspeccionar'])
         for s, c in situaciones.items():
             por_situacion_a_inspeccionar.append({"situacion": s, "cantidad": int(c)})
 
     # Por Zona
     por_zona = []
     if 'zona' in df_filtered.columns:
-        zonas = df_filtered[df_filtered['zona'] != '']['zona'].value_counts()
+        zonas = count_values(df_filtered[df_filtered['zona'] != '']['zona'])
         for z, c in zonas.items():
             # Calcular tasa de calidad por zona
             zona_df = df_filtered[df_filtered['zona'] == z]
@@ -235,8 +272,8 @@ def get_corte_stats(
 
     # Por Centro Operativo
     por_centro_operativo = []
-    if 'centro_operativo' in df_filtered.columns:
-        centros = df_filtered[df_filtered['centro_operativo'] != '']['centro_operativo'].value_counts()
+    if detail and 'centro_operativo' in df_filtered.columns:
+        centros = count_values(df_filtered[df_filtered['centro_operativo'] != '']['centro_operativo'])
         for centro, c in centros.items():
             centro_df = df_filtered[df_filtered['centro_operativo'] == centro]
             centro_bien = len(centro_df[centro_df['motivo_multa'].str.contains('BIEN EJECUTADO', case=False, na=False)])
@@ -250,46 +287,34 @@ def get_corte_stats(
 
     # Por Comuna
     por_comuna = []
-    if 'comuna' in df_filtered.columns:
-        comunas = df_filtered[df_filtered['comuna'] != '']['comuna'].value_counts().head(15)
+    if detail and 'comuna' in df_filtered.columns:
+        comunas = count_values(df_filtered[df_filtered['comuna'] != '']['comuna']).head(15)
         for com, c in comunas.items():
             por_comuna.append({"comuna": com, "cantidad": int(c)})
 
     # Por Inspector
     por_inspector = []
-    if 'inspector' in df_filtered.columns:
-        inspectores = df_filtered[df_filtered['inspector'] != '']['inspector'].value_counts()
-        for insp, c in inspectores.items():
-            insp_df = df_filtered[df_filtered['inspector'] == insp]
-            insp_bien = len(insp_df[insp_df['motivo_multa'].str.contains('BIEN EJECUTADO', case=False, na=False)])
-            insp_multa = len(insp_df[insp_df['multa'].str.upper() == 'SI'])
-            insp_tasa = round((insp_bien / c * 100), 1) if c > 0 else 0
-            por_inspector.append({
-                "inspector": insp,
-                "cantidad": int(c),
-                "bien_ejecutados": int(insp_bien),
-                "con_multa": int(insp_multa),
-                "tasa_calidad": insp_tasa
-            })
+    if detail and 'inspector' in df_filtered.columns:
+        por_inspector = _inspector_records(_inspector_metrics(df_filtered))
 
     # Por Giro
     por_giro = []
-    if 'giro' in df_filtered.columns:
-        giros = df_filtered[df_filtered['giro'] != '']['giro'].value_counts().head(10)
+    if detail and 'giro' in df_filtered.columns:
+        giros = count_values(df_filtered[df_filtered['giro'] != '']['giro']).head(10)
         for g, c in giros.items():
             por_giro.append({"giro": g, "cantidad": int(c)})
 
     # Por Tipo Empalme
     por_tipo_empalme = []
-    if 'tipo_empalme' in df_filtered.columns:
-        empalmes = df_filtered[df_filtered['tipo_empalme'] != '']['tipo_empalme'].value_counts()
+    if detail and 'tipo_empalme' in df_filtered.columns:
+        empalmes = count_values(df_filtered[df_filtered['tipo_empalme'] != '']['tipo_empalme'])
         for e, c in empalmes.items():
             por_tipo_empalme.append({"tipo": e, "cantidad": int(c)})
 
     # Por Accion Cobro (Tipo de inspeccion)
     por_accion_cobro = []
-    if 'accion_cobro' in df_filtered.columns:
-        acciones = df_filtered[df_filtered['accion_cobro'] != '']['accion_cobro'].value_counts()
+    if detail and 'accion_cobro' in df_filtered.columns:
+        acciones = count_values(df_filtered[df_filtered['accion_cobro'] != '']['accion_cobro'])
         for a, c in acciones.items():
             # Simplificar el nombre
             nombre = a
@@ -407,6 +432,12 @@ def get_corte_stats(
     }
 
 
+def get_corte_summary() -> Dict[str, Any]:
+    """Get the Corte y Reposicion KPIs shown in the dashboard summary."""
+    stats = get_corte_stats(detail=False)
+    return {key: stats[key] for key in SUMMARY_KEYS}
+
+
 def get_corte_filtered_data(
     search: Optional[str] = None,
     zona: Optional[str] = None,
@@ -420,7 +451,8 @@ def get_corte_filtered_data(
     page: int = 1,
     limit: int = 50,
     sort_by: str = "id",
-    order: str = "desc"
+    order: str = "desc",
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Get filtered and paginated corte data."""
     df = load_corte_data()
@@ -431,61 +463,34 @@ def get_corte_filtered_data(
             "total": 0,
             "page": page,
             "limit": limit,
-            "pages": 0
+            "pages": 0,
+            "next_cursor": None
         }
 
     # Aplicar filtros
-    mask = pd.Series([True] * len(df))
+    mask = filter_mask(df, FILTER_COLUMNS, {
+        'zona': zona,
+        'centro_operativo': centro_operativo,
+        'comuna': comuna,
+        'mes': mes,
+        'anio': anio,
+    })
 
     if search:
-        search_mask = pd.Series([False] * len(df))
-        search_cols = ['suministro', 'nombre_cliente', 'direccion', 'comuna', 'inspector', 'nro_medidor']
-        for col in search_cols:
-            if col in df.columns:
-                search_mask |= df[col].astype(str).str.contains(search, case=False, na=False)
-        mask &= search_mask
-
-    if zona and 'zona' in df.columns:
-        mask &= df['zona'].str.upper() == zona.upper()
-
-    if centro_operativo and 'centro_operativo' in df.columns:
-        mask &= df['centro_operativo'].str.upper() == centro_operativo.upper()
-
-    if comuna and 'comuna' in df.columns:
-        mask &= df['comuna'].str.upper() == comuna.upper()
+        mask &= get_search_index(df, SEARCH_COLUMNS).search(search)
 
     if inspector and 'inspector' in df.columns:
-        mask &= df['inspector'].str.contains(inspector, case=False, na=False)
+        mask &= match_contains(df['inspector'], inspector)
 
     if situacion_encontrada and 'situacion_encontrada' in df.columns:
-        mask &= df['situacion_encontrada'].str.contains(situacion_encontrada, case=False, na=False)
+        mask &= match_contains(df['situacion_encontrada'], situacion_encontrada)
 
     if motivo_multa and 'motivo_multa' in df.columns:
-        mask &= df['motivo_multa'].str.contains(motivo_multa, case=False, na=False)
-
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
-
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
-
-    filtered_df = df[mask].copy()
-
-    # Ordenar
-    if sort_by in filtered_df.columns:
-        filtered_df = filtered_df.sort_values(
-            by=sort_by,
-            ascending=(order == "asc"),
-            na_position='last'
-        )
-
-    # Paginar
-    total = len(filtered_df)
-    pages = (total + limit - 1) // limit
-    start = (page - 1) * limit
-    end = start + limit
+        mask &= match_contains(df['motivo_multa'], motivo_multa)
 
-    paginated_df = filtered_df.iloc[start:end]
+    # Pagina sobre el orden precalculado de sort_by: sin copiar ni ordenar las filas filtradas
+    result_page = paginate(df, mask, sort_by, order, page, limit, cursor)
+    paginated_df = df.iloc[result_page.positions]
 
     # Seleccionar columnas para respuesta
     output_cols = ['id', 'suministro', 'nombre_cliente', 'direccion', 'comuna',
@@ -494,22 +499,16 @@ def get_corte_filtered_data(
                    'es_factible_cortar', 'fecha_inspeccion']
     output_cols = [c for c in output_cols if c in paginated_df.columns]
 
-    items = paginated_df[output_cols].to_dict(orient='records')
-
-    # Limpiar valores NaN y formatear fechas
-    for item in items:
-        for key, value in item.items():
-            if pd.isna(value):
-                item[key] = None
-            elif isinstance(value, pd.Timestamp):
-                item[key] = value.strftime('%Y-%m-%d')
+    # Valores NaN como None, fechas como YYYY-MM-DD
+    items = frame_records(paginated_df[output_cols])
 
     return {
         "items": items,
-        "total": total,
-        "page": page,
+        "total": result_page.total,
+        "page": result_page.page,
         "limit": limit,
-        "pages": pages
+        "pages": result_page.pages,
+        "next_cursor": result_page.next_cursor
     }
 
 
@@ -543,25 +542,30 @@ def get_corte_inspectores() -> List[Dict[str, Any]]:
     if 'inspector' not in df.columns:
         return []
 
-    inspectores = []
-    df_insp = df[df['inspector'] != '']
-    inspector_counts = df_insp['inspector'].value_counts()
-
-    for insp, count in inspector_counts.items():
-        if insp and insp.strip():
-            insp_df = df_insp[df_insp['inspector'] == insp]
-            bien_ejecutados = len(insp_df[insp_df['motivo_multa'].str.contains('BIEN EJECUTADO', case=False, na=False)])
-            con_multa = len(insp_df[insp_df['multa'].str.upper() == 'SI'])
-            tasa = round((bien_ejecutados / count * 100), 1) if count > 0 else 0
-            inspectores.append({
-                "inspector": insp,
-                "cantidad": int(count),
-                "bien_ejecutados": int(bien_ejecutados),
-                "con_multa": int(con_multa),
-                "tasa_calidad": tasa
-            })
+    return _inspector_records(_inspector_metrics(df))
+
+
+def _inspector_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    sums = {}
+    if 'motivo_multa' in df.columns:
+        sums['bien_ejecutados'] = match_contains(df['motivo_multa'], 'BIEN EJECUTADO')
+    if 'multa' in df.columns:
+        sums['con_multa'] = match_equals(df['multa'], 'SI')
+    return group_metrics(df, 'inspector', sums)
 
-    return inspectores
+
+def _inspector_records(metrics: pd.DataFrame) -> List[Dict[str, Any]]:
+    records = []
+    for inspector, row in metrics.iterrows():
+        bien_ejecutados = int(row.get('bien_ejecutados', 0))
+        records.append({
+            "inspector": inspector,
+            "cantidad": int(row['cantidad']),
+            "bien_ejecutados": bien_ejecutados,
+            "con_multa": int(row.get('con_multa', 0)),
+            "tasa_calidad": rate(bien_ejecutados, int(row['cantidad'])),
+        })
+    return records
 
 
 def get_corte_situaciones() -> List[str]:
@@ -599,13 +603,7 @@ def get_corte_evolucion(
         return []
 
     # Aplicar filtros
-    mask = pd.Series([True] * len(df))
-
-    if zona and 'zona' in df.columns:
-        mask &= df['zona'].str.upper() == zona.upper()
-
-    if centro_operativo and 'centro_operativo' in df.columns:
-        mask &= df['centro_operativo'].str.upper() == centro_operativo.upper()
+    mask = filter_mask(df, FILTER_COLUMNS, {'zona': zona, 'centro_operativo': centro_operativo})
 
     df_filtered = df[mask].copy()
 
@@ -627,7 +625,7 @@ def get_corte_evolucion(
         tasa_calidad = round((bien_ejecutados / total * 100), 1) if total > 0 else 0
 
         # Calcular multas
-        con_multa = len(df_periodo[df_periodo['multa'].str.upper() == 'SI'])
+        con_multa = len(df_periodo[match_equals(df_periodo['multa'], 'SI')])
         tasa_multa = round((con_multa / total * 100), 1) if total > 0 else 0
 
         # Nombre del mes
@@ -3,27 +3,77 @@ import os
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from ..core.config import settings
-
-# Global dataframe cache
-_df_cache: Optional[pd.DataFrame] = None
+from ..utils.snapshot import read_snapshot, write_snapshot
+from ..utils.append_ingest import read_appended, apply_appended, source_layout
+from ..utils.source_files import resolve_source, read_source
+from ..utils.categorical import to_categorical, map_distinct, match_equals, match_contains
+from ..utils.filter_index import filter_mask
+from ..utils.search_index import get_search_index
+from ..utils.group_metrics import group_metrics, rate
+from ..utils.records import frame_records
+from ..utils.sort_index import paginate, warm_on_change
+from ..utils.stats_cube import get_stats_cube, build_cells, ordered_totals
+from .dataset_registry import registry
+from .result_cache import cached_stats
+
+# Archivo NNCC
+NNCC_FILENAME = "2025-05 INFORME NNCC (2024-2029) DIC 2025.csv"
+
+# Columnas minimas (ya normalizadas) que debe tener un archivo NNCC
+REQUIRED_COLUMNS = ['cliente', 'zona', 'estado_efectividad', 'fecha_inspeccion', 'inspector']
+
+# Columnas de baja cardinalidad que se guardan como categoricas
+CATEGORICAL_COLUMNS = [
+    'zona', 'comuna', 'inspector', 'base', 'tarifa', 'estado_efectividad',
+    'resultado_inspeccion', 'multa', 'estado_contratista', 'resultado_normalizacion',
+    'tipo_inspeccion', 'estado_empalme_norm',
+]
+
+# Columnas donde busca el parametro `search` (indice invertido)
+SEARCH_COLUMNS = ['cliente', 'comuna', 'inspector', 'n_medidor', 'direccion']
+
+# Columnas con filtros de igualdad (indice bitmap)
+FILTER_COLUMNS = ['zona', 'comuna', 'base', 'mes', 'anio']
+
+# Clasificaciones precalculadas al cargar (booleanas), usadas por las estadisticas
+FLAG_COLUMNS = [
+    'es_efectiva', 'es_no_efectiva', 'es_bien', 'es_mal', 'con_multa', 'pendiente_normalizar',
+    'es_conforme', 'es_disconforme', 'conforme_sin_dato', 'conforme_vacio',
+    'cumple_cc', 'no_cumple_cc', 'cc_sin_dato', 'cc_vacio',
+]
+
+# Columnas calculadas al cargar que no se muestran en los listados
+DERIVED_COLUMNS = FLAG_COLUMNS + ['estado_empalme_norm']
+
+# Dimensiones del cubo de estadisticas (ademas del dia de inspeccion)
+CUBE_DIMENSIONS = ['zona', 'base', 'anio', 'mes', 'estado_empalme_norm']
+
+# Claves de get_stats que muestra el resumen del dashboard
+SUMMARY_KEYS = [
+    'total', 'efectivas', 'no_efectivas', 'tasa_efectividad', 'bien_ejecutados', 'mal_ejecutados',
+    'con_multa', 'por_zona', 'por_mes', 'comparativas',
+]
+
+# Valores de "sin dato" en cliente_conforme y cumple_norma_cc
+SIN_DATO_VALUES = ['S/N', '#N/D']
+
+
+def get_source_files() -> List[str]:
+    """Get the source CSV paths for NNCC."""
+    return [resolve_source(os.path.join(settings.DATA_DIR, NNCC_FILENAME))]
 
 
 def load_data(force_reload: bool = False) -> pd.DataFrame:
-    global _df_cache
+    return registry.get("nncc", force_reload=force_reload)
 
-    if _df_cache is not None and not force_reload:
-        return _df_cache
 
-    # Archivo NNCC
-    csv_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-        "data",
-        "2025-05 INFORME NNCC (2024-2029) DIC 2025.csv"
-    )
+def _read_nncc() -> pd.DataFrame:
+    """Read and normalize the NNCC CSV (or its snapshot)."""
+    csv_path = get_source_files()[0]
 
     if not os.path.exists(csv_path):
         # Create empty dataframe with expected columns
-        _df_cache = pd.DataFrame(columns=[
+        return pd.DataFrame(columns=[
             "id", "vta", "cliente", "nombre_cliente", "direccion", "comuna",
             "tarifa", "zona", "base", "n_medidor", "estado_efectividad",
             "resultado_inspeccion", "multa", "observaciones_multa",
@@ -31,11 +81,35 @@ def load_data(force_reload: bool = False) -> pd.DataFrame:
             "resultado_normalizacion", "cumple_norma_cc", "cliente_conforme",
             "estado_empalme"
         ])
-        return _df_cache
+
+    snapshot = read_snapshot("nncc", [csv_path])
+    if snapshot is not None:
+        return snapshot
+
+    # Si el CSV solo crecio, normalizar solo las filas nuevas
+    current = registry.current("nncc")
+    appended = read_appended("nncc", [csv_path], current, encoding='utf-8', low_memory=False)
+    if appended is not None:
+        # normalize_data numera `id` solo si el CSV no trae esa columna
+        id_column = None if 'id' in appended.columns else 'id'
+        return apply_appended("nncc", [csv_path], appended, current, _normalize_nncc, id_column)
 
     print(f"Loading data from: {csv_path}")
-    df = pd.read_csv(csv_path, encoding='utf-8', low_memory=False)
+    raw = read_source(csv_path, encoding='utf-8', low_memory=False)
+    layout = source_layout([raw])
+    df = _normalize_nncc([raw])
+
+    df = write_snapshot("nncc", [csv_path], df, layout)
+    print(f"Loaded {len(df)} records")
+    return df
 
+
+def _normalize_nncc(frames: List[Optional[pd.DataFrame]]) -> pd.DataFrame:
+    return normalize_data(frames[0])
+
+
+def normalize_data(df: pd.DataFrame) -> pd.DataFrame:
+    """Rename the NNCC columns and normalize their values."""
     # Standardize column names for easier access
     column_mapping = {
         "VTA": "vta",
@@ -85,11 +159,123 @@ def load_data(force_reload: bool = False) -> pd.DataFrame:
     if 'cliente' in df.columns:
         df['cliente'] = df['cliente'].astype(str).str.replace('.0', '', regex=False)
 
-    _df_cache = df
-    print(f"Loaded {len(df)} records")
+    # Estado empalme normalizado (una vez por valor distinto)
+    if 'estado_empalme' in df.columns:
+        df['estado_empalme_norm'] = map_distinct(df['estado_empalme'], normalize_empalme)
+
+    df = to_categorical(df, CATEGORICAL_COLUMNS)
+    df = add_flag_columns(df)
+
     return df
 
 
+def normalize_empalme(val: Any) -> str:
+    """Normalize an estado_empalme value (Bueno, Malo, Regular, Sin Dato, Sin Inspeccionar...)."""
+    val = '' if pd.isna(val) else str(val).strip().upper()
+    if val == '' or val == 'NAN':
+        return 'Sin Inspeccionar'
+    if val in ['#N/D', 'S/N', '#N/A', 'N/A']:
+        return 'Sin Dato'
+    if val in ['BUENO', 'BUEN', 'BIEN']:
+        return 'Bueno'
+    if val in ['MALO', 'MAL']:
+        return 'Malo'
+    if val in ['REGULAR']:
+        return 'Regular'
+    # Si es un número, ignorar
+    try:
+        float(val.replace('.', '').replace(',', ''))
+        return 'Sin Dato'
+    except ValueError:
+        pass
+    # Capitalizar para consistencia
+    return val.title()
+
+
+def _normalized_text(df: pd.DataFrame, col: str) -> pd.Series:
+    """Upper-cased, stripped text of a column ('' for missing values or columns)."""
+    if col not in df.columns:
+        return pd.Series('', index=df.index)
+    return df[col].astype(object).fillna('').astype(str).str.upper().str.strip()
+
+
+def add_flag_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Precompute the boolean classification columns used by the NNCC stats."""
+    false = pd.Series(False, index=df.index)
+
+    # Efectividad
+    if 'estado_efectividad' in df.columns:
+        no_efectiva = match_contains(df['estado_efectividad'], 'NO EFECTIVA')
+        df['es_efectiva'] = match_contains(df['estado_efectividad'], 'EFECTIVA') & ~no_efectiva
+        df['es_no_efectiva'] = no_efectiva
+    else:
+        df['es_efectiva'] = false
+        df['es_no_efectiva'] = false
+
+    # Resultado inspeccion
+    if 'resultado_inspeccion' in df.columns:
+        df['es_bien'] = match_contains(df['resultado_inspeccion'], 'BIEN')
+        df['es_mal'] = match_contains(df['resultado_inspeccion'], 'MAL')
+    else:
+        df['es_bien'] = false
+        df['es_mal'] = false
+
+    df['con_multa'] = match_equals(df['multa'], 'SI') if 'multa' in df.columns else false
+    df['pendiente_normalizar'] = (
+        match_contains(df['resultado_normalizacion'], 'PENDIENTE')
+        if 'resultado_normalizacion' in df.columns else false
+    )
+
+    # Cliente conforme: "cliente conforme", "cliente disconforme", "S/N", "#N/D", vacio (sin inspeccionar)
+    col = _normalized_text(df, 'cliente_conforme')
+    disconforme = col.str.contains('DISCONFORME', regex=False)
+    df['es_conforme'] = col.str.contains('CONFORME', regex=False) & ~disconforme
+    df['es_disconforme'] = disconforme
+    df['conforme_sin_dato'] = col.isin(SIN_DATO_VALUES)
+    df['conforme_vacio'] = (col == '') & ('cliente_conforme' in df.columns)
+
+    # Cumple norma codigo colores: "Cumple Norma CC", "No Cumple Norma CC", "S/N", "#N/D", vacio
+    col = _normalized_text(df, 'cumple_norma_cc')
+    no_cumple = col.str.contains('NO CUMPLE', regex=False)
+    df['cumple_cc'] = col.str.contains('CUMPLE', regex=False) & ~no_cumple
+    df['no_cumple_cc'] = no_cumple
+    df['cc_sin_dato'] = col.isin(SIN_DATO_VALUES)
+    df['cc_vacio'] = (col == '') & ('cumple_norma_cc' in df.columns)
+
+    for flag in FLAG_COLUMNS:
+        df[flag] = df[flag].astype(bool)
+
+    return df
+
+
+def validate_data(df: pd.DataFrame) -> List[str]:
+    """Get the validation errors of a normalized NNCC DataFrame (empty if valid)."""
+    errors = []
+    if df.empty:
+        errors.append("El archivo no tiene registros")
+
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        errors.append(f"Faltan columnas requeridas: {', '.join(missing)}")
+    elif df['fecha_inspeccion'].notna().sum() == 0:
+        errors.append("Ninguna fecha de inspeccion es valida")
+
+    return errors
+
+
+def _load_nncc() -> pd.DataFrame:
+    df = _read_nncc()
+    # El cubo de estadisticas se arma junto con la carga, no en el primer request
+    if not df.empty:
+        _stats_cube(df)
+    return df
+
+
+registry.register("nncc", _load_nncc, get_source_files)
+# Orden por defecto del listado, listo antes del primer request
+warm_on_change(registry, "nncc", ["fecha_inspeccion"])
+
+
 def get_filtered_data(
     search: Optional[str] = None,
     zona: Optional[str] = None,
@@ -104,7 +290,8 @@ def get_filtered_data(
     page: int = 1,
     limit: int = 50,
     sort_by: str = "fecha_inspeccion",
-    order: str = "desc"
+    order: str = "desc",
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     df = load_data()
 
@@ -114,34 +301,64 @@ def get_filtered_data(
             "total": 0,
             "page": page,
             "limit": limit,
-            "pages": 0
+            "pages": 0,
+            "next_cursor": None
         }
 
     # Apply filters
-    mask = pd.Series([True] * len(df))
+    mask = filter_mask(df, FILTER_COLUMNS, {
+        'zona': zona,
+        'comuna': comuna,
+        'base': base,
+        'mes': mes,
+        'anio': anio,
+    })
 
     if search:
-        search_mask = pd.Series([False] * len(df))
-        search_cols = ['cliente', 'comuna', 'inspector', 'n_medidor', 'direccion']
-        for col in search_cols:
-            if col in df.columns:
-                search_mask |= df[col].astype(str).str.contains(search, case=False, na=False)
-        mask &= search_mask
-
-    if zona and 'zona' in df.columns:
-        mask &= df['zona'].str.upper() == zona.upper()
+        mask &= get_search_index(df, SEARCH_COLUMNS).search(search)
 
     if inspector and 'inspector' in df.columns:
-        mask &= df['inspector'].str.contains(inspector, case=False, na=False)
+        mask &= match_contains(df['inspector'], inspector)
 
     if estado and 'estado_efectividad' in df.columns:
-        mask &= df['estado_efectividad'].str.contains(estado, case=False, na=False)
+        mask &= match_contains(df['estado_efectividad'], estado)
+
+    if fecha_desde and 'fecha_inspeccion' in df.columns:
+        mask &= df['fecha_inspeccion'] >= pd.to_datetime(fecha_desde)
+
+    if fecha_hasta and 'fecha_inspeccion' in df.columns:
+        mask &= df['fecha_inspeccion'] <= pd.to_datetime(fecha_hasta)
+
+    # Pagina sobre el orden precalculado de sort_by: sin copiar ni ordenar las filas filtradas
+    result_page = paginate(df, mask, sort_by, order, page, limit, cursor)
 
-    if comuna and 'comuna' in df.columns:
-        mask &= df['comuna'].str.upper() == comuna.upper()
+    # Las columnas calculadas al cargar son internas
+    paginated_df = df.iloc[result_page.positions].drop(columns=DERIVED_COLUMNS, errors='ignore')
 
-    if base and 'base' in df.columns:
-        mask &= df['base'] == base
+    # Convert to dict (fechas como YYYY-MM-DD, nulos como None)
+    items = frame_records(paginated_df)
+
+    return {
+        "items": items,
+        "total": result_page.total,
+        "page": result_page.page,
+        "limit": limit,
+        "pages": result_page.pages,
+        "next_cursor": result_page.next_cursor
+    }
+
+
+def _filter_stats_data(
+    df: pd.DataFrame,
+    zona: Optional[str] = None,
+    base: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None,
+    mes: Optional[int] = None,
+    anio: Optional[int] = None,
+) -> pd.DataFrame:
+    """Apply the stats filters (zona, base, date range, mes, anio)."""
+    mask = filter_mask(df, FILTER_COLUMNS, {'zona': zona, 'base': base, 'mes': mes, 'anio': anio})
 
     if fecha_desde and 'fecha_inspeccion' in df.columns:
         mask &= df['fecha_inspeccion'] >= pd.to_datetime(fecha_desde)
@@ -149,50 +366,113 @@ def get_filtered_data(
     if fecha_hasta and 'fecha_inspeccion' in df.columns:
         mask &= df['fecha_inspeccion'] <= pd.to_datetime(fecha_hasta)
 
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
+    # Sin filtros no hace falta copiar todas las filas
+    return df if mask.all() else df[mask]
 
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
 
-    filtered_df = df[mask].copy()
+def _stats_cube(df: pd.DataFrame):
+    return get_stats_cube(df, CUBE_DIMENSIONS, 'fecha_inspeccion', FLAG_COLUMNS)
 
-    # Sort
-    if sort_by in filtered_df.columns:
-        filtered_df = filtered_df.sort_values(
-            by=sort_by,
-            ascending=(order == "asc"),
-            na_position='last'
-        )
 
-    # Paginate
-    total = len(filtered_df)
-    pages = (total + limit - 1) // limit
-    start = (page - 1) * limit
-    end = start + limit
+def _stats_cells(
+    df: pd.DataFrame,
+    zona: Optional[str] = None,
+    base: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None,
+    mes: Optional[int] = None,
+    anio: Optional[int] = None,
+) -> pd.DataFrame:
+    """Cube cells for the stats filters.
+
+    Falls back to grouping the filtered rows when the cube can't resolve the
+    date range (dates with a time of day).
+    """
+    cube = _stats_cube(df)
+    cells = cube.select({'zona': zona, 'base': base, 'mes': mes, 'anio': anio}, fecha_desde, fecha_hasta)
+    if cells is None:
+        filtered = _filter_stats_data(df, zona, base, fecha_desde, fecha_hasta, mes, anio)
+        cells = build_cells(filtered, cube.dimensions, 'fecha_inspeccion', cube.measures)
+    return cells
+
+
+def get_comuna_aggregates(df: pd.DataFrame, min_total: int = 5) -> pd.DataFrame:
+    """Per-comuna totals and problem counts, in one groupby.
+
+    Comunas with fewer than `min_total` inspections are left out (too few data).
+    Rows keep the order in which each comuna first appears.
+    """
+    comunas = df.groupby('comuna', observed=True, sort=False).agg(
+        total=('es_mal', 'size'),
+        mal_ejecutados=('es_mal', 'sum'),
+        disconformes=('es_disconforme', 'sum'),
+        no_cumple_norma=('no_cumple_cc', 'sum'),
+    )
+    comunas = comunas[comunas['total'] >= min_total]
+    # Score de problemas (ponderado)
+    return comunas.assign(
+        score_problemas=comunas['mal_ejecutados'] + comunas['disconformes'] + comunas['no_cumple_norma']
+    )
 
-    paginated_df = filtered_df.iloc[start:end]
 
-    # Convert to dict
-    items = paginated_df.to_dict(orient='records')
+def _comuna_records(comunas: pd.DataFrame) -> List[Dict[str, Any]]:
+    records = []
+    for comuna, row in comunas.iterrows():
+        total = int(row['total'])
+        mal = int(row['mal_ejecutados'])
+        records.append({
+            "comuna": str(comuna),
+            "total": total,
+            "mal_ejecutados": mal,
+            "tasa_mal_ejecutado": round((mal / total * 100), 1) if total > 0 else 0,
+            "disconformes": int(row['disconformes']),
+            "no_cumple_norma": int(row['no_cumple_norma']),
+            "score_problemas": int(row['score_problemas']),
+        })
+    return records
 
-    # Format dates for JSON
-    for item in items:
-        for key, value in item.items():
-            if isinstance(value, pd.Timestamp):
-                item[key] = value.strftime('%Y-%m-%d') if pd.notna(value) else None
-            elif pd.isna(value):
-                item[key] = None
 
-    return {
-        "items": items,
-        "total": total,
-        "page": page,
-        "limit": limit,
-        "pages": pages
-    }
+def get_comunas_ranking(
+    zona: Optional[str] = None,
+    base: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None,
+    mes: Optional[int] = None,
+    anio: Optional[int] = None,
+    limit: Optional[int] = None,
+    min_total: int = 5,
+) -> List[Dict[str, Any]]:
+    """Get the comunas ranked by problems (mal ejecutados + disconformes + no cumple norma)."""
+    df = load_data()
+    if df.empty or 'comuna' not in df.columns or 'resultado_inspeccion' not in df.columns:
+        return []
+
+    df = _filter_stats_data(df, zona, base, fecha_desde, fecha_hasta, mes, anio)
+    comunas = get_comuna_aggregates(df, min_total)
+
+    if limit:
+        comunas = comunas.nlargest(limit, 'score_problemas', keep='first')
+    else:
+        comunas = comunas.sort_values('score_problemas', ascending=False, kind='stable')
+    return _comuna_records(comunas)
 
 
+def get_monthly_aggregates(cells: pd.DataFrame) -> pd.DataFrame:
+    """Per-month totals of the classification flags, summed from stats cube cells."""
+    cells_with_date = cells[cells['dia'].notna()]
+    periodo = cells_with_date['dia'].dt.to_period('M')
+    return cells_with_date.groupby(periodo).agg(
+        total=('total', 'sum'),
+        efectivas=('es_efectiva', 'sum'),
+        bien=('es_bien', 'sum'),
+        conformes=('es_conforme', 'sum'),
+        disconformes=('es_disconforme', 'sum'),
+        cumple_cc=('cumple_cc', 'sum'),
+        no_cumple_cc=('no_cumple_cc', 'sum'),
+    ).sort_index()
+
+
+@cached_stats("nncc", ["nncc"])
 def get_stats(
     zona: Optional[str] = None,
     base: Optional[str] = None,
@@ -200,8 +480,13 @@ def get_stats(
     fecha_hasta: Optional[str] = None,
     mes: Optional[int] = None,
     anio: Optional[int] = None,
+    detail: bool = True,
 ) -> Dict[str, Any]:
-    """Get aggregated statistics for NNCC inspections with optional filters."""
+    """Get aggregated statistics for NNCC inspections with optional filters.
+
+    With `detail=False` the rankings by inspector and comuna (computed over
+    the rows, not the cube) are left empty.
+    """
     df = load_data()
 
     empty_response = {
@@ -236,102 +521,67 @@ def get_stats(
     if df.empty:
         return empty_response
 
-    # Apply filters
-    mask = pd.Series([True] * len(df))
-
-    if zona and 'zona' in df.columns:
-        mask &= df['zona'].str.upper() == zona.upper()
-
-    if base and 'base' in df.columns:
-        mask &= df['base'] == base
-
-    if fecha_desde and 'fecha_inspeccion' in df.columns:
-        mask &= df['fecha_inspeccion'] >= pd.to_datetime(fecha_desde)
-
-    if fecha_hasta and 'fecha_inspeccion' in df.columns:
-        mask &= df['fecha_inspeccion'] <= pd.to_datetime(fecha_hasta)
-
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
-
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
+    # Las medidas aditivas salen del cubo; los rankings por inspector y comuna, de las filas
+    cells = _stats_cells(df, zona, base, fecha_desde, fecha_hasta, mes, anio)
+    sums = cells.drop(columns=CUBE_DIMENSIONS + ['dia'], errors='ignore').sum()
+    total = int(sums['total'])
 
-    df = df[mask].copy()
-
-    if df.empty:
+    if total == 0:
         return empty_response
 
+    df_filtered = None
+    if detail and ('inspector' in df.columns or 'comuna' in df.columns):
+        df_filtered = _filter_stats_data(df, zona, base, fecha_desde, fecha_hasta, mes, anio)
+
     # Efectividad
     efectivas = 0
     no_efectivas = 0
     if 'estado_efectividad' in df.columns:
-        efectivas = len(df[df['estado_efectividad'].str.contains('EFECTIVA', case=False, na=False) &
-                          ~df['estado_efectividad'].str.contains('NO EFECTIVA', case=False, na=False)])
-        no_efectivas = len(df[df['estado_efectividad'].str.contains('NO EFECTIVA', case=False, na=False)])
+        efectivas = int(sums['es_efectiva'])
+        no_efectivas = int(sums['es_no_efectiva'])
 
     # Resultado inspección
     bien_ejecutados = 0
     mal_ejecutados = 0
     if 'resultado_inspeccion' in df.columns:
-        bien_ejecutados = len(df[df['resultado_inspeccion'].str.contains('BIEN', case=False, na=False)])
-        mal_ejecutados = len(df[df['resultado_inspeccion'].str.contains('MAL', case=False, na=False)])
+        bien_ejecutados = int(sums['es_bien'])
+        mal_ejecutados = int(sums['es_mal'])
 
     # Tasa de efectividad
-    total = len(df)
     tasa_efectividad = (efectivas / total * 100) if total > 0 else 0
 
     # Por zona
     por_zona = {}
     if 'zona' in df.columns:
-        por_zona = df['zona'].value_counts().to_dict()
+        por_zona = {k: int(v) for k, v in ordered_totals(cells, 'zona').items()}
 
     # Por inspector (top 10)
     por_inspector = []
-    if 'inspector' in df.columns:
-        inspector_counts = df['inspector'].value_counts().head(10)
-        for inspector, count in inspector_counts.items():
-            if inspector and inspector.strip():
-                inspector_df = df[df['inspector'] == inspector]
-                efectivas_insp = len(inspector_df[inspector_df['estado_efectividad'].str.contains('EFECTIVA', case=False, na=False) &
-                                                   ~inspector_df['estado_efectividad'].str.contains('NO EFECTIVA', case=False, na=False)])
-                tasa = (efectivas_insp / count * 100) if count > 0 else 0
-                por_inspector.append({
-                    "inspector": inspector,
-                    "cantidad": int(count),
-                    "efectividad": round(tasa, 1)
-                })
+    if detail and 'inspector' in df.columns:
+        por_inspector = _inspector_records(_inspector_metrics(df_filtered).head(10))
+
+    # Agregados mensuales: un solo groupby para por_mes y evolucion_mensual
+    monthly = get_monthly_aggregates(cells)
 
     # Por mes
     por_mes = []
-    if 'fecha_inspeccion' in df.columns:
-        df_with_date = df[df['fecha_inspeccion'].notna()].copy()
-        if not df_with_date.empty:
-            df_with_date['mes'] = df_with_date['fecha_inspeccion'].dt.to_period('M')
-            monthly = df_with_date.groupby('mes').agg({
-                'id': 'count'
-            }).reset_index()
-            monthly.columns = ['mes', 'cantidad']
-            monthly['mes'] = monthly['mes'].astype(str)
-
-            # Calcular efectividad por mes
-            for idx, row in monthly.iterrows():
-                mes_df = df_with_date[df_with_date['mes'].astype(str) == row['mes']]
-                efectivas_mes = len(mes_df[mes_df['estado_efectividad'].str.contains('EFECTIVA', case=False, na=False) &
-                                           ~mes_df['estado_efectividad'].str.contains('NO EFECTIVA', case=False, na=False)])
-                monthly.at[idx, 'efectividad'] = round((efectivas_mes / row['cantidad'] * 100), 1) if row['cantidad'] > 0 else 0
-
-            por_mes = monthly.tail(12).to_dict(orient='records')
+    for mes, row in monthly.tail(12).iterrows():
+        cantidad = int(row['total'])
+        por_mes.append({
+            "mes": str(mes),
+            "cantidad": cantidad,
+            "efectividad": round((int(row['efectivas']) / cantidad * 100), 1) if cantidad > 0 else 0,
+        })
 
     # Con multa
     con_multa = 0
     if 'multa' in df.columns:
-        con_multa = len(df[df['multa'].str.upper() == 'SI'])
+        con_multa = int(sums['con_multa'])
 
     # Pendientes de normalizar
     pendientes_normalizar = 0
     if 'resultado_normalizacion' in df.columns:
-        pendientes_normalizar = len(df[df['resultado_normalizacion'].str.contains('PENDIENTE', case=False, na=False)])
+        pendientes_normalizar = int(sums['pendiente_normalizar'])
 
     # === CLIENT METRICS ===
 
@@ -339,112 +589,51 @@ def get_stats(
     # Valores: "cliente conforme", "cliente disconforme", "S/N", "#N/D", vacío (sin inspeccionar)
     cliente_conforme = {"conforme": 0, "disconforme": 0, "sin_dato": 0, "sin_inspeccionar": 0}
     if 'cliente_conforme' in df.columns:
-        col = df['cliente_conforme'].fillna('').str.upper().str.strip()
-        cliente_conforme["conforme"] = int(len(df[col.str.contains('CONFORME', na=False) & ~col.str.contains('DISCONFORME', na=False)]))
-        cliente_conforme["disconforme"] = int(len(df[col.str.contains('DISCONFORME', na=False)]))
-        cliente_conforme["sin_dato"] = int(len(df[col.isin(['S/N', '#N/D', 'S/N ', '#N/D '])]))
-        cliente_conforme["sin_inspeccionar"] = int(len(df[col == '']))
+        cliente_conforme["conforme"] = int(sums['es_conforme'])
+        cliente_conforme["disconforme"] = int(sums['es_disconforme'])
+        cliente_conforme["sin_dato"] = int(sums['conforme_sin_dato'])
+        cliente_conforme["sin_inspeccionar"] = int(sums['conforme_vacio'])
 
-    # Estado empalme (breakdown by category)
+    # Estado empalme (breakdown by category, normalizado al cargar)
     estado_empalme = {}
-    if 'estado_empalme' in df.columns:
-        # Reemplazar vacíos y valores nulos, normalizar texto
-        col = df['estado_empalme'].fillna('').astype(str).str.strip().str.upper()
-
-        # Normalizar valores
-        def normalize_empalme(val):
-            val = val.strip()
-            if val == '' or val == 'NAN':
-                return 'Sin Inspeccionar'
-            if val in ['#N/D', 'S/N', '#N/A', 'N/A']:
-                return 'Sin Dato'
-            if val in ['BUENO', 'BUEN', 'BIEN']:
-                return 'Bueno'
-            if val in ['MALO', 'MAL']:
-                return 'Malo'
-            if val in ['REGULAR']:
-                return 'Regular'
-            # Si es un número, ignorar
-            try:
-                float(val.replace('.', '').replace(',', ''))
-                return 'Sin Dato'
-            except:
-                pass
-            # Capitalizar para consistencia
-            return val.title()
-
-        col = col.apply(normalize_empalme)
-        counts = col.value_counts()
+    if 'estado_empalme_norm' in df.columns:
+        counts = ordered_totals(cells, 'estado_empalme_norm')
         estado_empalme = {str(k): int(v) for k, v in counts.items()}
 
     # Cumple norma código colores
     # Valores: "Cumple Norma CC", "No Cumple Norma CC", "S/N", "#N/D", vacío
     cumple_norma_cc = {"cumple": 0, "no_cumple": 0, "sin_dato": 0, "sin_inspeccionar": 0}
     if 'cumple_norma_cc' in df.columns:
-        col = df['cumple_norma_cc'].fillna('').str.upper().str.strip()
-        cumple_norma_cc["cumple"] = int(len(df[col.str.contains('CUMPLE', na=False) & ~col.str.contains('NO CUMPLE', na=False)]))
-        cumple_norma_cc["no_cumple"] = int(len(df[col.str.contains('NO CUMPLE', na=False)]))
-        cumple_norma_cc["sin_dato"] = int(len(df[col.isin(['S/N', '#N/D', 'S/N ', '#N/D '])]))
-        cumple_norma_cc["sin_inspeccionar"] = int(len(df[col == '']))
+        cumple_norma_cc["cumple"] = int(sums['cumple_cc'])
+        cumple_norma_cc["no_cumple"] = int(sums['no_cumple_cc'])
+        cumple_norma_cc["sin_dato"] = int(sums['cc_sin_dato'])
+        cumple_norma_cc["sin_inspeccionar"] = int(sums['cc_vacio'])
 
     # === EVOLUTION DATA (monthly trends) ===
     evolucion_mensual = []
-    if 'fecha_inspeccion' in df.columns:
-        df_with_date = df[df['fecha_inspeccion'].notna()].copy()
-        if not df_with_date.empty:
-            df_with_date['mes'] = df_with_date['fecha_inspeccion'].dt.to_period('M')
-            meses = sorted(df_with_date['mes'].unique())
-
-            for mes in meses:
-                mes_df = df_with_date[df_with_date['mes'] == mes]
-                mes_total = len(mes_df)
-
-                # Efectividad
-                mes_efectivas = len(mes_df[mes_df['estado_efectividad'].str.contains('EFECTIVA', case=False, na=False) &
-                                           ~mes_df['estado_efectividad'].str.contains('NO EFECTIVA', case=False, na=False)])
-                tasa_efect = round((mes_efectivas / mes_total * 100), 1) if mes_total > 0 else 0
-
-                # Bien ejecutados (sobre efectivas)
-                mes_bien = 0
-                if 'resultado_inspeccion' in mes_df.columns:
-                    mes_bien = len(mes_df[mes_df['resultado_inspeccion'].str.contains('BIEN', case=False, na=False)])
-                tasa_bien = round((mes_bien / mes_efectivas * 100), 1) if mes_efectivas > 0 else 0
-
-                # Cliente conforme (sobre los que tienen respuesta)
-                mes_conforme = 0
-                mes_con_respuesta_cliente = 0
-                if 'cliente_conforme' in mes_df.columns:
-                    col_cc = mes_df['cliente_conforme'].fillna('').str.upper().str.strip()
-                    mes_conforme = len(mes_df[col_cc.str.contains('CONFORME', na=False) & ~col_cc.str.contains('DISCONFORME', na=False)])
-                    mes_disconforme = len(mes_df[col_cc.str.contains('DISCONFORME', na=False)])
-                    mes_con_respuesta_cliente = mes_conforme + mes_disconforme
-                tasa_conforme = round((mes_conforme / mes_con_respuesta_cliente * 100), 1) if mes_con_respuesta_cliente > 0 else 0
-
-                # Cumple norma CC (sobre los que tienen respuesta)
-                mes_cumple = 0
-                mes_con_respuesta_cc = 0
-                if 'cumple_norma_cc' in mes_df.columns:
-                    col_ncc = mes_df['cumple_norma_cc'].fillna('').str.upper().str.strip()
-                    mes_cumple = len(mes_df[col_ncc.str.contains('CUMPLE', na=False) & ~col_ncc.str.contains('NO CUMPLE', na=False)])
-                    mes_no_cumple = len(mes_df[col_ncc.str.contains('NO CUMPLE', na=False)])
-                    mes_con_respuesta_cc = mes_cumple + mes_no_cumple
-                tasa_cumple_cc = round((mes_cumple / mes_con_respuesta_cc * 100), 1) if mes_con_respuesta_cc > 0 else 0
-
-                evolucion_mensual.append({
-                    "mes": str(mes),
-                    "total": mes_total,
-                    "efectivas": mes_efectivas,
-                    "efectividad": tasa_efect,
-                    "bien_ejecutados": mes_bien,
-                    "tasa_bien_ejecutado": tasa_bien,
-                    "cliente_conforme": mes_conforme,
-                    "tasa_conformidad": tasa_conforme,
-                    "cumple_norma_cc": mes_cumple,
-                    "tasa_cumple_cc": tasa_cumple_cc,
-                })
-
-            # Keep last 12 months
-            evolucion_mensual = evolucion_mensual[-12:]
+    for mes, row in monthly.tail(12).iterrows():
+        mes_total = int(row['total'])
+        mes_efectivas = int(row['efectivas'])
+        mes_bien = int(row['bien'])
+        mes_conforme = int(row['conformes'])
+        mes_con_respuesta_cliente = mes_conforme + int(row['disconformes'])
+        mes_cumple = int(row['cumple_cc'])
+        mes_con_respuesta_cc = mes_cumple + int(row['no_cumple_cc'])
+
+        evolucion_mensual.append({
+            "mes": str(mes),
+            "total": mes_total,
+            "efectivas": mes_efectivas,
+            "efectividad": round((mes_efectivas / mes_total * 100), 1) if mes_total > 0 else 0,
+            "bien_ejecutados": mes_bien,
+            # Bien ejecutados sobre efectivas
+            "tasa_bien_ejecutado": round((mes_bien / mes_efectivas * 100), 1) if mes_efectivas > 0 else 0,
+            "cliente_conforme": mes_conforme,
+            # Cliente conforme y norma CC sobre los que tienen respuesta
+            "tasa_conformidad": round((mes_conforme / mes_con_respuesta_cliente * 100), 1) if mes_con_respuesta_cliente > 0 else 0,
+            "cumple_norma_cc": mes_cumple,
+            "tasa_cumple_cc": round((mes_cumple / mes_con_respuesta_cc * 100), 1) if mes_con_respuesta_cc > 0 else 0,
+        })
 
     # === COMPARATIVAS (mes actual vs anterior) ===
     comparativas = {
@@ -487,48 +676,9 @@ def get_stats(
 
     # === TOP 5 COMUNAS PROBLEMÁTICAS ===
     top_comunas_problemas = []
-    if 'comuna' in df.columns and 'resultado_inspeccion' in df.columns:
-        # Calcular métricas por comuna
-        comunas_stats = []
-        for comuna in df['comuna'].dropna().unique():
-            comuna_df = df[df['comuna'] == comuna]
-            comuna_total = len(comuna_df)
-
-            if comuna_total < 5:  # Ignorar comunas con muy pocos datos
-                continue
-
-            # Mal ejecutados
-            comuna_mal = len(comuna_df[comuna_df['resultado_inspeccion'].str.contains('MAL', case=False, na=False)])
-            tasa_mal = round((comuna_mal / comuna_total * 100), 1) if comuna_total > 0 else 0
-
-            # Disconformes
-            comuna_disconf = 0
-            if 'cliente_conforme' in comuna_df.columns:
-                col_cc = comuna_df['cliente_conforme'].fillna('').str.upper().str.strip()
-                comuna_disconf = len(comuna_df[col_cc.str.contains('DISCONFORME', na=False)])
-
-            # No cumple norma
-            comuna_no_cumple = 0
-            if 'cumple_norma_cc' in comuna_df.columns:
-                col_ncc = comuna_df['cumple_norma_cc'].fillna('').str.upper().str.strip()
-                comuna_no_cumple = len(comuna_df[col_ncc.str.contains('NO CUMPLE', na=False)])
-
-            # Score de problemas (ponderado)
-            score_problemas = comuna_mal + comuna_disconf + comuna_no_cumple
-
-            comunas_stats.append({
-                "comuna": str(comuna),
-                "total": comuna_total,
-                "mal_ejecutados": comuna_mal,
-                "tasa_mal_ejecutado": tasa_mal,
-                "disconformes": comuna_disconf,
-                "no_cumple_norma": comuna_no_cumple,
-                "score_problemas": score_problemas
-            })
-
-        # Ordenar por score de problemas y tomar top 5
-        comunas_stats.sort(key=lambda x: x["score_problemas"], reverse=True)
-        top_comunas_problemas = comunas_stats[:5]
+    if detail and 'comuna' in df.columns and 'resultado_inspeccion' in df.columns:
+        comunas = get_comuna_aggregates(df_filtered)
+        top_comunas_problemas = _comuna_records(comunas.nlargest(5, 'score_problemas', keep='first'))
 
     # === INSIGHTS AUTOMÁTICOS ===
     insights = []
@@ -619,6 +769,12 @@ def get_stats(
     }
 
 
+def get_summary() -> Dict[str, Any]:
+    """Get the NNCC KPIs shown in the dashboard summary."""
+    stats = get_stats(detail=False)
+    return {key: stats[key] for key in SUMMARY_KEYS}
+
+
 def get_comunas() -> List[str]:
     """Get list of unique comunas."""
     df = load_data()
@@ -641,22 +797,22 @@ def get_inspectors() -> List[Dict[str, Any]]:
     if 'inspector' not in df.columns:
         return []
 
-    inspectors = []
-    inspector_counts = df['inspector'].value_counts()
-
-    for inspector, count in inspector_counts.items():
-        if inspector and inspector.strip():
-            inspector_df = df[df['inspector'] == inspector]
-            efectivas_insp = len(inspector_df[inspector_df['estado_efectividad'].str.contains('EFECTIVA', case=False, na=False) &
-                                               ~inspector_df['estado_efectividad'].str.contains('NO EFECTIVA', case=False, na=False)])
-            tasa = (efectivas_insp / count * 100) if count > 0 else 0
-            inspectors.append({
-                "inspector": inspector,
-                "cantidad": int(count),
-                "efectividad": round(tasa, 1)
-            })
+    return _inspector_records(_inspector_metrics(df))
+
 
-    return inspectors
+def _inspector_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    return group_metrics(df, 'inspector', {'efectivas': df['es_efectiva']})
+
+
+def _inspector_records(metrics: pd.DataFrame) -> List[Dict[str, Any]]:
+    return [
+        {
+            "inspector": inspector,
+            "cantidad": int(row['cantidad']),
+            "efectividad": rate(int(row['efectivas']), int(row['cantidad'])),
+        }
+        for inspector, row in metrics.iterrows()
+    ]
 
 
 def get_bases() -> List[str]:
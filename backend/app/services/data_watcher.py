@@ -0,0 +1,105 @@
+"""
+Vigilancia de los archivos fuente de cada modulo.
+
+Un hilo en segundo plano revisa periodicamente el tamano y mtime de los CSV
+de cada dataset del registro y recarga solo el dataset cuyos archivos
+cambiaron. Los loaders construyen el DataFrame nuevo completo antes de
+reemplazar el del registro, asi que las requests siguen usando los datos
+anteriores hasta que la recarga termina.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from ..core.config import settings
+# Importar los servicios registra sus datasets en el registro
+from . import data_service, lecturas_service, teleco_service, calidad_service, corte_service  # noqa: F401
+from .dataset_registry import registry
+
+# (path, size, mtime_ns) de cada archivo fuente
+Signature = Tuple[Tuple[str, Optional[int], Optional[int]], ...]
+
+
+def get_signature(paths: List[str]) -> Signature:
+    """Get the size/mtime signature of a list of files."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+class DataWatcher:
+    """Poll source files and hot reload the datasets whose files changed."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._signatures: Dict[str, Signature] = {}
+        self._pending: Dict[str, Signature] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._signatures = {
+            name: get_signature(registry.sources(name))
+            for name in registry.names()
+        }
+        self._pending = {}
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+        self._thread.start()
+        print(f"Data watcher started (interval {self.interval}s)")
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def acknowledge(self, name: str) -> None:
+        """Take the current source files of a dataset as loaded (the app itself just rewrote them)."""
+        self._signatures[name] = get_signature(registry.sources(name))
+        self._pending.pop(name, None)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.check_once()
+
+    def check_once(self) -> List[str]:
+        """Check every dataset once and reload the changed ones. Returns the reloaded datasets."""
+        reloaded = []
+
+        for name in registry.names():
+            current = get_signature(registry.sources(name))
+
+            if current == self._signatures.get(name):
+                self._pending.pop(name, None)
+                continue
+
+            # Esperar a que la firma se mantenga estable entre dos revisiones
+            # para no leer un archivo que aun se esta copiando
+            if self._pending.get(name) != current:
+                self._pending[name] = current
+                continue
+
+            print(f"Source files changed for {name}, reloading...")
+            try:
+                registry.reload(name)
+                reloaded.append(name)
+            except Exception as e:
+                print(f"Error reloading {name}: {e}")
+            # Aun si la recarga falla, no reintentar hasta el proximo cambio
+            self._signatures[name] = current
+            self._pending.pop(name, None)
+
+        return reloaded
+
+
+data_watcher = DataWatcher(interval=settings.DATA_WATCH_INTERVAL)
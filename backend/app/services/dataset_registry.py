@@ -0,0 +1,207 @@
+"""
+Registro central de datasets.
+
+Cada servicio registra sus datasets con una funcion de carga y la lista de
+archivos fuente. El registro es el unico dueno de los DataFrames en memoria:
+los carga de forma lazy en el primer acceso (o por adelantado con `prewarm`),
+y guarda para cada uno un numero de version, la hora de carga y la memoria
+que ocupa.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Any
+
+import pandas as pd
+
+from ..utils.frame_cache import frame_token
+from ..utils.snapshot import snapshot_token
+
+
+class DatasetState:
+    """Immutable snapshot of a loaded dataset."""
+
+    def __init__(self, df: pd.DataFrame, version: int, load_seconds: float):
+        self.df = df
+        self.version = version
+        self.loaded_at = datetime.now()
+        self.load_seconds = load_seconds
+        self.memory_bytes = int(df.memory_usage(deep=True).sum())
+
+
+class Dataset:
+    """A registered dataset: how to load it and its current state."""
+
+    def __init__(self, name: str, loader: Callable[[], pd.DataFrame], sources: Callable[[], List[str]]):
+        self.name = name
+        self.loader = loader
+        self.sources = sources
+        self.lock = threading.Lock()
+        self.state: Optional[DatasetState] = None
+        self.version = 0
+
+
+class DatasetRegistry:
+    """Own every dataset in memory and track version, load time and memory."""
+
+    def __init__(self):
+        self._datasets: Dict[str, Dataset] = {}
+        self._ready = threading.Event()
+        self._listeners: List[Callable[[str], None]] = []
+
+    def register(self, name: str, loader: Callable[[], pd.DataFrame], sources: Callable[[], List[str]]) -> None:
+        """Register a dataset loader and the function that lists its source files."""
+        self._datasets[name] = Dataset(name, loader, sources)
+
+    def on_change(self, callback: Callable[[str], None]) -> None:
+        """Call `callback(name)` every time a dataset gets a new version."""
+        self._listeners.append(callback)
+
+    def _notify(self, name: str) -> None:
+        for callback in self._listeners:
+            try:
+                callback(name)
+            except Exception as e:
+                print(f"Error notifying change of {name}: {e}")
+
+    def names(self) -> List[str]:
+        return list(self._datasets.keys())
+
+    def sources(self, name: str) -> List[str]:
+        return self._datasets[name].sources()
+
+    def get(self, name: str, force_reload: bool = False) -> pd.DataFrame:
+        """Get a dataset, loading it on first access."""
+        dataset = self._datasets[name]
+
+        state = dataset.state
+        if state is not None and not force_reload:
+            return state.df
+
+        with dataset.lock:
+            # Otro hilo pudo haberlo cargado mientras esperabamos el lock
+            if dataset.state is not None and dataset.state is not state:
+                return dataset.state.df
+            return self._load(dataset)
+
+    def reload(self, name: str) -> pd.DataFrame:
+        """Force reload of a dataset from its source files."""
+        dataset = self._datasets[name]
+        with dataset.lock:
+            return self._load(dataset)
+
+    def replace(self, name: str, df: pd.DataFrame) -> int:
+        """Atomically swap in an already loaded DataFrame. Returns the new version."""
+        dataset = self._datasets[name]
+        with dataset.lock:
+            dataset.version += 1
+            dataset.state = DatasetState(df, dataset.version, 0.0)
+        self._notify(name)
+        return dataset.version
+
+    def _load(self, dataset: Dataset) -> pd.DataFrame:
+        start = time.perf_counter()
+        df = dataset.loader()
+
+        # Un DataFrame vacio indica que falta el archivo fuente: no se guarda,
+        # asi el proximo acceso vuelve a intentar la carga
+        if df.empty:
+            return df
+
+        dataset.version += 1
+        dataset.state = DatasetState(df, dataset.version, time.perf_counter() - start)
+        self._notify(dataset.name)
+        return df
+
+    def current(self, name: str) -> Optional[pd.DataFrame]:
+        """Get the DataFrame in memory of a dataset without loading it (None if not loaded)."""
+        state = self._datasets[name].state
+        return state.df if state is not None else None
+
+    def is_loaded(self, name: str) -> bool:
+        return self._datasets[name].state is not None
+
+    def version(self, name: str) -> int:
+        """Get the version of a dataset (0 if never loaded)."""
+        state = self._datasets[name].state
+        return state.version if state is not None else 0
+
+    def token(self, name: str) -> Optional[str]:
+        """Get an id of the data in memory of a dataset (None if not loaded yet).
+
+        Unlike the version, it identifies the data across restarts: the token of
+        the snapshot it was read from, else a random id of the DataFrame. A
+        dataset without source files has the fixed token "missing".
+        """
+        df = self.current(name)
+        if df is None:
+            # Sin archivos fuente el dataset queda vacio hasta que aparezcan: ese
+            # estado no cambia con la carga, asi que tambien tiene su id
+            if not any(os.path.exists(path) for path in self.sources(name)):
+                return "missing"
+            return None
+        return snapshot_token(df) or frame_token(df)
+
+    def prewarm(self, names: Optional[List[str]] = None, max_workers: int = 4) -> None:
+        """Load the given datasets (all by default) concurrently and mark the registry ready."""
+        names = names or self.names()
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prewarm") as pool:
+            futures = {pool.submit(self.get, name): name for name in names}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error loading dataset {futures[future]}: {e}")
+
+        print(f"Prewarmed {len(names)} datasets in {time.perf_counter() - start:.1f}s")
+        self._ready.set()
+
+    def start_prewarm(self, max_workers: int = 4) -> threading.Thread:
+        """Run prewarm in a background thread so the app can start serving."""
+        thread = threading.Thread(
+            target=self.prewarm,
+            kwargs={"max_workers": max_workers},
+            name="dataset-prewarm",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
+    def mark_ready(self) -> None:
+        self._ready.set()
+
+    def is_ready(self) -> bool:
+        """True once the startup prewarm finished."""
+        return self._ready.is_set()
+
+    def memory_usage(self) -> Dict[str, int]:
+        """Get the memory used by each loaded dataset, in bytes."""
+        return {
+            name: dataset.state.memory_bytes
+            for name, dataset in self._datasets.items()
+            if dataset.state is not None
+        }
+
+    def info(self) -> List[Dict[str, Any]]:
+        """Get load status, version, load time and memory of every dataset."""
+        result = []
+        for name, dataset in self._datasets.items():
+            state = dataset.state
+            result.append({
+                "name": name,
+                "loaded": state is not None,
+                "version": state.version if state is not None else 0,
+                "records": len(state.df) if state is not None else 0,
+                "loaded_at": state.loaded_at.isoformat() if state is not None else None,
+                "load_seconds": round(state.load_seconds, 3) if state is not None else None,
+                "memory_bytes": state.memory_bytes if state is not None else 0,
+            })
+        return result
+
+
+registry = DatasetRegistry()
@@ -7,66 +7,114 @@ import pandas as pd
 import os
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-
-# Global dataframe cache
-_df_lecturas_cache: Optional[pd.DataFrame] = None
+from ..utils.snapshot import read_snapshot, write_snapshot
+from ..utils.append_ingest import read_appended, apply_appended, source_layout
+from ..utils.source_files import resolve_source, read_source
+from ..core.config import settings
+from ..utils.categorical import to_categorical, match_contains, count_values
+from ..utils.filter_index import FilterIndex, filter_mask
+from ..utils.frame_cache import get_cached
+from ..utils.search_index import get_search_index
+from ..utils.group_metrics import group_metrics, rate
+from ..utils.records import frame_records
+from ..utils.sort_index import paginate, warm_on_change
+from .dataset_registry import registry
+from .result_cache import cached_stats
 
 # Meta de cumplimiento de plazos
 META_CUMPLIMIENTO_PLAZO = 90
 
+# Archivos de lecturas (ORDENES, SEC, VIRTUAL VISIT, VISITA VIRTUAL)
+LECTURAS_FILENAMES = [
+    "informe_lectura_ORDENES_ORDENES.csv",
+    "informe_lectura_SEC_SEC.csv",
+    "informe_lectura_VIRTUAL_VIRTUAL VISIT.csv",
+    "informe_lectura_VIRTUAL_VISITA VIRTUAL.csv",
+]
+
+# Origen de los registros de cada archivo
+LECTURAS_ORIGENES = ['ORDENES', 'SEC', 'VISITA VIRTUAL', 'VISITA VIRTUAL']
+
+# Columnas de baja cardinalidad que se guardan como categoricas
+CATEGORICAL_COLUMNS = [
+    'inspector', 'hallazgo', 'estado_plazo', 'estado_general', 'sector', 'comuna',
+    'submotivo', 'canal_entrada', 'gestion', 'origen',
+]
+
+# Columnas donde busca el parametro `search` (indice invertido)
+SEARCH_COLUMNS = ['cliente', 'nombre', 'comuna', 'inspector', 'medidor', 'direccion', 'orden']
+
+# Columnas con filtros de igualdad (indice bitmap)
+FILTER_COLUMNS = ['sector', 'origen', 'comuna', 'mes', 'anio']
+
+# Filtros que se aplican sobre el rollup diario de la evolucion
+ROLLUP_FILTER_COLUMNS = ['sector', 'origen', 'mes', 'anio']
+
+# Ventanas (en dias) disponibles para la evolucion diaria
+EVOLUCION_DIAS = [7, 30, 90, 365]
+
+# Claves de get_lecturas_stats que muestra el resumen del dashboard
+SUMMARY_KEYS = [
+    'total', 'inspeccionadas', 'pendientes', 'tasa_inspeccion', 'en_plazo', 'fuera_plazo',
+    'tasa_cumplimiento_plazo', 'dias_respuesta_promedio', 'por_origen', 'por_hallazgo', 'comparativas',
+]
+
+
+def get_lecturas_source_files() -> List[str]:
+    """Get the source CSV paths for Lecturas."""
+    return [resolve_source(os.path.join(settings.DATA_DIR, filename)) for filename in LECTURAS_FILENAMES]
+
 
 def load_lecturas_data(force_reload: bool = False) -> pd.DataFrame:
     """Load CSV data for Lecturas into a pandas DataFrame with caching."""
-    global _df_lecturas_cache
+    return registry.get("lecturas", force_reload=force_reload)
 
-    if _df_lecturas_cache is not None and not force_reload:
-        return _df_lecturas_cache
 
-    base_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-        "data"
-    )
+def _read_lecturas() -> pd.DataFrame:
+    """Read, combine and normalize the Lecturas CSVs (or their snapshot)."""
+    sources = get_lecturas_source_files()
 
-    # Archivos de lecturas
-    ordenes_path = os.path.join(base_path, "informe_lectura_ORDENES_ORDENES.csv")
-    sec_path = os.path.join(base_path, "informe_lectura_SEC_SEC.csv")
-    virtual_visit_path = os.path.join(base_path, "informe_lectura_VIRTUAL_VIRTUAL VISIT.csv")
-    visita_virtual_path = os.path.join(base_path, "informe_lectura_VIRTUAL_VISITA VIRTUAL.csv")
+    snapshot = read_snapshot("lecturas", sources)
+    if snapshot is not None:
+        return snapshot
 
-    dfs = []
+    # Si los CSV solo crecieron, normalizar solo las filas nuevas
+    current = registry.current("lecturas")
+    appended = read_appended("lecturas", sources, current, encoding='utf-8', low_memory=False)
+    if appended is not None:
+        return apply_appended("lecturas", sources, appended, current, _normalize_lecturas, 'id')
 
-    # Cargar ORDENES
-    if os.path.exists(ordenes_path):
-        df_ordenes = pd.read_csv(ordenes_path, encoding='utf-8', low_memory=False)
-        df_ordenes['origen'] = 'ORDENES'
-        dfs.append(df_ordenes)
-        print(f"Loaded ORDENES: {len(df_ordenes)} records")
-
-    # Cargar SEC
-    if os.path.exists(sec_path):
-        df_sec = pd.read_csv(sec_path, encoding='utf-8', low_memory=False)
-        df_sec['origen'] = 'SEC'
-        dfs.append(df_sec)
-        print(f"Loaded SEC: {len(df_sec)} records")
-
-    # Cargar VIRTUAL VISIT
-    if os.path.exists(virtual_visit_path):
-        df_vv = pd.read_csv(virtual_visit_path, encoding='utf-8', low_memory=False)
-        df_vv['origen'] = 'VISITA VIRTUAL'
-        dfs.append(df_vv)
-        print(f"Loaded VIRTUAL VISIT: {len(df_vv)} records")
-
-    # Cargar VISITA VIRTUAL
-    if os.path.exists(visita_virtual_path):
-        df_visita = pd.read_csv(visita_virtual_path, encoding='utf-8', low_memory=False)
-        df_visita['origen'] = 'VISITA VIRTUAL'
-        dfs.append(df_visita)
-        print(f"Loaded VISITA VIRTUAL: {len(df_visita)} records")
+    frames = []
+    for path in sources:
+        if not os.path.exists(path):
+            frames.append(None)
+            continue
+        frame = read_source(path, encoding='utf-8', low_memory=False)
+        print(f"Loaded {os.path.basename(path)}: {len(frame)} records")
+        frames.append(frame)
 
-    if not dfs:
+    if all(frame is None for frame in frames):
         print("No data files found for Lecturas")
-        _df_lecturas_cache = pd.DataFrame()
-        return _df_lecturas_cache
+        return pd.DataFrame()
+
+    layout = source_layout(frames)
+    df = _normalize_lecturas(frames)
+
+    df = write_snapshot("lecturas", sources, df, layout)
+    print(f"Total Lecturas loaded: {len(df)} records")
+    return df
+
+
+def _normalize_lecturas(frames: List[Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """Combine the raw Lecturas files (one per source, None if missing) and normalize them."""
+    dfs = []
+    for frame, origen in zip(frames, LECTURAS_ORIGENES):
+        if frame is not None:
+            frame['origen'] = origen
+            dfs.append(frame)
+
+    if not dfs:
+        return pd.DataFrame()
 
     # Combinar DataFrames
     df = pd.concat(dfs, ignore_index=True)
@@ -175,11 +223,16 @@ def load_lecturas_data(force_reload: bool = False) -> pd.DataFrame:
     if 'fecha_inspeccion' in df.columns:
         df['inspeccionado'] = df['fecha_inspeccion'].notna()
 
-    _df_lecturas_cache = df
-    print(f"Total Lecturas loaded: {len(df)} records")
+    df = to_categorical(df, CATEGORICAL_COLUMNS)
+
     return df
 
 
+registry.register("lecturas", _read_lecturas, get_lecturas_source_files)
+# Orden por defecto del listado, listo antes del primer request
+warm_on_change(registry, "lecturas", ["fecha_ingreso"])
+
+
 def get_lecturas_filtered_data(
     search: Optional[str] = None,
     sector: Optional[str] = None,
@@ -195,7 +248,8 @@ def get_lecturas_filtered_data(
     page: int = 1,
     limit: int = 50,
     sort_by: str = "fecha_ingreso",
-    order: str = "desc"
+    order: str = "desc",
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Get filtered and paginated Lecturas data."""
     df = load_lecturas_data()
@@ -206,37 +260,30 @@ def get_lecturas_filtered_data(
             "total": 0,
             "page": page,
             "limit": limit,
-            "pages": 0
+            "pages": 0,
+            "next_cursor": None
         }
 
     # Apply filters
-    mask = pd.Series([True] * len(df))
+    mask = filter_mask(df, FILTER_COLUMNS, {
+        'sector': sector,
+        'origen': origen,
+        'comuna': comuna,
+        'mes': mes,
+        'anio': anio,
+    })
 
     if search:
-        search_mask = pd.Series([False] * len(df))
-        search_cols = ['cliente', 'nombre', 'comuna', 'inspector', 'medidor', 'direccion', 'orden']
-        for col in search_cols:
-            if col in df.columns:
-                search_mask |= df[col].astype(str).str.contains(search, case=False, na=False)
-        mask &= search_mask
-
-    if sector and 'sector' in df.columns:
-        mask &= df['sector'].str.upper() == sector.upper()
+        mask &= get_search_index(df, SEARCH_COLUMNS).search(search)
 
     if inspector and 'inspector' in df.columns:
-        mask &= df['inspector'].str.contains(inspector, case=False, na=False)
+        mask &= match_contains(df['inspector'], inspector)
 
     if estado_plazo and 'estado_plazo' in df.columns:
-        mask &= df['estado_plazo'].str.contains(estado_plazo, case=False, na=False)
+        mask &= match_contains(df['estado_plazo'], estado_plazo)
 
     if hallazgo and 'hallazgo' in df.columns:
-        mask &= df['hallazgo'].str.contains(hallazgo, case=False, na=False)
-
-    if origen and 'origen' in df.columns:
-        mask &= df['origen'].str.upper() == origen.upper()
-
-    if comuna and 'comuna' in df.columns:
-        mask &= df['comuna'].str.upper() == comuna.upper()
+        mask &= match_contains(df['hallazgo'], hallazgo)
 
     if fecha_desde and 'fecha_ingreso' in df.columns:
         mask &= df['fecha_ingreso'] >= pd.to_datetime(fecha_desde)
@@ -244,29 +291,9 @@ def get_lecturas_filtered_data(
     if fecha_hasta and 'fecha_ingreso' in df.columns:
         mask &= df['fecha_ingreso'] <= pd.to_datetime(fecha_hasta)
 
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
-
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
-
-    filtered_df = df[mask].copy()
-
-    # Sort
-    if sort_by in filtered_df.columns:
-        filtered_df = filtered_df.sort_values(
-            by=sort_by,
-            ascending=(order == "asc"),
-            na_position='last'
-        )
-
-    # Paginate
-    total = len(filtered_df)
-    pages = (total + limit - 1) // limit
-    start = (page - 1) * limit
-    end = start + limit
-
-    paginated_df = filtered_df.iloc[start:end]
+    # Pagina sobre el orden precalculado de sort_by: sin copiar ni ordenar las filas filtradas
+    result_page = paginate(df, mask, sort_by, order, page, limit, cursor)
+    paginated_df = df.iloc[result_page.positions]
 
     # Seleccionar columnas para la respuesta
     output_cols = ['id', 'orden', 'cliente', 'nombre', 'direccion', 'comuna', 'sector',
@@ -275,25 +302,110 @@ def get_lecturas_filtered_data(
                    'canal_entrada', 'gestion', 'origen', 'dias_respuesta']
     output_cols = [c for c in output_cols if c in paginated_df.columns]
 
-    items = paginated_df[output_cols].to_dict(orient='records')
-
-    # Format dates for JSON
-    for item in items:
-        for key, value in item.items():
-            if isinstance(value, pd.Timestamp):
-                item[key] = value.strftime('%Y-%m-%d') if pd.notna(value) else None
-            elif pd.isna(value):
-                item[key] = None
+    # Fechas como YYYY-MM-DD, nulos como None
+    items = frame_records(paginated_df[output_cols])
 
     return {
         "items": items,
-        "total": total,
-        "page": page,
+        "total": result_page.total,
+        "page": result_page.page,
         "limit": limit,
-        "pages": pages
+        "pages": result_page.pages,
+        "next_cursor": result_page.next_cursor
     }
 
 
+def _filter_stats_data(
+    df: pd.DataFrame,
+    sector: Optional[str] = None,
+    origen: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None,
+    mes: Optional[int] = None,
+    anio: Optional[int] = None,
+) -> pd.DataFrame:
+    """Apply the stats filters (sector, origen, fecha_ingreso range, mes, anio)."""
+    mask = filter_mask(df, FILTER_COLUMNS, {'sector': sector, 'origen': origen, 'mes': mes, 'anio': anio})
+
+    if fecha_desde and 'fecha_ingreso' in df.columns:
+        mask &= df['fecha_ingreso'] >= pd.to_datetime(fecha_desde)
+
+    if fecha_hasta and 'fecha_ingreso' in df.columns:
+        mask &= df['fecha_ingreso'] <= pd.to_datetime(fecha_hasta)
+
+    return df[mask]
+
+
+def _build_daily_rollup(df: pd.DataFrame) -> pd.DataFrame:
+    """Orders and inspected orders per day of fecha_ingreso, sector and origen, in one groupby."""
+    df_with_date = df[df['fecha_ingreso'].notna()]
+    dia = df_with_date['fecha_ingreso'].dt.normalize().rename('dia')
+    keys = [dia] + [df_with_date[col] for col in ('sector', 'origen') if col in df_with_date.columns]
+
+    if 'fecha_inspeccion' in df_with_date.columns:
+        inspeccionada = df_with_date['fecha_inspeccion'].notna()
+    else:
+        inspeccionada = pd.Series(False, index=df_with_date.index)
+
+    rollup = inspeccionada.groupby(keys, observed=True).agg(total='size', inspeccionadas='sum').reset_index()
+    rollup['mes'] = rollup['dia'].dt.month
+    rollup['anio'] = rollup['dia'].dt.year
+    return rollup
+
+
+class DailyRollup:
+    """Daily rollup of a Lecturas DataFrame plus the filter index of its rows.
+
+    The index is built here and not through `filter_mask`: the rollup lives in
+    the frame_cache of the source DataFrame and must not get entries of its own.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.frame = _build_daily_rollup(df)
+        self.index = FilterIndex(self.frame, ROLLUP_FILTER_COLUMNS)
+
+    def filtered(self, filters: Dict[str, Any]) -> pd.DataFrame:
+        return self.frame[self.index.mask(filters)]
+
+
+def get_daily_rollup(df: pd.DataFrame) -> DailyRollup:
+    """Get the daily rollup of a Lecturas DataFrame (built once per loaded version)."""
+    return get_cached(df, "lecturas:daily", DailyRollup)
+
+
+def get_lecturas_evolucion(
+    sector: Optional[str] = None,
+    origen: Optional[str] = None,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None,
+    mes: Optional[int] = None,
+    anio: Optional[int] = None,
+    dias: int = 30,
+) -> List[Dict[str, Any]]:
+    """Get total and inspected orders for the last `dias` days with data."""
+    df = load_lecturas_data()
+    if df.empty or 'fecha_ingreso' not in df.columns:
+        return []
+
+    if fecha_desde or fecha_hasta:
+        # Un rango de fechas puede cortar a mitad de dia: se agrupa el subconjunto filtrado
+        rollup = _build_daily_rollup(_filter_stats_data(df, sector, origen, fecha_desde, fecha_hasta, mes, anio))
+    else:
+        rollup = get_daily_rollup(df).filtered({
+            'sector': sector,
+            'origen': origen,
+            'mes': mes,
+            'anio': anio,
+        })
+
+    daily = rollup.groupby('dia')[['total', 'inspeccionadas']].sum().tail(dias)
+    return [
+        {"dia": dia.strftime('%Y-%m-%d'), "total": int(row['total']), "inspeccionadas": int(row['inspeccionadas'])}
+        for dia, row in daily.iterrows()
+    ]
+
+
+@cached_stats("lecturas", ["lecturas"])
 def get_lecturas_stats(
     sector: Optional[str] = None,
     origen: Optional[str] = None,
@@ -301,8 +413,13 @@ def get_lecturas_stats(
     fecha_hasta: Optional[str] = None,
     mes: Optional[int] = None,
     anio: Optional[int] = None,
+    dias: int = 30,
+    detail: bool = True,
 ) -> Dict[str, Any]:
-    """Get aggregated statistics for Lecturas."""
+    """Get aggregated statistics for Lecturas (daily evolution over the last `dias` days).
+
+    With `detail=False` the secondary breakdowns and the daily evolution are left empty.
+    """
     df = load_lecturas_data()
 
     empty_response = {
@@ -335,28 +452,7 @@ def get_lecturas_stats(
     if df.empty:
         return empty_response
 
-    # Apply filters
-    mask = pd.Series([True] * len(df))
-
-    if sector and 'sector' in df.columns:
-        mask &= df['sector'].str.upper() == sector.upper()
-
-    if origen and 'origen' in df.columns:
-        mask &= df['origen'].str.upper() == origen.upper()
-
-    if fecha_desde and 'fecha_ingreso' in df.columns:
-        mask &= df['fecha_ingreso'] >= pd.to_datetime(fecha_desde)
-
-    if fecha_hasta and 'fecha_ingreso' in df.columns:
-        mask &= df['fecha_ingreso'] <= pd.to_datetime(fecha_hasta)
-
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
-
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
-
-    df = df[mask].copy()
+    df = _filter_stats_data(df, sector, origen, fecha_desde, fecha_hasta, mes, anio)
 
     if df.empty:
         return empty_response
@@ -398,85 +494,59 @@ def get_lecturas_stats(
     # Por Hallazgo
     por_hallazgo = []
     if 'hallazgo' in df.columns:
-        hallazgos = df[df['hallazgo'] != '']['hallazgo'].value_counts()
+        hallazgos = count_values(df[df['hallazgo'] != '']['hallazgo'])
         for h, c in hallazgos.items():
             por_hallazgo.append({"hallazgo": h, "cantidad": int(c)})
 
     # Por Estado General
     por_estado_general = []
-    if 'estado_general' in df.columns:
-        estados = df[df['estado_general'] != '']['estado_general'].value_counts()
+    if detail and 'estado_general' in df.columns:
+        estados = count_values(df[df['estado_general'] != '']['estado_general'])
         for e, c in estados.items():
             por_estado_general.append({"estado": e, "cantidad": int(c)})
 
     # Por Inspector
     por_inspector = []
-    if 'inspector' in df.columns:
-        df_insp = df[df['inspector'] != '']
-        inspector_counts = df_insp['inspector'].value_counts().head(10)
-        for inspector, count in inspector_counts.items():
-            inspector_df = df_insp[df_insp['inspector'] == inspector]
-            en_plazo_insp = len(inspector_df[inspector_df['estado_plazo'].str.contains('En el Plazo', case=False, na=False)])
-            tasa = round((en_plazo_insp / count * 100), 1) if count > 0 else 0
-            por_inspector.append({
-                "inspector": inspector,
-                "cantidad": int(count),
-                "en_plazo": int(en_plazo_insp),
-                "tasa_cumplimiento": tasa
-            })
+    if detail and 'inspector' in df.columns:
+        por_inspector = _inspector_records(_inspector_metrics(df).head(10))
 
     # Por Sector
     por_sector = {}
-    if 'sector' in df.columns:
-        sectores = df[df['sector'] != '']['sector'].value_counts()
+    if detail and 'sector' in df.columns:
+        sectores = count_values(df[df['sector'] != '']['sector'])
         por_sector = {str(k): int(v) for k, v in sectores.items()}
 
     # Por Origen
     por_origen = {}
     if 'origen' in df.columns:
-        origenes = df['origen'].value_counts()
+        origenes = count_values(df['origen'])
         por_origen = {str(k): int(v) for k, v in origenes.items()}
 
     # Por Canal de Entrada
     por_canal = []
-    if 'canal_entrada' in df.columns:
-        canales = df[df['canal_entrada'] != '']['canal_entrada'].value_counts()
+    if detail and 'canal_entrada' in df.columns:
+        canales = count_values(df[df['canal_entrada'] != '']['canal_entrada'])
         for c, n in canales.items():
             por_canal.append({"canal": c, "cantidad": int(n)})
 
     # Por Submotivo
     por_submotivo = []
-    if 'submotivo' in df.columns:
-        submotivos = df[df['submotivo'] != '']['submotivo'].value_counts()
+    if detail and 'submotivo' in df.columns:
+        submotivos = count_values(df[df['submotivo'] != '']['submotivo'])
         for s, n in submotivos.items():
             por_submotivo.append({"submotivo": s, "cantidad": int(n)})
 
     # Por Gestion (solo SEC)
     por_gestion = []
-    if 'gestion' in df.columns:
-        gestiones = df[df['gestion'] != '']['gestion'].value_counts()
+    if detail and 'gestion' in df.columns:
+        gestiones = count_values(df[df['gestion'] != '']['gestion'])
         for g, n in gestiones.items():
             por_gestion.append({"gestion": g, "cantidad": int(n)})
 
     # Evolucion diaria
     evolucion_diaria = []
-    if 'fecha_ingreso' in df.columns:
-        df_with_date = df[df['fecha_ingreso'].notna()].copy()
-        if not df_with_date.empty:
-            df_with_date['dia'] = df_with_date['fecha_ingreso'].dt.date
-            daily = df_with_date.groupby('dia').agg({
-                'id': 'count'
-            }).reset_index()
-            daily.columns = ['dia', 'total']
-
-            # Calcular inspeccionadas por dia
-            for idx, row in daily.iterrows():
-                dia_df = df_with_date[df_with_date['dia'] == row['dia']]
-                insp_dia = dia_df['fecha_inspeccion'].notna().sum() if 'fecha_inspeccion' in dia_df.columns else 0
-                daily.at[idx, 'inspeccionadas'] = int(insp_dia)
-
-            daily['dia'] = daily['dia'].astype(str)
-            evolucion_diaria = daily.tail(30).to_dict(orient='records')
+    if detail:
+        evolucion_diaria = get_lecturas_evolucion(sector, origen, fecha_desde, fecha_hasta, mes, anio, dias)
 
     # Comparativas (primera vs segunda mitad del periodo)
     comparativas = {
@@ -582,6 +652,12 @@ def get_lecturas_stats(
     }
 
 
+def get_lecturas_summary() -> Dict[str, Any]:
+    """Get the Lecturas KPIs shown in the dashboard summary."""
+    stats = get_lecturas_stats(detail=False)
+    return {key: stats[key] for key in SUMMARY_KEYS}
+
+
 def get_lecturas_sectores() -> List[str]:
     """Get list of unique sectores."""
     df = load_lecturas_data()
@@ -596,22 +672,27 @@ def get_lecturas_inspectors() -> List[Dict[str, Any]]:
     if 'inspector' not in df.columns:
         return []
 
-    inspectors = []
-    df_insp = df[df['inspector'] != '']
-    inspector_counts = df_insp['inspector'].value_counts()
-
-    for inspector, count in inspector_counts.items():
-        if inspector and inspector.strip():
-            inspector_df = df_insp[df_insp['inspector'] == inspector]
-            en_plazo = len(inspector_df[inspector_df['estado_plazo'].str.contains('En el Plazo', case=False, na=False)])
-            tasa = round((en_plazo / count * 100), 1) if count > 0 else 0
-            inspectors.append({
-                "inspector": inspector,
-                "cantidad": int(count),
-                "tasa_cumplimiento": tasa
-            })
+    return _inspector_records(_inspector_metrics(df))
 
-    return inspectors
+
+def _inspector_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    sums = {}
+    if 'estado_plazo' in df.columns:
+        sums['en_plazo'] = match_contains(df['estado_plazo'], 'En el Plazo')
+    return group_metrics(df, 'inspector', sums)
+
+
+def _inspector_records(metrics: pd.DataFrame) -> List[Dict[str, Any]]:
+    records = []
+    for inspector, row in metrics.iterrows():
+        en_plazo = int(row.get('en_plazo', 0))
+        records.append({
+            "inspector": inspector,
+            "cantidad": int(row['cantidad']),
+            "en_plazo": en_plazo,
+            "tasa_cumplimiento": rate(en_plazo, int(row['cantidad'])),
+        })
+    return records
 
 
 def get_lecturas_hallazgos() -> List[str]:
@@ -0,0 +1,137 @@
+"""
+Cache de resultados de los reportes (/stats).
+
+Los dashboards piden una y otra vez las mismas combinaciones de filtros sobre
+datos que cambian pocas veces al dia. Cada resultado se guarda con la clave
+(modulo, filtros normalizados, versiones de los datasets que usa): al recargar
+un dataset la version cambia, asi que los resultados anteriores ya no se
+vuelven a servir y ademas se descartan para liberar memoria. El cache es LRU
+y esta acotado por el tamano aproximado en bytes de los resultados.
+"""
+
+import functools
+import inspect
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..core.config import settings
+from .dataset_registry import registry
+
+
+class ResultCache:
+    """LRU cache of computed results, bounded by their approximate size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int, Tuple[str, ...]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Tuple, value: Any, datasets: Tuple[str, ...]) -> None:
+        size = len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        # Un resultado mas grande que todo el cache no se guarda
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size, datasets)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def invalidate(self, dataset: str) -> None:
+        """Drop every result computed from the given dataset."""
+        with self._lock:
+            for key in [k for k, entry in self._entries.items() if dataset in entry[2]]:
+                self.bytes -= self._entries.pop(key)[1]
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def info(self) -> Dict[str, Any]:
+        """Get entries, size and hit/miss counters."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "enabled": settings.STATS_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / requests * 100, 1) if requests > 0 else 0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+stats_cache = ResultCache(settings.STATS_CACHE_MAX_BYTES)
+registry.on_change(stats_cache.invalidate)
+
+
+def _normalize(value: Any) -> Any:
+    # Los servicios ignoran un filtro vacio igual que None
+    if isinstance(value, str) and not value:
+        return None
+    return value
+
+
+def cached_stats(module: str, datasets: List[str]) -> Callable:
+    """Cache the results of a stats function per filter combination and dataset versions.
+
+    The cached result is shared between callers and must not be modified.
+    """
+    datasets = tuple(datasets)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.STATS_CACHE_ENABLED:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            filters = tuple(_normalize(value) for value in bound.arguments.values())
+
+            # Cargar los datasets antes de leer su version, si no el primer
+            # resultado quedaria guardado con version 0
+            for name in datasets:
+                registry.get(name)
+            versions = tuple(registry.version(name) for name in datasets)
+
+            key = (module, filters, versions)
+            result = stats_cache.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                stats_cache.put(key, result, datasets)
+            return result
+
+        return wrapper
+
+    return decorator
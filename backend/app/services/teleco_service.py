@@ -7,35 +7,122 @@ import pandas as pd
 import os
 from typing import Optional, Dict, Any, List
 from datetime import datetime
-
-# Global dataframe cache
-_df_teleco_cache: Optional[pd.DataFrame] = None
+from ..utils.snapshot import read_snapshot, write_snapshot
+from ..utils.append_ingest import read_appended, apply_appended, source_layout
+from ..utils.source_files import resolve_source, read_source
+from ..core.config import settings
+from ..utils.categorical import to_categorical, map_distinct, match_contains, count_values
+from ..utils.filter_index import filter_mask
+from ..utils.search_index import get_search_index
+from ..utils.group_metrics import group_metrics, rate
+from ..utils.records import frame_records
+from ..utils.sort_index import paginate, warm_on_change
+from ..utils.pattern_classifier import load_classifier
+from .dataset_registry import registry
+from .result_cache import cached_stats
 
 # Meta de aprobacion
 META_APROBACION = 50
 
+# Columnas de baja cardinalidad que se guardan como categoricas
+CATEGORICAL_COLUMNS = [
+    'empresa', 'empresa_corta', 'comuna', 'inspector', 'resultado',
+    'tiene_plano', 'tiene_plano_norm', 'estado_caso', 'estado_simple',
+]
 
-def load_teleco_data(force_reload: bool = False) -> pd.DataFrame:
-    """Load CSV data for Telecomunicaciones into a pandas DataFrame with caching."""
-    global _df_teleco_cache
+# Columnas donde busca el parametro `search` (indice invertido)
+SEARCH_COLUMNS = ['empresa', 'comuna', 'inspector', 'observacion', 'numero_caso']
+
+# Columnas con filtros de igualdad (indice bitmap)
+FILTER_COLUMNS = ['empresa_corta', 'comuna', 'resultado', 'tiene_plano_norm', 'mes', 'anio']
 
-    if _df_teleco_cache is not None and not force_reload:
-        return _df_teleco_cache
+# Claves de get_teleco_stats que muestra el resumen del dashboard
+SUMMARY_KEYS = ['total', 'aprobados', 'rechazados', 'tasa_aprobacion', 'total_postes', 'por_empresa', 'comparativas']
 
-    base_path = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))),
-        "data"
-    )
 
-    csv_path = os.path.join(base_path, "informe_teleco.csv")
+def get_teleco_source_files() -> List[str]:
+    """Get the source CSV paths for Telecomunicaciones."""
+    return [resolve_source(os.path.join(settings.DATA_DIR, "informe_teleco.csv"))]
+
+
+def _teleco_sources() -> List[str]:
+    # Las reglas de motivos de rechazo tambien invalidan el snapshot y disparan la recarga
+    return get_teleco_source_files() + [settings.TELECO_MOTIVOS_FILE]
+
+
+def load_teleco_data(force_reload: bool = False) -> pd.DataFrame:
+    """Load CSV data for Telecomunicaciones into a pandas DataFrame with caching."""
+    return registry.get("teleco", force_reload=force_reload)
+
+
+def empresa_corta(empresa: Any) -> str:
+    """Short name of a company (long names are cut to 20 characters)."""
+    empresa = str(empresa)
+    if 'Telecomunicaciones' in empresa:
+        return 'ENTEL'
+    if 'Ufinet' in empresa:
+        return 'UFINET'
+    for nombre in ('WOM', 'QMC', 'ATP', 'CIRION'):
+        if nombre in empresa:
+            return nombre
+    return empresa[:20]
+
+
+def normalize_tiene_plano(valor: Any) -> str:
+    valor = str(valor)
+    if valor.upper() in ('SI', 'NO'):
+        return valor.upper()
+    if 'INCOMPLETO' in valor.upper():
+        return 'INCOMPLETO'
+    if 'DE' in valor:  # "2 DE 6", "1 DE 7", etc.
+        return 'PARCIAL'
+    return 'OTRO'
+
+
+def estado_simple(estado: Any) -> str:
+    estado = str(estado)
+    if 'New Feasibility' in estado:
+        return 'NEW FEASIBILITY'
+    if 'In Progress' in estado:
+        return 'IN PROGRESS'
+    return 'OTRO'
+
+
+def _read_teleco() -> pd.DataFrame:
+    """Read and normalize the Teleco CSV (or its snapshot)."""
+    csv_path = get_teleco_source_files()[0]
 
     if not os.path.exists(csv_path):
         print(f"Teleco CSV not found: {csv_path}")
-        _df_teleco_cache = pd.DataFrame()
-        return _df_teleco_cache
+        return pd.DataFrame()
+
+    sources = _teleco_sources()
+    snapshot = read_snapshot("teleco", sources)
+    if snapshot is not None:
+        return snapshot
+
+    # Si el CSV solo crecio, normalizar solo las filas nuevas
+    current = registry.current("teleco")
+    appended = read_appended("teleco", sources, current, encoding='utf-8-sig', low_memory=False)
+    if appended is not None:
+        return apply_appended("teleco", sources, appended, current, _normalize_teleco)
+
+    raw = read_source(csv_path, encoding='utf-8-sig', low_memory=False)
+    print(f"Loaded Teleco: {len(raw)} records")
+
+    # El archivo de motivos no aporta filas
+    frames = [raw, None]
+    layout = source_layout(frames)
+    df = _normalize_teleco(frames)
+
+    df = write_snapshot("teleco", sources, df, layout)
+    print(f"Total Teleco loaded: {len(df)} records")
+    return df
 
-    df = pd.read_csv(csv_path, encoding='utf-8-sig', low_memory=False)
-    print(f"Loaded Teleco: {len(df)} records")
+
+def _normalize_teleco(frames: List[Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """Normalize the raw Teleco CSV (first frame; the motivos file has none)."""
+    df = frames[0]
 
     # Mapeo de columnas
     column_mapping = {
@@ -72,15 +159,7 @@ def load_teleco_data(force_reload: bool = False) -> pd.DataFrame:
     if 'empresa' in df.columns:
         df['empresa'] = df['empresa'].fillna('').str.strip()
         # Simplificar nombres de empresas largas
-        df['empresa_corta'] = df['empresa'].apply(lambda x:
-            'ENTEL' if 'Telecomunicaciones' in str(x) else
-            'UFINET' if 'Ufinet' in str(x) else
-            'WOM' if 'WOM' in str(x) else
-            'QMC' if 'QMC' in str(x) else
-            'ATP' if 'ATP' in str(x) else
-            'CIRION' if 'CIRION' in str(x) else
-            str(x)[:20] if len(str(x)) > 20 else str(x)
-        )
+        df['empresa_corta'] = map_distinct(df['empresa'], empresa_corta)
 
     if 'comuna' in df.columns:
         df['comuna'] = df['comuna'].fillna('').str.strip().str.upper()
@@ -94,22 +173,12 @@ def load_teleco_data(force_reload: bool = False) -> pd.DataFrame:
     if 'tiene_plano' in df.columns:
         df['tiene_plano'] = df['tiene_plano'].fillna('').str.strip().str.upper()
         # Normalizar valores de tiene_plano
-        df['tiene_plano_norm'] = df['tiene_plano'].apply(lambda x:
-            'SI' if str(x).upper() == 'SI' else
-            'NO' if str(x).upper() == 'NO' else
-            'INCOMPLETO' if 'INCOMPLETO' in str(x).upper() else
-            'PARCIAL' if 'DE' in str(x) else  # "2 de 6", "1 de 7", etc.
-            'OTRO'
-        )
+        df['tiene_plano_norm'] = map_distinct(df['tiene_plano'], normalize_tiene_plano)
 
     if 'estado_caso' in df.columns:
         df['estado_caso'] = df['estado_caso'].fillna('').str.strip()
         # Simplificar estados
-        df['estado_simple'] = df['estado_caso'].apply(lambda x:
-            'NEW FEASIBILITY' if 'New Feasibility' in str(x) else
-            'IN PROGRESS' if 'In Progress' in str(x) else
-            'OTRO'
-        )
+        df['estado_simple'] = map_distinct(df['estado_caso'], estado_simple)
 
     # Limpiar cantidad de postes
     if 'cantidad_postes' in df.columns:
@@ -131,11 +200,21 @@ def load_teleco_data(force_reload: bool = False) -> pd.DataFrame:
         df['mes'] = df['fecha_inspeccion'].dt.month
         df['anio'] = df['fecha_inspeccion'].dt.year
 
-    _df_teleco_cache = df
-    print(f"Total Teleco loaded: {len(df)} records")
+    df = to_categorical(df, CATEGORICAL_COLUMNS)
+
+    # Motivo de rechazo (categorico) de los casos rechazados, segun las reglas de TELECO_MOTIVOS_FILE
+    if 'observacion' in df.columns and 'resultado' in df.columns:
+        motivos = load_classifier(settings.TELECO_MOTIVOS_FILE).classify(df['observacion'])
+        df['motivo_rechazo'] = motivos.where(df['resultado'] == 'RECHAZADO')
+
     return df
 
 
+registry.register("teleco", _read_teleco, _teleco_sources)
+# Orden por defecto del listado, listo antes del primer request
+warm_on_change(registry, "teleco", ["fecha_inspeccion"])
+
+
 def get_teleco_filtered_data(
     search: Optional[str] = None,
     empresa: Optional[str] = None,
@@ -150,7 +229,8 @@ def get_teleco_filtered_data(
     page: int = 1,
     limit: int = 50,
     sort_by: str = "fecha_inspeccion",
-    order: str = "desc"
+    order: str = "desc",
+    cursor: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Get filtered and paginated Teleco data."""
     df = load_teleco_data()
@@ -161,34 +241,25 @@ def get_teleco_filtered_data(
             "total": 0,
             "page": page,
             "limit": limit,
-            "pages": 0
+            "pages": 0,
+            "next_cursor": None
         }
 
     # Apply filters
-    mask = pd.Series([True] * len(df))
+    mask = filter_mask(df, FILTER_COLUMNS, {
+        'empresa_corta': empresa,
+        'comuna': comuna,
+        'resultado': resultado,
+        'tiene_plano_norm': tiene_plano,
+        'mes': mes,
+        'anio': anio,
+    })
 
     if search:
-        search_mask = pd.Series([False] * len(df))
-        search_cols = ['empresa', 'comuna', 'inspector', 'observacion', 'numero_caso']
-        for col in search_cols:
-            if col in df.columns:
-                search_mask |= df[col].astype(str).str.contains(search, case=False, na=False)
-        mask &= search_mask
-
-    if empresa and 'empresa_corta' in df.columns:
-        mask &= df['empresa_corta'].str.upper() == empresa.upper()
-
-    if comuna and 'comuna' in df.columns:
-        mask &= df['comuna'].str.upper() == comuna.upper()
+        mask &= get_search_index(df, SEARCH_COLUMNS).search(search)
 
     if inspector and 'inspector' in df.columns:
-        mask &= df['inspector'].str.contains(inspector, case=False, na=False)
-
-    if resultado and 'resultado' in df.columns:
-        mask &= df['resultado'].str.upper() == resultado.upper()
-
-    if tiene_plano and 'tiene_plano_norm' in df.columns:
-        mask &= df['tiene_plano_norm'].str.upper() == tiene_plano.upper()
+        mask &= match_contains(df['inspector'], inspector)
 
     if fecha_desde and 'fecha_inspeccion' in df.columns:
         mask &= df['fecha_inspeccion'] >= pd.to_datetime(fecha_desde)
@@ -196,29 +267,9 @@ def get_teleco_filtered_data(
     if fecha_hasta and 'fecha_inspeccion' in df.columns:
         mask &= df['fecha_inspeccion'] <= pd.to_datetime(fecha_hasta)
 
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
-
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
-
-    filtered_df = df[mask].copy()
-
-    # Sort
-    if sort_by in filtered_df.columns:
-        filtered_df = filtered_df.sort_values(
-            by=sort_by,
-            ascending=(order == "asc"),
-            na_position='last'
-        )
-
-    # Paginate
-    total = len(filtered_df)
-    pages = (total + limit - 1) // limit
-    start = (page - 1) * limit
-    end = start + limit
-
-    paginated_df = filtered_df.iloc[start:end]
+    # Pagina sobre el orden precalculado de sort_by: sin copiar ni ordenar las filas filtradas
+    result_page = paginate(df, mask, sort_by, order, page, limit, cursor)
+    paginated_df = df.iloc[result_page.positions]
 
     # Seleccionar columnas para la respuesta
     output_cols = ['id', 'numero_caso', 'family_case', 'empresa_corta', 'comuna',
@@ -226,25 +277,20 @@ def get_teleco_filtered_data(
                    'inspector', 'observacion', 'estado_simple']
     output_cols = [c for c in output_cols if c in paginated_df.columns]
 
-    items = paginated_df[output_cols].to_dict(orient='records')
-
-    # Format dates for JSON
-    for item in items:
-        for key, value in item.items():
-            if isinstance(value, pd.Timestamp):
-                item[key] = value.strftime('%Y-%m-%d') if pd.notna(value) else None
-            elif pd.isna(value):
-                item[key] = None
+    # Fechas como YYYY-MM-DD, nulos como None
+    items = frame_records(paginated_df[output_cols])
 
     return {
         "items": items,
-        "total": total,
-        "page": page,
+        "total": result_page.total,
+        "page": result_page.page,
         "limit": limit,
-        "pages": pages
+        "pages": result_page.pages,
+        "next_cursor": result_page.next_cursor
     }
 
 
+@cached_stats("teleco", ["teleco"])
 def get_teleco_stats(
     empresa: Optional[str] = None,
     comuna: Optional[str] = None,
@@ -252,8 +298,12 @@ def get_teleco_stats(
     fecha_hasta: Optional[str] = None,
     mes: Optional[int] = None,
     anio: Optional[int] = None,
+    detail: bool = True,
 ) -> Dict[str, Any]:
-    """Get aggregated statistics for Telecomunicaciones."""
+    """Get aggregated statistics for Telecomunicaciones.
+
+    With `detail=False` the secondary breakdowns, the monthly series and the rejection reasons are left empty.
+    """
     df = load_teleco_data()
 
     empty_response = {
@@ -284,13 +334,12 @@ def get_teleco_stats(
         return empty_response
 
     # Apply filters
-    mask = pd.Series([True] * len(df))
-
-    if empresa and 'empresa_corta' in df.columns:
-        mask &= df['empresa_corta'].str.upper() == empresa.upper()
-
-    if comuna and 'comuna' in df.columns:
-        mask &= df['comuna'].str.upper() == comuna.upper()
+    mask = filter_mask(df, FILTER_COLUMNS, {
+        'empresa_corta': empresa,
+        'comuna': comuna,
+        'mes': mes,
+        'anio': anio,
+    })
 
     if fecha_desde and 'fecha_inspeccion' in df.columns:
         mask &= df['fecha_inspeccion'] >= pd.to_datetime(fecha_desde)
@@ -298,12 +347,6 @@ def get_teleco_stats(
     if fecha_hasta and 'fecha_inspeccion' in df.columns:
         mask &= df['fecha_inspeccion'] <= pd.to_datetime(fecha_hasta)
 
-    if mes and 'mes' in df.columns:
-        mask &= df['mes'] == mes
-
-    if anio and 'anio' in df.columns:
-        mask &= df['anio'] == anio
-
     df = df[mask].copy()
 
     if df.empty:
@@ -340,7 +383,7 @@ def get_teleco_stats(
     # Por Empresa
     por_empresa = []
     if 'empresa_corta' in df.columns:
-        empresas = df['empresa_corta'].value_counts().head(10)
+        empresas = count_values(df['empresa_corta']).head(10)
         for emp, count in empresas.items():
             if emp and emp.strip():
                 emp_df = df[df['empresa_corta'] == emp]
@@ -357,47 +400,33 @@ def get_teleco_stats(
 
     # Por Comuna
     por_comuna = []
-    if 'comuna' in df.columns:
-        comunas = df[df['comuna'] != '']['comuna'].value_counts().head(15)
+    if detail and 'comuna' in df.columns:
+        comunas = count_values(df[df['comuna'] != '']['comuna']).head(15)
         for com, count in comunas.items():
             por_comuna.append({"comuna": com, "cantidad": int(count)})
 
     # Por Inspector
     por_inspector = []
-    if 'inspector' in df.columns:
-        df_insp = df[df['inspector'] != '']
-        inspector_counts = df_insp['inspector'].value_counts()
-        for inspector, count in inspector_counts.items():
-            if inspector and inspector.strip():
-                inspector_df = df_insp[df_insp['inspector'] == inspector]
-                aprobados_insp = len(inspector_df[inspector_df['resultado'] == 'APROBADO'])
-                tasa = round((aprobados_insp / count * 100), 1) if count > 0 else 0
-                postes_insp = int(inspector_df['cantidad_postes'].sum()) if 'cantidad_postes' in inspector_df.columns else 0
-                por_inspector.append({
-                    "inspector": inspector,
-                    "cantidad": int(count),
-                    "aprobados": int(aprobados_insp),
-                    "tasa_aprobacion": tasa,
-                    "postes": postes_insp
-                })
+    if detail and 'inspector' in df.columns:
+        por_inspector = _inspector_records(_inspector_metrics(df))
 
     # Por Resultado
     por_resultado = {}
     if 'resultado' in df.columns:
-        resultados = df['resultado'].value_counts()
+        resultados = count_values(df['resultado'])
         por_resultado = {str(k): int(v) for k, v in resultados.items() if k}
 
     # Por Tiene Plano
     por_tiene_plano = []
-    if 'tiene_plano_norm' in df.columns:
-        planos = df['tiene_plano_norm'].value_counts()
+    if detail and 'tiene_plano_norm' in df.columns:
+        planos = count_values(df['tiene_plano_norm'])
         for p, c in planos.items():
             if p:
                 por_tiene_plano.append({"tipo": p, "cantidad": int(c)})
 
     # Por Mes
     por_mes = []
-    if 'mes' in df.columns:
+    if detail and 'mes' in df.columns:
         meses = df[df['mes'].notna()]['mes'].value_counts().sort_index()
         for mes, count in meses.items():
             mes_df = df[df['mes'] == mes]
@@ -412,7 +441,7 @@ def get_teleco_stats(
 
     # Evolucion mensual (para grafico)
     evolucion_mensual = []
-    if 'fecha_inspeccion' in df.columns:
+    if detail and 'fecha_inspeccion' in df.columns:
         df_with_date = df[df['fecha_inspeccion'].notna()].copy()
         if not df_with_date.empty:
             df_with_date['periodo'] = df_with_date['fecha_inspeccion'].dt.to_period('M')
@@ -454,44 +483,12 @@ def get_teleco_stats(
                     "diferencia": round(tasa_act - tasa_ant, 1)
                 }
 
-    # Motivos de Rechazo (extraer de observaciones)
+    # Motivos de Rechazo (clasificados al cargar desde las observaciones)
     motivos_rechazo = []
-    if 'observacion' in df.columns and 'resultado' in df.columns:
-        df_rechazados = df[df['resultado'] == 'RECHAZADO']
-
-        # Patrones de motivos de rechazo
-        motivos_patrones = {
-            'SATURACION ESPACIO AEREO': ['saturacion', 'saturado', 'espacio aereo'],
-            'VANOS FUERA DE NORMA': ['vanos fuera', 'vano fuera', 'distancia'],
-            'ESCOMBRO AEREO': ['escombro'],
-            'VEGETACION EN LINEAS': ['vegetacion', 'poda', 'arbol'],
-            'FALTA SOLUCION MECANICA': ['solucion mecanica', 'mecanica'],
-            'TRABAJOS YA REALIZADOS': ['ya realizados', 'realizados en terreno'],
-            'RESERVA TECNICA FUERA DE NORMA': ['reserva tecnica'],
-            'CRUCETAS EN MAL ESTADO': ['cruceta', 'mal estado'],
-            'SOBRECARGA DE APOYOS': ['apoyos', 'mas de 10', 'mas de 13'],
-            'SIN ESPECIFICAR': []
-        }
-
-        conteo_motivos = {k: 0 for k in motivos_patrones.keys()}
-
-        for obs in df_rechazados['observacion'].fillna('').str.lower():
-            encontrado = False
-            for motivo, patrones in motivos_patrones.items():
-                if motivo == 'SIN ESPECIFICAR':
-                    continue
-                for patron in patrones:
-                    if patron in obs:
-                        conteo_motivos[motivo] += 1
-                        encontrado = True
-                        break
-                if encontrado:
-                    break
-            if not encontrado and obs.strip():
-                conteo_motivos['SIN ESPECIFICAR'] += 1
-
-        # Ordenar y formatear
-        for motivo, cantidad in sorted(conteo_motivos.items(), key=lambda x: x[1], reverse=True):
+    if detail and 'motivo_rechazo' in df.columns:
+        conteo_motivos = df['motivo_rechazo'].value_counts(sort=False)
+        for motivo, cantidad in conteo_motivos.sort_values(ascending=False, kind='stable').items():
+            cantidad = int(cantidad)
             if cantidad > 0:
                 motivos_rechazo.append({
                     "motivo": motivo,
@@ -572,6 +569,12 @@ def get_teleco_stats(
     }
 
 
+def get_teleco_summary() -> Dict[str, Any]:
+    """Get the Telecomunicaciones KPIs shown in the dashboard summary."""
+    stats = get_teleco_stats(detail=False)
+    return {key: stats[key] for key in SUMMARY_KEYS}
+
+
 def get_teleco_empresas() -> List[str]:
     """Get list of unique empresas."""
     df = load_teleco_data()
@@ -594,25 +597,30 @@ def get_teleco_inspectors() -> List[Dict[str, Any]]:
     if 'inspector' not in df.columns:
         return []
 
-    inspectors = []
-    df_insp = df[df['inspector'] != '']
-    inspector_counts = df_insp['inspector'].value_counts()
-
-    for inspector, count in inspector_counts.items():
-        if inspector and inspector.strip():
-            inspector_df = df_insp[df_insp['inspector'] == inspector]
-            aprobados = len(inspector_df[inspector_df['resultado'] == 'APROBADO'])
-            tasa = round((aprobados / count * 100), 1) if count > 0 else 0
-            postes = int(inspector_df['cantidad_postes'].sum()) if 'cantidad_postes' in inspector_df.columns else 0
-            inspectors.append({
-                "inspector": inspector,
-                "cantidad": int(count),
-                "aprobados": int(aprobados),
-                "tasa_aprobacion": tasa,
-                "postes": postes
-            })
+    return _inspector_records(_inspector_metrics(df))
+
 
-    return inspectors
+def _inspector_metrics(df: pd.DataFrame) -> pd.DataFrame:
+    sums = {}
+    if 'resultado' in df.columns:
+        sums['aprobados'] = df['resultado'] == 'APROBADO'
+    if 'cantidad_postes' in df.columns:
+        sums['postes'] = df['cantidad_postes']
+    return group_metrics(df, 'inspector', sums)
+
+
+def _inspector_records(metrics: pd.DataFrame) -> List[Dict[str, Any]]:
+    records = []
+    for inspector, row in metrics.iterrows():
+        aprobados = int(row.get('aprobados', 0))
+        records.append({
+            "inspector": inspector,
+            "cantidad": int(row['cantidad']),
+            "aprobados": aprobados,
+            "tasa_aprobacion": rate(aprobados, int(row['cantidad'])),
+            "postes": int(row.get('postes', 0)),
+        })
+    return records
 
 
 def get_teleco_periodos() -> Dict[str, List[int]]:
@@ -0,0 +1,177 @@
+"""
+Carga asincrona de archivos NNCC.
+
+El endpoint guarda el archivo en disco por bloques y crea un job. Un worker en
+segundo plano lo parsea, normaliza y valida; solo si la validacion pasa se
+guarda como nueva fuente NNCC y se reemplaza el dataset del registro de una
+sola vez. Mientras tanto las requests siguen usando los datos anteriores.
+"""
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from ..core.config import settings
+from ..utils.snapshot import coerce_mixed_columns
+from ..utils.source_files import resolve_source
+from . import data_service
+from .data_watcher import data_watcher
+from .dataset_registry import registry
+
+# Filas por bloque al parsear un CSV (para informar progreso)
+CSV_CHUNK_ROWS = 100_000
+
+# Jobs terminados que se conservan para consultar su estado
+MAX_FINISHED_JOBS = 50
+
+_jobs: Dict[str, Dict[str, Any]] = {}
+_job_paths: Dict[str, str] = {}
+_jobs_lock = threading.Lock()
+
+# Un solo worker: las cargas se procesan en orden y nunca dos a la vez
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload")
+
+
+def get_upload_dir() -> str:
+    """Get the directory where uploaded files wait to be processed."""
+    path = settings.UPLOAD_DIR or os.path.join(settings.DATA_DIR, ".uploads")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def create_job(filename: str, file_ext: str) -> Dict[str, Any]:
+    """Create an upload job and the path where its file must be written."""
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "filename": filename,
+        "status": "receiving",
+        "bytes_received": 0,
+        "rows_parsed": 0,
+        "rows": None,
+        "columns": None,
+        "errors": [],
+        "version": None,
+        "created_at": datetime.now().isoformat(),
+        "finished_at": None,
+    }
+
+    with _jobs_lock:
+        _prune_jobs()
+        _jobs[job_id] = job
+        _job_paths[job_id] = os.path.join(get_upload_dir(), f"{job_id}{file_ext}")
+
+    return dict(job)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+
+def get_job_path(job_id: str) -> str:
+    return _job_paths[job_id]
+
+
+def update_job(job_id: str, **fields) -> None:
+    with _jobs_lock:
+        _jobs[job_id].update(fields)
+
+
+def fail_job(job_id: str, error: str) -> None:
+    update_job(job_id, status="failed", errors=[error], finished_at=datetime.now().isoformat())
+    _remove_file(job_id)
+
+
+def submit_job(job_id: str) -> None:
+    """Queue a fully received upload for background processing."""
+    update_job(job_id, status="queued")
+    _executor.submit(_process_job, job_id)
+
+
+def _prune_jobs() -> None:
+    finished = [job_id for job_id, job in _jobs.items() if job["status"] in ("done", "failed")]
+    for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+        _jobs.pop(job_id, None)
+        _job_paths.pop(job_id, None)
+
+
+def _remove_file(job_id: str) -> None:
+    try:
+        os.remove(_job_paths[job_id])
+    except OSError:
+        pass
+
+
+def _parse_file(job_id: str, path: str) -> pd.DataFrame:
+    if path.endswith(".csv"):
+        chunks = []
+        rows = 0
+        for chunk in pd.read_csv(path, encoding='utf-8-sig', low_memory=False, chunksize=CSV_CHUNK_ROWS):
+            chunks.append(chunk)
+            rows += len(chunk)
+            update_job(job_id, rows_parsed=rows)
+        return pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+
+    df = pd.read_excel(path)
+    update_job(job_id, rows_parsed=len(df))
+    return df
+
+
+def _swap_dataset(df_raw: pd.DataFrame) -> int:
+    """Store the upload as the NNCC source file and load it into the registry."""
+    # Se escribe el archivo que lee el loader (el Parquet de ingest_excel si
+    # existe, si no el CSV), para que el watcher y las recargas sigan viendo
+    # los archivos que se dejen despues en data/
+    target = resolve_source(os.path.join(settings.DATA_DIR, data_service.NNCC_FILENAME))
+
+    # El archivo nuevo se escribe aparte y se reemplaza de una vez
+    tmp_path = f"{target}.tmp"
+    if target.endswith(".parquet"):
+        df_raw.to_parquet(tmp_path, index=False)
+    else:
+        df_raw.to_csv(tmp_path, index=False, encoding='utf-8')
+    os.replace(tmp_path, target)
+
+    # El watcher no debe recargar el archivo que se carga aqui
+    data_watcher.acknowledge("nncc")
+
+    # Una sola recarga con el loader: queda igual que una carga en frio, con su
+    # snapshot (y el layout para la recarga incremental) y una sola version nueva
+    registry.reload("nncc")
+    return registry.version("nncc")
+
+
+def _process_job(job_id: str) -> None:
+    path = get_job_path(job_id)
+    try:
+        update_job(job_id, status="parsing")
+        df_raw = _parse_file(job_id, path)
+        update_job(job_id, status="validating", rows=len(df_raw), columns=len(df_raw.columns))
+
+        # Mismos tipos que tendra el archivo guardado, para que una recarga desde disco coincida
+        df_raw = coerce_mixed_columns(df_raw)
+        errors = data_service.validate_data(data_service.normalize_data(df_raw.copy()))
+        if errors:
+            update_job(job_id, status="failed", errors=errors, finished_at=datetime.now().isoformat())
+            return
+
+        update_job(job_id, status="saving")
+        version = _swap_dataset(df_raw)
+        update_job(job_id, status="done", version=version, finished_at=datetime.now().isoformat())
+        print(f"Upload {job_id} loaded as NNCC version {version}: {len(df_raw)} records")
+    except Exception as e:
+        update_job(
+            job_id,
+            status="failed",
+            errors=[f"Error al procesar archivo: {str(e)}"],
+            finished_at=datetime.now().isoformat(),
+        )
+    finally:
+        _remove_file(job_id)
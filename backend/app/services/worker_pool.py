@@ -0,0 +1,159 @@
+"""
+Pool de workers para el trabajo de pandas de los endpoints.
+
+Los endpoints son `async`, pero los servicios (filtros, agregaciones,
+exportaciones) son codigo sincrono que usa CPU. Llamarlos directo bloquea el
+event loop: mientras corre un /stats o un /export ninguna otra request avanza,
+ni siquiera /health o /auth/login. Con `WorkerPool.run` la llamada se ejecuta en
+un pool de threads acotado y el event loop queda libre.
+
+Cada endpoint tiene ademas un limite de llamadas simultaneas, para que un
+endpoint pesado (exportar) no ocupe todos los workers. Las llamadas que
+superan el limite esperan su turno; el tiempo de espera y de ejecucion queda
+en las metricas de cada endpoint (GET /dashboard/workers).
+
+El pool (executor y semaforos) se crea en el lifespan de la app y se guarda
+en `app.state.worker_pool`; los endpoints lo reciben con la dependencia
+`get_worker_pool`. Asi cada lifespan (y cada event loop) tiene su propio pool.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from ..core.config import settings
+
+
+class EndpointStats:
+    """Concurrency limit and queue/run time counters of one endpoint."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.semaphore: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+
+    def info(self) -> Dict[str, Any]:
+        calls = self.completed + self.failed
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_wait_ms": round(self.wait_seconds / calls * 1000, 1) if calls > 0 else 0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 1),
+            "avg_run_ms": round(self.run_seconds / calls * 1000, 1) if calls > 0 else 0,
+            "max_run_ms": round(self.max_run_seconds * 1000, 1),
+        }
+
+
+class WorkerPool:
+    """Run blocking calls in a bounded thread pool with per-endpoint concurrency limits."""
+
+    def __init__(self, max_workers: int, default_limit: int, limits: Dict[str, int]):
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self.limits = limits
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="worker")
+        # Solo se modifican desde el event loop del lifespan que creo el pool, no
+        # necesitan lock; los semaforos tambien quedan ligados a ese loop
+        self._endpoints: Dict[str, EndpointStats] = {}
+
+    def _limit(self, endpoint: str) -> int:
+        # Limite del endpoint ("lecturas.export"), de su accion ("export") o el general
+        action = endpoint.rsplit(".", 1)[-1]
+        limit = self.limits.get(endpoint, self.limits.get(action, self.default_limit))
+        return max(1, min(limit, self.max_workers))
+
+    def _stats(self, endpoint: str) -> EndpointStats:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = EndpointStats(self._limit(endpoint))
+            stats.semaphore = asyncio.Semaphore(stats.limit)
+        return stats
+
+    async def run(self, endpoint: str, func: Callable, *args, **kwargs) -> Any:
+        """Run `func(*args, **kwargs)` in the pool and wait for its result without blocking the event loop."""
+        if not settings.WORKER_POOL_ENABLED:
+            return func(*args, **kwargs)
+
+        stats = self._stats(endpoint)
+        queued_at = time.perf_counter()
+        started = []
+
+        def call():
+            started.append(time.perf_counter())
+            return func(*args, **kwargs)
+
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        try:
+            await stats.semaphore.acquire()
+        finally:
+            stats.queued -= 1
+
+        stats.active += 1
+        try:
+            future = self._executor.submit(call)
+        except BaseException:
+            stats.active -= 1
+            stats.semaphore.release()
+            raise
+
+        # El turno del endpoint se libera cuando termina el thread, no la request:
+        # si la request se cancela, la llamada sigue ocupando su worker
+        loop = asyncio.get_running_loop()
+
+        def done(_future: Future) -> None:
+            try:
+                loop.call_soon_threadsafe(self._finished, stats, _future, queued_at, started)
+            except RuntimeError:
+                # El event loop ya se cerro (fin del lifespan)
+                pass
+
+        future.add_done_callback(done)
+        return await asyncio.wrap_future(future)
+
+    def _finished(self, stats: EndpointStats, future: Future, queued_at: float, started: list) -> None:
+        finished = time.perf_counter()
+        stats.active -= 1
+        stats.semaphore.release()
+        if started:
+            # Espera: turno del endpoint mas cola del pool
+            wait, run = started[0] - queued_at, finished - started[0]
+            stats.wait_seconds += wait
+            stats.max_wait_seconds = max(stats.max_wait_seconds, wait)
+            stats.run_seconds += run
+            stats.max_run_seconds = max(stats.max_run_seconds, run)
+            if not future.cancelled() and future.exception() is None:
+                stats.completed += 1
+            else:
+                stats.failed += 1
+
+    def info(self) -> Dict[str, Any]:
+        """Get the pool size and the counters of every endpoint called so far."""
+        return {
+            "enabled": settings.WORKER_POOL_ENABLED,
+            "workers": self.max_workers,
+            "active": sum(stats.active for stats in self._endpoints.values()),
+            "queued": sum(stats.queued for stats in self._endpoints.values()),
+            "endpoints": {name: stats.info() for name, stats in sorted(self._endpoints.items())},
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def create_worker_pool() -> WorkerPool:
+    """Create the worker pool with the configured size and endpoint limits (one per app lifespan)."""
+    return WorkerPool(settings.WORKER_POOL_SIZE, settings.WORKER_ENDPOINT_LIMIT, settings.WORKER_ENDPOINT_LIMITS)
@@ -0,0 +1,300 @@
+"""
+Recarga incremental de los CSV que solo crecieron al final.
+
+Las inspecciones nuevas llegan como filas agregadas al final de los CSV. Si el
+contenido que tenia cada archivo al guardar el snapshot sigue intacto (mismo
+hash de esos bytes), solo se parsean y normalizan las filas nuevas, que se
+concatenan a los datos ya normalizados. Cualquier otro cambio (filas editadas
+o borradas, otro tipo de dato en una columna, un archivo que no es CSV) hace
+una carga completa.
+
+Para que el resultado sea identico al de una carga completa, las filas nuevas
+se parsean con los tipos de columna del archivo original y se normalizan junto
+con las primeras filas de los archivos: `pd.to_datetime` infiere el formato
+del primer valor no vacio de cada columna.
+"""
+
+import hashlib
+import io
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+from ..core.config import settings
+from .categorical import concat_frames
+from .frame_cache import extend_cached
+from .snapshot import (
+    coerce_mixed_columns, file_hash, read_snapshot_info, read_snapshot_frame, snapshot_token, snapshots_enabled,
+    write_snapshot,
+)
+
+# Filas iniciales a re-normalizar como contexto, como maximo (si no, carga completa)
+CONTEXT_MAX_ROWS = 50000
+
+_CHUNK = 1024 * 1024
+
+
+def _first_valid(frame: pd.DataFrame, offset: int = 0) -> Dict[str, int]:
+    """Row of the first value of each text column (columns without values are left out)."""
+    result = {}
+    for col in frame.columns:
+        if not (is_object_dtype(frame[col]) or is_string_dtype(frame[col])):
+            continue
+        valid = frame[col].notna().to_numpy()
+        if valid.any():
+            result[str(col)] = offset + int(np.argmax(valid))
+    return result
+
+
+def source_layout(frames: List[Optional[pd.DataFrame]]) -> List[Dict[str, Any]]:
+    """Per-source info saved with the snapshot to resolve later appends.
+
+    One entry per source (empty for sources that aren't read as CSV rows):
+    raw row count, column types and first row with a value of each text column.
+    """
+    layout = []
+    for frame in frames:
+        if frame is None:
+            layout.append({})
+            continue
+        layout.append({
+            "rows": len(frame),
+            "dtypes": {str(col): str(dtype) for col, dtype in frame.dtypes.items()},
+            "first_valid": _first_valid(frame),
+        })
+    return layout
+
+
+def _read_tail(path: str, entry: Dict[str, Any]) -> Optional[tuple]:
+    """Bytes appended to `path` since `entry` and the new file hash (None if it changed otherwise)."""
+    digest = hashlib.sha256()
+    remaining = entry["size"]
+    with open(path, "rb") as f:
+        last = b""
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK, remaining))
+            if not chunk:
+                return None
+            digest.update(chunk)
+            remaining -= len(chunk)
+            last = chunk[-1:]
+
+        # El contenido anterior debe seguir igual y terminar en una fila completa
+        if digest.copy().hexdigest() != entry.get("sha256") or last != b"\n":
+            return None
+
+        tail = f.read()
+        digest.update(tail)
+
+    return tail, digest.hexdigest()
+
+
+def _parse(data: Any, entry: Dict[str, Any], csv_kwargs: Dict[str, Any], nrows: Optional[int] = None,
+           header: bool = True) -> Optional[pd.DataFrame]:
+    """Parse CSV rows with the column types of `entry` (without `header`, columns are taken by position)."""
+    columns = list(entry["dtypes"].keys())
+    try:
+        if header:
+            frame = pd.read_csv(data, dtype=entry["dtypes"], nrows=nrows, **csv_kwargs)
+        else:
+            frame = pd.read_csv(data, header=None, dtype=dict(enumerate(entry["dtypes"].values())),
+                                nrows=nrows, **csv_kwargs)
+            if len(frame.columns) == len(columns):
+                frame.columns = columns
+    except (ValueError, TypeError, OverflowError):
+        # Un valor que no calza con el tipo de la columna: la carga completa lo resuelve
+        return None
+    if [str(col) for col in frame.columns] != columns:
+        return None
+    return frame
+
+
+class Appended:
+    """Rows appended to the sources of a dataset since its snapshot."""
+
+    def __init__(self, previous: pd.DataFrame, from_current: bool, rows: List[int],
+                 heads: List[Optional[pd.DataFrame]], tails: List[Optional[pd.DataFrame]],
+                 layout: List[Dict[str, Any]]):
+        self.previous = previous
+        # True si `previous` es el DataFrame que ya estaba en memoria
+        self.from_current = from_current
+        self.rows = rows
+        self.heads = heads
+        self.tails = tails
+        self.layout = layout
+
+    @property
+    def columns(self) -> List[str]:
+        """Raw columns of the sources, as read from the CSVs."""
+        columns: List[str] = []
+        for entry in self.layout:
+            columns += [col for col in entry.get("dtypes", {}) if col not in columns]
+        return columns
+
+    @property
+    def new_rows(self) -> int:
+        return sum(len(tail) for tail in self.tails if tail is not None)
+
+    @property
+    def at_end(self) -> bool:
+        """True when every new row goes after all the previous ones."""
+        for i, tail in enumerate(self.tails):
+            if tail is not None and any(self.rows[i + 1:]):
+                return False
+        return True
+
+    def splice(self, normalize: Callable[[List[Optional[pd.DataFrame]]], pd.DataFrame],
+               id_column: Optional[str] = None) -> pd.DataFrame:
+        """Normalize only the new rows and insert them after the previous rows of each source.
+
+        `normalize` is the same function the loader applies to the raw frames
+        of a full load (one per source, None for missing sources).
+        """
+        frames = []
+        for head, tail, entry in zip(self.heads, self.tails, self.layout):
+            pieces = [piece for piece in (head, tail) if piece is not None]
+            if pieces:
+                frames.append(pd.concat(pieces, ignore_index=True))
+            elif "dtypes" in entry:
+                # Archivo sin filas nuevas: sus columnas igual forman parte de la union
+                frames.append(pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in entry["dtypes"].items()}))
+            else:
+                frames.append(None)
+
+        # Mismos tipos de columna que deja `write_snapshot` en las filas anteriores
+        normalized = coerce_mixed_columns(normalize(frames))
+
+        pieces = []
+        previous_start = 0
+        offset = 0
+        for rows, head, tail in zip(self.rows, self.heads, self.tails):
+            if rows:
+                pieces.append(self.previous.iloc[previous_start:previous_start + rows])
+                previous_start += rows
+            # Las filas de contexto se descartan
+            offset += len(head) if head is not None else 0
+            if tail is not None:
+                pieces.append(normalized.iloc[offset:offset + len(tail)])
+                offset += len(tail)
+
+        df = concat_frames(pieces)
+        if id_column:
+            df[id_column] = range(1, len(df) + 1)
+        return df
+
+
+def read_appended(name: str, sources: List[str], current: Optional[pd.DataFrame] = None,
+                  **csv_kwargs) -> Optional[Appended]:
+    """Get the rows appended to the sources since the snapshot of a dataset.
+
+    Returns None when a full load is needed: no usable snapshot, no appended
+    rows, or any change other than rows added at the end of a CSV.
+    `current` is the DataFrame in memory; it is reused instead of reading the
+    snapshot when it was loaded from that same snapshot.
+    """
+    if not settings.INCREMENTAL_RELOAD_ENABLED or not snapshots_enabled():
+        return None
+
+    info = read_snapshot_info(name, sources)
+    if info is None or len(info["sources"]) != len(sources):
+        return None
+
+    stored = info["sources"]
+    layout = []
+    tails: List[Optional[pd.DataFrame]] = []
+
+    for entry, path in zip(stored, sources):
+        if entry.get("file") != os.path.basename(path):
+            return None
+        size = os.path.getsize(path) if os.path.exists(path) else None
+        new_entry = dict(entry)
+        tail = None
+
+        if size == entry.get("size"):
+            # Mismo tamano: tiene que ser el mismo contenido
+            if (size is not None and os.stat(path).st_mtime_ns != entry.get("mtime_ns")
+                    and file_hash(path) != entry.get("sha256")):
+                return None
+        elif (size is not None and entry.get("size") is not None and size > entry["size"]
+              and path.endswith(".csv") and "dtypes" in entry):
+            read = _read_tail(path, entry)
+            if read is None:
+                return None
+            tail_bytes, new_entry["sha256"] = read
+            # Tamano del contenido leido, aunque el archivo siga creciendo
+            new_entry["size"] = entry["size"] + len(tail_bytes)
+
+            # Sin encabezado: puede ocupar mas de una linea
+            tail = _parse(io.BytesIO(tail_bytes), entry, csv_kwargs, header=False)
+            if tail is None:
+                return None
+
+            first_valid = dict(entry["first_valid"])
+            for col, row in _first_valid(tail, entry["rows"]).items():
+                first_valid.setdefault(col, row)
+            new_entry["rows"] = entry["rows"] + len(tail)
+            new_entry["first_valid"] = first_valid
+        else:
+            return None
+
+        tails.append(tail)
+        layout.append({k: v for k, v in new_entry.items() if k not in ("file", "mtime_ns")})
+
+    if not any(tail is not None for tail in tails):
+        return None
+
+    rows = [entry.get("rows", 0) for entry in stored]
+
+    # Contexto: hasta la fila del primer valor mas tardio entre las columnas de texto
+    firsts: Dict[str, tuple] = {}
+    for i, entry in enumerate(stored):
+        for col, row in entry.get("first_valid", {}).items():
+            firsts.setdefault(col, (i, row))
+
+    head_rows = [0] * len(sources)
+    if firsts:
+        last_source, last_row = max(firsts.values())
+        head_rows = [
+            rows[i] if i < last_source else (min(last_row + 1, rows[i]) if i == last_source else 0)
+            for i in range(len(sources))
+        ]
+        if sum(head_rows) > CONTEXT_MAX_ROWS:
+            return None
+
+    heads: List[Optional[pd.DataFrame]] = []
+    for path, entry, nrows in zip(sources, stored, head_rows):
+        if not nrows:
+            heads.append(None)
+            continue
+        head = _parse(path, entry, csv_kwargs, nrows=nrows)
+        if head is None:
+            return None
+        heads.append(head)
+
+    token = info.get("token")
+    if current is not None and token is not None and snapshot_token(current) == token:
+        previous, from_current = current, True
+    else:
+        previous, from_current = read_snapshot_frame(name, sources), False
+    if previous is None or len(previous) != sum(rows):
+        return None
+
+    return Appended(previous, from_current, rows, heads, tails, layout)
+
+
+def apply_appended(name: str, sources: List[str], appended: Appended, current: Optional[pd.DataFrame],
+                   normalize: Callable[[List[Optional[pd.DataFrame]]], pd.DataFrame],
+                   id_column: Optional[str] = None) -> pd.DataFrame:
+    """Splice the appended rows, write the new snapshot and extend the indexes of `current`."""
+    df = appended.splice(normalize, id_column)
+    df = write_snapshot(name, sources, df, appended.layout)
+
+    # Indices y agregados del DataFrame anterior: solo se agregan las filas nuevas
+    if current is not None and appended.from_current and appended.at_end:
+        extend_cached(current, df)
+
+    print(f"Appended {appended.new_rows} records to {name}: {len(df)} records")
+    return df
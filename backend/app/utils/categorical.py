@@ -0,0 +1,88 @@
+"""
+Utilidades para columnas categoricas (dictionary-encoded).
+
+Las columnas de baja cardinalidad (zona, comuna, inspector, etc.) se guardan
+como `category`: los filtros se evaluan sobre las categorias distintas y se
+aplican a las filas via codigos enteros, en vez de recorrer millones de
+strings Python por request.
+"""
+from typing import Any, Callable, List
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_object_dtype, is_string_dtype
+
+
+def _is_categorical(series: pd.Series) -> bool:
+    return isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def to_categorical(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Convert the given text columns (if present) to categorical dtype."""
+    for col in columns:
+        if col not in df.columns or _is_categorical(df[col]):
+            continue
+        if is_object_dtype(df[col]) or is_string_dtype(df[col]):
+            df[col] = df[col].astype('category')
+    return df
+
+
+def map_distinct(series: pd.Series, func: Callable[[Any], Any]) -> pd.Series:
+    """`series.apply(func)` evaluated once per distinct value and broadcast back by code."""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    mapped = np.empty(len(uniques), dtype=object)
+    mapped[:] = [func(value) for value in uniques]
+    return pd.Series(mapped[codes], index=series.index)
+
+
+def match_equals(series: pd.Series, value: str) -> pd.Series:
+    """Case-insensitive equality mask, evaluated per category when possible."""
+    if _is_categorical(series):
+        categories = series.cat.categories
+        return series.isin(categories[categories.str.upper() == value.upper()])
+    return series.str.upper() == value.upper()
+
+
+def match_contains(series: pd.Series, pattern: str) -> pd.Series:
+    """Case-insensitive `str.contains` mask, evaluated per category when possible."""
+    if _is_categorical(series):
+        categories = series.cat.categories
+        return series.isin(categories[categories.str.contains(pattern, case=False, na=False)])
+    return series.str.contains(pattern, case=False, na=False)
+
+
+def count_values(series: pd.Series) -> pd.Series:
+    """`value_counts` without the unobserved categories of a categorical column.
+
+    Categorical columns are counted on their integer codes, which keeps ties in
+    order of first appearance, same as `value_counts` on plain strings.
+    """
+    if not _is_categorical(series):
+        return series.value_counts()
+
+    codes = pd.Series(series.cat.codes, index=series.index)
+    counts = codes[codes >= 0].value_counts()
+    index = pd.Index(series.cat.categories[counts.index.to_numpy()], name=series.name)
+    return pd.Series(counts.to_numpy(), index=index, name='count')
+
+
+def concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """`pd.concat` that keeps categorical columns categorical.
+
+    The categories are unified first and only the integer codes are recoded,
+    giving the same sorted categories as converting the whole column.
+    """
+    frames = [frame.copy(deep=False) for frame in frames]
+    columns = {col for frame in frames for col in frame.columns if _is_categorical(frame[col])}
+
+    for col in columns:
+        values = [
+            frame[col].cat.categories if _is_categorical(frame[col]) else pd.Index(frame[col].dropna().unique())
+            for frame in frames if col in frame.columns
+        ]
+        dtype = pd.CategoricalDtype(values[0].append(values[1:]).unique().sort_values())
+        for frame in frames:
+            if col in frame.columns:
+                frame[col] = frame[col].astype(dtype)
+
+    return pd.concat(frames, ignore_index=True)
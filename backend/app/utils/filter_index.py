@@ -0,0 +1,165 @@
+"""
+Indices bitmap para los filtros de igualdad (zona, comuna, base, mes, anio...).
+
+Por cada valor distinto de una columna filtrable se guarda el conjunto de
+filas que lo tienen: como posiciones ordenadas si el valor es poco frecuente,
+o como bits empaquetados si es frecuente (la representacion mas chica, igual
+que un roaring bitmap). Un request con filtros intersecta esos conjuntos
+partiendo del mas chico, en vez de comparar columnas completas.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from .frame_cache import get_cached
+
+# Sobre 1 fila de cada 32 un bitset (n/8 bytes) ocupa menos que las posiciones (4 bytes c/u)
+DENSE_RATIO = 32
+
+
+class Bitmap:
+    """Row set of one value: sorted positions when sparse, packed bits when dense."""
+
+    __slots__ = ("size", "count", "rows", "bits")
+
+    def __init__(self, rows: np.ndarray, size: int):
+        self.size = size
+        self.count = len(rows)
+        self.rows = None
+        self.bits = None
+        if self.count * DENSE_RATIO > size:
+            dense = np.zeros(size, dtype=bool)
+            dense[rows] = True
+            self.bits = np.packbits(dense)
+        else:
+            self.rows = rows.astype(np.int32)
+
+    def positions(self) -> np.ndarray:
+        if self.rows is not None:
+            return self.rows
+        return np.flatnonzero(np.unpackbits(self.bits, count=self.size))
+
+    def contains(self, positions: np.ndarray) -> np.ndarray:
+        """Boolean mask of which of the given positions belong to the set."""
+        if self.bits is not None:
+            return ((self.bits[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+        idx = np.searchsorted(self.rows, positions)
+        idx[idx == len(self.rows)] = 0
+        return self.rows[idx] == positions if len(self.rows) else np.zeros(len(positions), dtype=bool)
+
+
+class FilterIndex:
+    """One bitmap per distinct value of each filterable column."""
+
+    def __init__(self, df: pd.DataFrame, columns: List[str]):
+        self.size = len(df)
+        self.columns = columns
+        self.bitmaps: Dict[str, Dict[Any, Bitmap]] = {}
+        self.text_columns = set()
+
+        for col in columns:
+            if col not in df.columns:
+                continue
+            series = df[col]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                codes = series.cat.codes.to_numpy()
+                uniques = pd.Index(series.cat.categories)
+            else:
+                codes, uniques = pd.factorize(series)
+                uniques = pd.Index(uniques)
+
+            # Texto: igualdad sin mayusculas/minusculas, igual que match_equals
+            if not is_numeric_dtype(uniques.dtype):
+                self.text_columns.add(col)
+                keys, key_index = pd.factorize(uniques.astype(str).str.upper())
+            else:
+                keys, key_index = np.arange(len(uniques)), uniques
+
+            rows = np.flatnonzero(codes >= 0)
+            key_codes = np.asarray(keys)[codes[rows]]
+            order = np.argsort(key_codes, kind='stable')
+            bounds = np.concatenate([[0], np.cumsum(np.bincount(key_codes, minlength=len(key_index)))])
+            rows = rows[order]
+
+            self.bitmaps[col] = {
+                key: Bitmap(rows[bounds[i]:bounds[i + 1]], self.size)
+                for i, key in enumerate(key_index.tolist())
+            }
+
+    def extend(self, df: pd.DataFrame) -> "FilterIndex":
+        """Index of `df`, whose first rows are the ones this index was built from.
+
+        Only the appended rows are grouped; each bitmap gets their positions added.
+        """
+        start = self.size
+        appended = FilterIndex(df.iloc[start:], self.columns)
+
+        index = FilterIndex.__new__(FilterIndex)
+        index.size = len(df)
+        index.columns = self.columns
+        index.text_columns = self.text_columns | appended.text_columns
+        index.bitmaps = {}
+
+        empty = np.array([], dtype=np.int32)
+        for col, new_bitmaps in appended.bitmaps.items():
+            old_bitmaps = self.bitmaps.get(col, {})
+            index.bitmaps[col] = {
+                key: Bitmap(np.concatenate([
+                    old_bitmaps[key].positions() if key in old_bitmaps else empty,
+                    new_bitmaps[key].positions() + start if key in new_bitmaps else empty,
+                ]), index.size)
+                for key in {**old_bitmaps, **new_bitmaps}
+            }
+        return index
+
+    def _lookup(self, col: str, value: Any) -> Optional[Bitmap]:
+        key = str(value).upper() if col in self.text_columns else value
+        return self.bitmaps[col].get(key)
+
+    def positions(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Sorted row positions matching every filter (None if no filter applies).
+
+        Filters with an empty value or on a column the dataset doesn't have
+        are ignored, like the `if value and col in df.columns` checks they replace.
+        """
+        bitmaps = []
+        for col, value in filters.items():
+            if not value or col not in self.bitmaps:
+                continue
+            bitmap = self._lookup(col, value)
+            if bitmap is None:
+                return np.array([], dtype=np.int32)
+            bitmaps.append(bitmap)
+
+        if not bitmaps:
+            return None
+
+        bitmaps.sort(key=lambda b: b.count)
+        result = bitmaps[0].positions()
+        for bitmap in bitmaps[1:]:
+            if len(result) == 0:
+                break
+            result = result[bitmap.contains(result)]
+        return result
+
+    def mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Boolean row mask for the given equality filters."""
+        positions = self.positions(filters)
+        if positions is None:
+            return np.ones(self.size, dtype=bool)
+        mask = np.zeros(self.size, dtype=bool)
+        mask[positions] = True
+        return mask
+
+
+def get_filter_index(df: pd.DataFrame, columns: List[str]) -> FilterIndex:
+    """Get the filter index of a DataFrame over the given columns (built on first use)."""
+    return get_cached(df, "filter:" + ",".join(columns), lambda frame: FilterIndex(frame, columns))
+
+
+def filter_mask(df: pd.DataFrame, columns: List[str], filters: Dict[str, Any]) -> pd.Series:
+    """Row mask of `df` for equality filters on indexed columns, to combine with other conditions."""
+    return pd.Series(get_filter_index(df, columns).mask(filters), index=df.index)
@@ -0,0 +1,82 @@
+"""
+Cache de estructuras derivadas de un DataFrame.
+
+Los indices (busqueda, filtros, etc.) se construyen una vez por DataFrame y se
+guardan mientras ese DataFrame siga vivo. Cuando el registro recarga un
+dataset el DataFrame nuevo es otro objeto, asi que sus indices se vuelven a
+construir (o se extienden, si solo se agregaron filas al final); los del
+anterior se liberan junto con el.
+"""
+
+import secrets
+import threading
+import weakref
+from typing import Any, Callable, Dict
+
+import pandas as pd
+
+_entries: Dict[int, Dict[str, Any]] = {}
+_locks: Dict[int, threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def _forget(key: int) -> None:
+    with _lock:
+        entry = _entries.pop(key, None)
+        _locks.pop(key, None)
+    # Las estructuras se liberan fuera del lock: si alguna es un DataFrame con
+    # sus propias entradas, su finalizador vuelve a llamar a `_forget`
+    del entry
+
+
+def _entry(df: pd.DataFrame):
+    key = id(df)
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None:
+            entry = _entries[key] = {}
+            _locks[key] = threading.Lock()
+            # Se elimina al liberar el DataFrame, antes de que su id se pueda reutilizar
+            weakref.finalize(df, _forget, key)
+        return entry, _locks[key]
+
+
+def get_cached(df: pd.DataFrame, name: str, builder: Callable[[pd.DataFrame], Any]) -> Any:
+    """Get a structure derived from `df`, building it on first use."""
+    entry, lock = _entry(df)
+    value = entry.get(name)
+    if value is not None:
+        return value
+
+    with lock:
+        value = entry.get(name)
+        if value is None:
+            value = entry[name] = builder(df)
+        return value
+
+
+def peek_cached(df: pd.DataFrame, name: str) -> Any:
+    """Get a structure derived from `df` if it was already built (None otherwise)."""
+    with _lock:
+        entry = _entries.get(id(df))
+        return entry.get(name) if entry is not None else None
+
+
+def frame_token(df: pd.DataFrame) -> str:
+    """Random id of a DataFrame object: a reloaded frame, or one in another process, gets another."""
+    # Aleatorio y no un contador: un contador se repite despues de reiniciar el proceso
+    return get_cached(df, "token", lambda frame: secrets.token_hex(8))
+
+
+def extend_cached(old: pd.DataFrame, new: pd.DataFrame) -> None:
+    """Carry over to `new` the structures of `old` that can be extended with appended rows.
+
+    `new` must start with the rows of `old`. Structures without an `extend`
+    method are left out and get built again on first use.
+    """
+    with _lock:
+        entries = dict(_entries.get(id(old), {}))
+
+    for name, value in entries.items():
+        if hasattr(value, "extend"):
+            get_cached(new, name, value.extend)
@@ -0,0 +1,32 @@
+"""
+Metricas agrupadas por una columna (inspector, contratista, etc.).
+
+Reemplaza los loops que filtraban el DataFrame completo por cada valor y
+volvian a recorrer strings por grupo: las condiciones se evaluan una vez sobre
+todas las filas y se suman por grupo en un solo groupby.
+"""
+
+from typing import Dict, Optional
+
+import pandas as pd
+
+
+def group_metrics(df: pd.DataFrame, key: str, sums: Optional[Dict[str, pd.Series]] = None) -> pd.DataFrame:
+    """Rows per value of `key` ('cantidad') plus the per-group sum of each series in `sums`.
+
+    Ordered like `count_values` (most frequent first, ties in order of first
+    appearance). Missing and blank keys are left out.
+    """
+    values = pd.DataFrame(sums or {}, index=df.index)
+    grouped = values.groupby(df[key], observed=True, sort=False)
+
+    result = grouped.sum()
+    result.insert(0, 'cantidad', grouped.size())
+
+    result = result[result.index.astype(str).str.strip() != '']
+    return result.sort_values('cantidad', ascending=False, kind='stable')
+
+
+def rate(part: int, total: int) -> float:
+    """Percentage rounded to one decimal (0 when there is no total)."""
+    return round((part / total * 100), 1) if total > 0 else 0
@@ -0,0 +1,68 @@
+"""
+Clasificador de texto por listas de patrones.
+
+Cada regla es una etiqueta con sus patrones (subcadenas, sin distinguir
+mayusculas). Todas las reglas se compilan en una sola expresion regular: una
+alternativa por regla, en orden de prioridad, cada una con un lookahead y un
+grupo con nombre. Asi una columna completa se clasifica en una pasada
+vectorizada (`str.extract`) y gana la primera regla que coincide, igual que
+recorrer las reglas en orden.
+"""
+
+import json
+import re
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class PatternClassifier:
+    """Assign to each text the label of the first rule with a matching pattern."""
+
+    def __init__(self, rules: List[Tuple[str, List[str]]], default: Optional[str] = None):
+        self.labels = [label for label, _ in rules]
+        self.default = default
+
+        alternatives = []
+        for i, (_, patterns) in enumerate(rules):
+            if not patterns:
+                continue
+            options = "|".join(re.escape(p.lower()) for p in patterns)
+            alternatives.append(f"(?=.*?(?:{options}))(?P<r{i}>)")
+        self.regex = re.compile("^(?:" + "|".join(alternatives) + ")", re.DOTALL) if alternatives else None
+
+    @property
+    def categories(self) -> List[str]:
+        return self.labels + ([self.default] if self.default and self.default not in self.labels else [])
+
+    def classify(self, texts: pd.Series) -> pd.Series:
+        """Label every text as a categorical Series.
+
+        Texts with no matching rule get the default label, and empty or missing
+        texts stay missing.
+        """
+        lowered = texts.astype(object).where(texts.notna(), '').astype(str).str.lower()
+        codes = np.full(len(lowered), -1, dtype=np.int64)
+
+        if self.regex is not None:
+            groups = lowered.str.extract(self.regex)
+            # El grupo de la regla que coincidio captura '' y el resto queda NaN
+            matched = groups.notna().to_numpy()
+            rule_ids = np.array([int(name[1:]) for name in groups.columns])
+            has_match = matched.any(axis=1)
+            codes[has_match] = rule_ids[matched[has_match].argmax(axis=1)]
+
+        if self.default:
+            default_code = self.categories.index(self.default)
+            codes[(codes == -1) & (lowered.str.strip() != '').to_numpy()] = default_code
+
+        return pd.Series(pd.Categorical.from_codes(codes, categories=self.categories), index=texts.index)
+
+
+def load_classifier(path: str) -> PatternClassifier:
+    """Build a classifier from a JSON rules file ({"motivos": [{"motivo", "patrones"}], "sin_especificar"})."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    rules = [(rule["motivo"], rule.get("patrones", [])) for rule in config.get("motivos", [])]
+    return PatternClassifier(rules, config.get("sin_especificar"))
@@ -0,0 +1,33 @@
+"""
+Conversion de una pagina de filas a registros JSON.
+
+Reemplaza el loop que revisaba cada celda de `to_dict(orient='records')`
+(`isinstance(value, pd.Timestamp)` y `pd.isna(value)` por valor): las fechas
+se formatean y los nulos se cambian por None columna a columna, y los
+registros se arman desde las listas de valores de cada columna.
+"""
+
+from typing import Any, Dict, List
+
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+
+def _column_values(series: pd.Series, date_format: str) -> List[Any]:
+    """Python values of a column, with dates as strings and missing values as None."""
+    missing = series.isna().to_numpy()
+    if is_datetime64_any_dtype(series):
+        series = series.dt.strftime(date_format)
+    if not missing.any():
+        return series.tolist()
+    # Copia: en columnas object `to_numpy` puede devolver el arreglo del DataFrame
+    values = series.to_numpy(dtype=object, copy=True)
+    values[missing] = None
+    return values.tolist()
+
+
+def frame_records(df: pd.DataFrame, date_format: str = '%Y-%m-%d') -> List[Dict[str, Any]]:
+    """Rows of `df` as dicts, like `to_dict(orient='records')` with dates formatted and NaN as None."""
+    columns = [str(col) for col in df.columns]
+    values = [_column_values(df.iloc[:, i], date_format) for i in range(len(columns))]
+    return [dict(zip(columns, row)) for row in zip(*values)]
@@ -0,0 +1,162 @@
+"""
+Indice invertido para el parametro `search` de los listados.
+
+En vez de recorrer todas las filas con `str.contains` en cada request, se
+indexan los valores distintos de las columnas de busqueda por trigramas. Una
+busqueda intersecta las listas de sus trigramas, confirma los valores
+candidatos y devuelve las filas de esos valores. El costo depende de cuantos
+valores coinciden, no del largo del historico.
+"""
+
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from .frame_cache import get_cached
+
+NGRAM = 3
+
+
+def _ngrams(text: str) -> set:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+def _value_rows(series: pd.Series, value_ids: Dict[str, int], offset: int = 0):
+    """Value id and row position of each non-missing cell, adding new texts to `value_ids`."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    else:
+        codes, uniques = pd.factorize(series)
+
+    # Mismo texto que daba astype(str), en minusculas
+    texts = pd.Index(uniques).astype(str).str.lower()
+    ids = np.array([value_ids.setdefault(text, len(value_ids)) for text in texts], dtype=np.int64)
+
+    rows = np.flatnonzero(codes >= 0)
+    return ids[codes[rows]], rows + offset
+
+
+def _postings(texts: List[str], first_id: int = 0) -> Dict[str, list]:
+    postings: Dict[str, list] = {}
+    for value_id, text in enumerate(texts, first_id):
+        for gram in _ngrams(text):
+            postings.setdefault(gram, []).append(value_id)
+    return postings
+
+
+class SearchIndex:
+    """Trigram inverted index over the distinct values of some text columns."""
+
+    def __init__(self, df: pd.DataFrame, columns: List[str]):
+        self.size = len(df)
+        self.columns = columns
+
+        self.value_ids: Dict[str, int] = {}
+        pair_values = []
+        pair_rows = []
+
+        for col in columns:
+            if col not in df.columns:
+                continue
+            values, rows = _value_rows(df[col], self.value_ids)
+            pair_values.append(values)
+            pair_rows.append(rows)
+
+        self.texts = list(self.value_ids.keys())
+        self.values = pd.Series(self.texts, dtype=object)
+
+        # Filas de cada valor en formato CSR: rows[offsets[v]:offsets[v + 1]]
+        values = np.concatenate(pair_values) if pair_values else np.array([], dtype=np.int64)
+        rows = np.concatenate(pair_rows) if pair_rows else np.array([], dtype=np.int64)
+        order = np.argsort(values, kind='stable')
+        self.rows = rows[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(values, minlength=len(self.value_ids)))])
+
+        self.postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in _postings(self.texts).items()}
+
+    def extend(self, df: pd.DataFrame) -> "SearchIndex":
+        """Index of `df`, whose first rows are the ones this index was built from.
+
+        Only the appended rows are read and only their new values get trigrams;
+        the row lists of the existing values are copied, not rebuilt.
+        """
+        start = self.size
+        index = SearchIndex.__new__(SearchIndex)
+        index.size = len(df)
+        index.columns = self.columns
+        index.value_ids = dict(self.value_ids)
+
+        pair_values = []
+        pair_rows = []
+        for col in self.columns:
+            if col not in df.columns:
+                continue
+            values, rows = _value_rows(df[col].iloc[start:], index.value_ids, start)
+            pair_values.append(values)
+            pair_rows.append(rows)
+
+        new_texts = list(index.value_ids.keys())[len(self.texts):]
+        index.texts = self.texts + new_texts
+        index.values = pd.Series(index.texts, dtype=object)
+
+        # Filas de cada valor: las anteriores y a continuacion las agregadas
+        values = np.concatenate(pair_values) if pair_values else np.array([], dtype=np.int64)
+        rows = np.concatenate(pair_rows) if pair_rows else np.array([], dtype=np.int64)
+        old_counts = np.zeros(len(index.texts), dtype=np.int64)
+        old_counts[:len(self.texts)] = np.diff(self.offsets)
+        new_counts = np.bincount(values, minlength=len(index.texts))
+        index.offsets = np.concatenate([[0], np.cumsum(old_counts + new_counts)])
+
+        index.rows = np.empty(int(index.offsets[-1]), dtype=self.rows.dtype)
+        old_values = np.repeat(np.arange(len(self.texts)), old_counts[:len(self.texts)])
+        index.rows[index.offsets[old_values] + np.arange(len(self.rows)) - self.offsets[old_values]] = self.rows
+
+        order = np.argsort(values, kind='stable')
+        values = values[order]
+        group_starts = np.concatenate([[0], np.cumsum(new_counts)])[values]
+        index.rows[index.offsets[values] + old_counts[values] + np.arange(len(values)) - group_starts] = rows[order]
+
+        index.postings = dict(self.postings)
+        for gram, ids in _postings(new_texts, len(self.texts)).items():
+            ids = np.array(ids, dtype=np.int64)
+            index.postings[gram] = np.concatenate([self.postings[gram], ids]) if gram in self.postings else ids
+        return index
+
+    def _matching_values(self, query: str) -> np.ndarray:
+        if len(query) < NGRAM:
+            # Busquedas muy cortas: se revisan los valores distintos
+            return np.flatnonzero(self.values.str.contains(query, regex=False).to_numpy())
+
+        candidates = None
+        for gram in sorted(_ngrams(query), key=lambda g: len(self.postings.get(g, ()))):
+            ids = self.postings.get(gram)
+            if ids is None:
+                return np.array([], dtype=np.int64)
+            candidates = ids if candidates is None else np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                return candidates
+
+        # Los trigramas pueden coincidir en otro orden: confirmar la subcadena
+        return np.array([v for v in candidates if query in self.texts[v]], dtype=np.int64)
+
+    def search(self, query: str) -> np.ndarray:
+        """Get a boolean row mask of the rows where any column contains `query` (case-insensitive)."""
+        mask = np.zeros(self.size, dtype=bool)
+        matched = self._matching_values(query.lower())
+        if len(matched) == 0:
+            return mask
+
+        starts = self.offsets[matched]
+        lengths = self.offsets[matched + 1] - starts
+        total = int(lengths.sum())
+        # Posiciones de todas las filas de los valores encontrados, sin recorrer el resto
+        shift = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths)
+        mask[self.rows[shift + np.arange(total)]] = True
+        return mask
+
+
+def get_search_index(df: pd.DataFrame, columns: List[str]) -> SearchIndex:
+    """Get the search index of a DataFrame over the given columns (built on first use)."""
+    return get_cached(df, "search:" + ",".join(columns), lambda frame: SearchIndex(frame, columns))
@@ -0,0 +1,205 @@
+"""
+Snapshots columnares (Parquet) de los DataFrames ya normalizados.
+
+Cada loader guarda su DataFrame post-normalizacion en un archivo Parquet
+asociado a la firma (tamano, mtime y hash) de sus archivos fuente. En los
+siguientes inicios se lee el snapshot en vez de volver a parsear el CSV y
+repetir toda la limpieza.
+"""
+import hashlib
+import json
+import os
+from typing import Optional, List, Dict, Any
+
+import pandas as pd
+
+from ..core.config import settings
+from .frame_cache import get_cached, peek_cached
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow es opcional
+    pa = None
+    pq = None
+
+# Incrementar cuando cambie la normalizacion de algun loader para invalidar
+# los snapshots existentes.
+SNAPSHOT_VERSION = 5
+
+_METADATA_KEY = b"dcat_snapshot"
+
+
+def snapshots_enabled() -> bool:
+    """Return True when snapshots are enabled and pyarrow is available."""
+    return settings.SNAPSHOT_ENABLED and pq is not None
+
+
+def get_snapshot_path(name: str, sources: List[str]) -> str:
+    """Get the snapshot file path for a dataset."""
+    snapshot_dir = settings.SNAPSHOT_DIR
+    if not snapshot_dir:
+        base_dir = os.path.dirname(sources[0]) if sources else settings.DATA_DIR
+        snapshot_dir = os.path.join(base_dir, ".snapshots")
+    return os.path.join(snapshot_dir, f"{name}.parquet")
+
+
+def file_hash(path: str) -> str:
+    """Get the sha256 of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _source_stat(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {"file": os.path.basename(path), "size": None, "mtime_ns": None}
+    stat = os.stat(path)
+    return {"file": os.path.basename(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _sources_match(stored: List[Dict[str, Any]], sources: List[str]) -> bool:
+    if len(stored) != len(sources):
+        return False
+
+    for entry, path in zip(stored, sources):
+        current = _source_stat(path)
+        if entry.get("file") != current["file"] or entry.get("size") != current["size"]:
+            return False
+        if entry.get("mtime_ns") == current["mtime_ns"]:
+            continue
+        # Mismo tamano pero distinto mtime (archivo copiado o tocado): comparar contenido
+        if current["size"] is None or entry.get("sha256") != file_hash(path):
+            return False
+
+    return True
+
+
+def _token(source_info: List[Dict[str, Any]]) -> str:
+    return hashlib.sha256(json.dumps(source_info, sort_keys=True).encode()).hexdigest()
+
+
+def snapshot_token(df: pd.DataFrame) -> Optional[str]:
+    """Get the id of the snapshot a DataFrame was read from or written to (None if neither)."""
+    return peek_cached(df, "snapshot")
+
+
+def _remember(df: pd.DataFrame, token: str) -> None:
+    get_cached(df, "snapshot", lambda frame: token)
+
+
+def read_snapshot_info(name: str, sources: List[str]) -> Optional[Dict[str, Any]]:
+    """Get the metadata of a dataset snapshot (stored sources and token), valid or not."""
+    if not snapshots_enabled():
+        return None
+
+    path = get_snapshot_path(name, sources)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+        info = json.loads(metadata.get(_METADATA_KEY, b"{}"))
+    except Exception as e:
+        print(f"Snapshot {name} could not be read: {e}")
+        return None
+
+    if info.get("version") != SNAPSHOT_VERSION:
+        return None
+    info.setdefault("sources", [])
+    info["token"] = _token(info["sources"])
+    return info
+
+
+def read_snapshot_frame(name: str, sources: List[str]) -> Optional[pd.DataFrame]:
+    """Read the data of a dataset snapshot, without checking its sources."""
+    try:
+        return pq.read_table(get_snapshot_path(name, sources)).to_pandas()
+    except Exception as e:
+        print(f"Snapshot {name} could not be read: {e}")
+        return None
+
+
+def read_snapshot(name: str, sources: List[str]) -> Optional[pd.DataFrame]:
+    """Load a dataset snapshot if it is still valid for the given sources."""
+    info = read_snapshot_info(name, sources)
+    if info is None or not _sources_match(info["sources"], sources):
+        return None
+
+    df = read_snapshot_frame(name, sources)
+    if df is None:
+        return None
+
+    _remember(df, info["token"])
+    print(f"Loaded snapshot {name}: {len(df)} records")
+    return df
+
+
+def coerce_mixed_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert object columns with mixed types to text so Arrow can store them."""
+    mixed_cols = []
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            mixed_cols.append(col)
+
+    if not mixed_cols:
+        return df
+
+    df = df.copy()
+    for col in mixed_cols:
+        df[col] = df[col].map(lambda v: v if isinstance(v, str) or pd.isna(v) else str(v))
+    return df
+
+
+def write_snapshot(name: str, sources: List[str], df: pd.DataFrame,
+                   layout: Optional[List[Dict[str, Any]]] = None) -> pd.DataFrame:
+    """
+    Write a dataset snapshot and return the DataFrame as it was stored.
+
+    Columnas object con tipos mezclados se guardan como texto; el DataFrame
+    retornado incluye esa conversion para que una carga en frio y una carga
+    desde snapshot entreguen exactamente los mismos datos.
+
+    `layout` agrega informacion por archivo fuente (filas, tipos de columna)
+    que usa la recarga incremental (ver `append_ingest`).
+    """
+    if not snapshots_enabled():
+        return df
+
+    path = get_snapshot_path(name, sources)
+    tmp_path = f"{path}.tmp"
+
+    try:
+        df = coerce_mixed_columns(df)
+
+        source_info = []
+        for i, source in enumerate(sources):
+            entry = _source_stat(source)
+            if layout and i < len(layout):
+                entry.update(layout[i])
+            if "sha256" not in entry:
+                entry["sha256"] = file_hash(source) if entry["size"] is not None else None
+            source_info.append(entry)
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_METADATA_KEY] = json.dumps({
+            "version": SNAPSHOT_VERSION,
+            "sources": source_info,
+        }).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+        _remember(df, _token(source_info))
+    except Exception as e:
+        print(f"Snapshot {name} could not be written: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return df
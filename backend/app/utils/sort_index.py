@@ -0,0 +1,126 @@
+"""
+Ordenes precalculados para paginar los listados.
+
+Por cada columna ordenable (y direccion) se guarda la permutacion de filas que
+deja el DataFrame ordenado (orden estable, nulos al final, como `sort_values`).
+Una pagina se obtiene recorriendo esa permutacion con la mascara de filtros:
+sin copiar las filas filtradas ni volver a ordenarlas, y copiando solo las
+filas de la pagina.
+
+Ademas de `page`, los listados aceptan un cursor (`next_cursor` de la pagina
+anterior) con la posicion de la ultima fila entregada dentro del orden, para
+pedir la pagina siguiente sin calcular un offset. El cursor lleva ademas un
+token del DataFrame que lo genero: despues de una recarga (aunque tenga las
+mismas filas) el cursor ya no aplica.
+"""
+
+import base64
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .frame_cache import frame_token, get_cached
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed or belongs to another sort order or data version."""
+
+
+class SortOrder:
+    """Row positions of a DataFrame ordered by one column."""
+
+    def __init__(self, df: pd.DataFrame, column: str, ascending: bool):
+        self.size = len(df)
+        ordered = df[column].reset_index(drop=True).sort_values(
+            ascending=ascending, kind='stable', na_position='last'
+        )
+        dtype = np.int32 if self.size < 2 ** 31 else np.int64
+        self.positions = ordered.index.to_numpy().astype(dtype)
+
+
+def get_sort_order(df: pd.DataFrame, column: str, ascending: bool) -> SortOrder:
+    """Get the sort order of a DataFrame by a column (built on first use)."""
+    key = f"sort:{column}:{'asc' if ascending else 'desc'}"
+    return get_cached(df, key, lambda frame: SortOrder(frame, column, ascending))
+
+
+def warm_sort_orders(df: pd.DataFrame, columns: List[str], ascending: bool = False) -> None:
+    """Build the sort orders of the given columns ahead of the first request."""
+    for column in columns:
+        if column in df.columns:
+            get_sort_order(df, column, ascending)
+
+
+def warm_on_change(registry: Any, name: str, columns: List[str], ascending: bool = False) -> None:
+    """Build the sort orders of a registry dataset every time it gets a new version."""
+    def warm(changed: str) -> None:
+        df = registry.current(changed) if changed == name else None
+        if df is not None:
+            warm_sort_orders(df, columns, ascending)
+
+    registry.on_change(warm)
+
+
+def _encode_cursor(sort_by: str, order: str, rank: int, token: str) -> str:
+    raw = f"{sort_by}|{order}|{rank}|{token}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, sort_by: str, order: str, token: str, size: int) -> int:
+    """Rank of the last row of the previous page (InvalidCursor if the cursor doesn't apply)."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        cursor_sort, cursor_order, rank, cursor_token = raw.rsplit("|", 3)
+        rank = int(rank)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Cursor invalido")
+    # El cursor es de otro orden o de otra version de los datos
+    if (cursor_sort, cursor_order, cursor_token) != (sort_by, order, token) or not 0 <= rank < size:
+        raise InvalidCursor("Cursor invalido o expirado, vuelva a la primera pagina")
+    return rank
+
+
+class Page:
+    """Positions of the rows of one page plus the paging info of the response."""
+
+    def __init__(self, positions: np.ndarray, total: int, page: int, pages: int, next_cursor: Optional[str]):
+        self.positions = positions
+        self.total = total
+        self.page = page
+        self.pages = pages
+        self.next_cursor = next_cursor
+
+
+def paginate(df: pd.DataFrame, mask: pd.Series, sort_by: str, order: str, page: int, limit: int,
+             cursor: Optional[str] = None) -> Page:
+    """Rows of the requested page of `df[mask]` sorted by `sort_by`.
+
+    Without a sortable `sort_by` the rows keep their order in `df`. With a
+    `cursor` the page starts after the row it points to and `page` is ignored.
+    """
+    ascending = order == "asc"
+    size = len(df)
+    if sort_by in df.columns:
+        ordered = get_sort_order(df, sort_by, ascending).positions
+    else:
+        ordered = np.arange(size)
+
+    # Posiciones dentro del orden de las filas que pasan los filtros
+    ranks = np.flatnonzero(np.asarray(mask, dtype=bool)[ordered])
+    total = len(ranks)
+    pages = (total + limit - 1) // limit
+
+    if cursor:
+        rank = _decode_cursor(cursor, sort_by, order, frame_token(df), size)
+        start = int(np.searchsorted(ranks, rank, side='right'))
+        page = start // limit + 1
+    else:
+        start = (page - 1) * limit
+
+    page_ranks = ranks[start:start + limit]
+    next_cursor = None
+    if start + limit < total:
+        next_cursor = _encode_cursor(sort_by, order, int(page_ranks[-1]), frame_token(df))
+
+    return Page(ordered[page_ranks], total, page, pages, next_cursor)
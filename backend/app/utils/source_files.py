@@ -0,0 +1,33 @@
+"""
+Lectura de los archivos fuente de cada modulo.
+
+`utils/ingest_excel.py` genera un Parquet tipado con el mismo nombre que el CSV
+de cada modulo. Si existe, los servicios lo leen en lugar del CSV: mismas
+columnas, pero sin volver a parsear todo el texto.
+"""
+
+import os
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+def resolve_source(csv_path: str) -> str:
+    """Get the Parquet version of a source CSV if it exists, else the CSV path."""
+    if PARQUET_AVAILABLE:
+        parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+        if os.path.exists(parquet_path):
+            return parquet_path
+    return csv_path
+
+
+def read_source(path: str, **csv_kwargs) -> pd.DataFrame:
+    """Read a source file, either Parquet or CSV (with the given read_csv options)."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, **csv_kwargs)
@@ -0,0 +1,38 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+
+@pytest.fixture
+def no_background(monkeypatch):
+    """App lifespan without the dataset prewarm and the file watcher."""
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "PREWARM_ENABLED", False)
+    monkeypatch.setattr(settings, "DATA_WATCH_ENABLED", False)
+
+
+@pytest.fixture
+def client(no_background):
+    """TestClient running the app lifespan."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Authorization header of the admin user."""
+    from app.core.config import settings
+
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/auth/login",
+        json={"email": "admin@ocaglobal.com", "password": "admin123"},
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
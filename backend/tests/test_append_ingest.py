@@ -0,0 +1,69 @@
+import csv
+import os
+
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.services import calidad_service
+from app.services.dataset_registry import registry
+from app.utils.filter_index import FilterIndex, get_filter_index
+from app.utils.search_index import SearchIndex, get_search_index
+from app.utils.snapshot import snapshots_enabled
+
+SOURCE = os.path.join(os.path.dirname(__file__), "..", "..", "data", calidad_service.CALIDAD_FILENAMES["calidad_mono"])
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists(SOURCE) or not snapshots_enabled(), reason="sin CSV de calidad o sin pyarrow",
+)
+
+
+def _write(path, header, records):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(records)
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(tmp_path / ".snapshots"))
+    monkeypatch.setattr(settings, "INCREMENTAL_RELOAD_ENABLED", True)
+    return tmp_path
+
+
+def test_appended_rows_load_like_a_full_load(data_dir, capsys):
+    with open(SOURCE, encoding="utf-8", newline="") as f:
+        header, *records = list(csv.reader(f))
+    path = data_dir / calidad_service.CALIDAD_FILENAMES["calidad_mono"]
+    name = "calidad_mono"
+
+    _write(path, header, records[:60])
+    before = registry.reload(name)
+    filters = get_filter_index(before, calidad_service.FILTER_COLUMNS)
+    search = get_search_index(before, calidad_service.SEARCH_COLUMNS)
+
+    _write(path, header, records)
+    capsys.readouterr()
+    incremental = registry.reload(name)
+    assert "Appended" in capsys.readouterr().out
+
+    # Carga completa del mismo archivo, sin snapshot
+    for file in os.listdir(settings.SNAPSHOT_DIR):
+        os.remove(os.path.join(settings.SNAPSHOT_DIR, file))
+    full = registry.reload(name)
+
+    pd.testing.assert_frame_equal(incremental, full)
+
+    # Los indices del DataFrame anterior se extendieron con las filas nuevas
+    extended_filters = get_filter_index(incremental, calidad_service.FILTER_COLUMNS)
+    extended_search = get_search_index(incremental, calidad_service.SEARCH_COLUMNS)
+    assert extended_filters is not filters and extended_search is not search
+    new_filters = FilterIndex(full, calidad_service.FILTER_COLUMNS)
+    new_search = SearchIndex(full, calidad_service.SEARCH_COLUMNS)
+    for comuna in full["comuna"].dropna().unique()[:5]:
+        query = {"comuna": comuna}
+        assert (extended_filters.mask(query) == new_filters.mask(query)).all()
+    for query in ("san", "la", "12"):
+        assert (extended_search.search(query) == new_search.search(query)).all()
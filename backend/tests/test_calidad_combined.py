@@ -0,0 +1,96 @@
+import threading
+
+import pandas as pd
+
+from app.core.config import settings
+from app.services import calidad_service
+from app.services.dataset_registry import registry
+
+
+def _base(tipo: str, rows: int, offset: int = 0) -> pd.DataFrame:
+    return pd.DataFrame({
+        "cliente": [f"{tipo}-{offset + i}" for i in range(rows)],
+        "tipo_sistema": tipo,
+        "comuna": "SANTIAGO",
+    })
+
+
+def _expected(mono: pd.DataFrame, tri: pd.DataFrame) -> list:
+    return pd.concat([mono, tri], ignore_index=True)["cliente"].tolist()
+
+
+def test_combined_follows_mono_and_tri_versions():
+    mono, tri = _base("MONOFASICO", 5), _base("TRIFASICO", 3)
+    registry.replace("calidad_mono", mono)
+    registry.replace("calidad_tri", tri)
+
+    df = calidad_service.load_all_calidad_data()
+    assert df["cliente"].tolist() == _expected(mono, tri)
+    assert df["id"].tolist() == list(range(1, 9))
+    assert isinstance(df["tipo_sistema"].dtype, pd.CategoricalDtype)
+    # Mientras mono y tri no cambian se reutiliza la misma combinacion
+    assert calidad_service.load_all_calidad_data() is df
+
+    tri = _base("TRIFASICO", 4, offset=10)
+    registry.replace("calidad_tri", tri)
+    df = calidad_service.load_all_calidad_data()
+    assert df["cliente"].tolist() == _expected(mono, tri)
+
+
+def test_concurrent_reads_never_see_a_stale_combination():
+    mono = _base("MONOFASICO", 5)
+    registry.replace("calidad_mono", mono)
+    registry.replace("calidad_tri", _base("TRIFASICO", 1))
+    # Largo de cada combinacion valida: 5 filas de mono mas las de una version de tri
+    valid = {5 + rows for rows in range(1, 41)}
+    stop = threading.Event()
+    errors = []
+
+    def reader():
+        while not stop.is_set():
+            length = len(calidad_service.load_all_calidad_data())
+            if length not in valid:
+                errors.append(length)
+
+    threads = [threading.Thread(target=reader) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for rows in range(2, 41):
+            tri = _base("TRIFASICO", rows)
+            registry.replace("calidad_tri", tri)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(10)
+
+    assert not errors
+    assert calidad_service.load_all_calidad_data()["cliente"].tolist() == _expected(mono, tri)
+
+
+def test_stats_from_before_the_rebuild_are_not_served_after_it(client, auth_headers, monkeypatch):
+    url = f"{settings.API_V1_PREFIX}/calidad/stats"
+    for name in ("calidad_mono", "calidad_tri", "inspecciones_mono", "inspecciones_tri"):
+        registry.reload(name)
+    mono = registry.current("calidad_mono")
+    window = {}
+
+    # Corre despues de subir la version de mono y antes de rehacer la combinacion
+    def probe(name):
+        if name == "calidad_mono":
+            window["stats"] = calidad_service.get_calidad_stats()
+            window["etag"] = client.get(url, headers=auth_headers).headers["ETag"]
+
+    registry._listeners.insert(0, probe)
+    try:
+        registry.replace("calidad_mono", mono.iloc[:len(mono) // 2].reset_index(drop=True))
+    finally:
+        registry._listeners.remove(probe)
+
+    stats = calidad_service.get_calidad_stats()
+    assert stats != window["stats"]
+    monkeypatch.setattr(settings, "STATS_CACHE_ENABLED", False)
+    assert stats == calidad_service.get_calidad_stats()
+
+    response = client.get(url, headers={**auth_headers, "If-None-Match": window["etag"]})
+    assert response.status_code == 200
@@ -0,0 +1,48 @@
+import gzip
+
+import pytest
+
+from app.api import compression
+
+# La spec OpenAPI pasa del tamano minimo, la raiz no
+LARGE_URL = "/openapi.json"
+SMALL_URL = "/"
+
+
+def test_large_response_uses_brotli_when_accepted(client):
+    if compression.brotli is None:
+        pytest.skip("brotli no instalado")
+
+    response = client.get(LARGE_URL, headers={"Accept-Encoding": "gzip, br"})
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "br"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert response.json()["openapi"]
+
+
+def test_large_response_falls_back_to_gzip(client, monkeypatch):
+    response = client.get(LARGE_URL, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json()["openapi"]
+
+    # Sin el paquete brotli se usa gzip aunque el cliente acepte br
+    monkeypatch.setattr(compression, "brotli", None)
+    response = client.get(LARGE_URL, headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+
+
+def test_small_or_unaccepted_responses_are_not_compressed(client):
+    response = client.get(SMALL_URL, headers={"Accept-Encoding": "gzip, br"})
+    assert "Content-Encoding" not in response.headers
+
+    response = client.get(LARGE_URL, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.json()["openapi"]
+
+
+def test_gzip_body_matches_the_plain_body(client):
+    plain = client.get(LARGE_URL, headers={"Accept-Encoding": "identity"}).content
+    # Sin decodificar en el cliente: el cuerpo tal como sale del middleware
+    with client.stream("GET", LARGE_URL, headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+    assert gzip.decompress(raw) == plain
@@ -0,0 +1,50 @@
+import pandas as pd
+
+from app.api.v1 import dashboard
+from app.core.config import settings
+from app.services.dataset_registry import Dataset, registry
+
+from test_lecturas_evolucion import _lecturas_frame
+
+SUMMARY_URL = f"{settings.API_V1_PREFIX}/dashboard/summary"
+
+
+def _without_sources(monkeypatch, tmp_path, name):
+    dataset = registry._datasets[name]
+    monkeypatch.setattr(dataset, "loader", lambda: pd.DataFrame())
+    monkeypatch.setattr(dataset, "sources", lambda: [str(tmp_path / f"{name}.csv")])
+    monkeypatch.setattr(dataset, "state", None)
+
+
+def test_summary_is_cached_with_datasets_missing(client, auth_headers, monkeypatch, tmp_path):
+    for name in dashboard.SUMMARY_DATASETS:
+        if name != "lecturas":
+            _without_sources(monkeypatch, tmp_path, name)
+    # Un dataset que no lee ningun resumen, sin cargar
+    monkeypatch.setitem(registry._datasets, "otro", Dataset("otro", lambda: pd.DataFrame(), lambda: ["x.csv"]))
+    registry.replace("lecturas", _lecturas_frame(1))
+
+    builds = []
+    build = dashboard._build_dashboard_summary
+
+    async def counting_build(pool):
+        builds.append(1)
+        return await build(pool)
+
+    monkeypatch.setattr(dashboard, "_build_dashboard_summary", counting_build)
+
+    response = client.get(SUMMARY_URL, headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(SUMMARY_URL, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    assert client.get(SUMMARY_URL, headers=auth_headers).headers["ETag"] == etag
+    assert len(builds) == 1
+
+    registry.replace("lecturas", _lecturas_frame(2))
+    response = client.get(SUMMARY_URL, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert len(builds) == 2
@@ -0,0 +1,46 @@
+from app.core.config import settings
+from app.services.dataset_registry import registry
+from app.services.result_cache import stats_cache
+
+from test_lecturas_evolucion import _lecturas_frame
+
+STATS_URL = f"{settings.API_V1_PREFIX}/lecturas/stats"
+
+
+def test_etag_answers_304_until_the_dataset_changes(client, auth_headers):
+    registry.replace("lecturas", _lecturas_frame(1))
+
+    response = client.get(STATS_URL, params={"origen": "", "sector": "ORIENTE"}, headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    # Mismo query sin el parametro vacio: misma ETag
+    response = client.get(f"{STATS_URL}?sector=ORIENTE", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    response = client.get(STATS_URL, params={"sector": "PONIENTE"}, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+
+    registry.replace("lecturas", _lecturas_frame(2))
+    response = client.get(f"{STATS_URL}?sector=ORIENTE", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_etag_changes_after_restart_with_other_data(client, auth_headers, monkeypatch):
+    dataset = registry._datasets["lecturas"]
+
+    # Despues de reiniciar el proceso la version vuelve a empezar en 1
+    monkeypatch.setattr(dataset, "version", 0)
+    registry.replace("lecturas", _lecturas_frame(1))
+    etag = client.get(STATS_URL, headers=auth_headers).headers["ETag"]
+
+    monkeypatch.setattr(dataset, "version", 0)
+    stats_cache.clear()
+    registry.replace("lecturas", _lecturas_frame(2))
+    assert registry.version("lecturas") == 1
+
+    response = client.get(STATS_URL, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
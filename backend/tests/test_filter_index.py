@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.filter_index import FilterIndex, filter_mask
+
+
+def _frame(rows: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    comuna = pd.Series(rng.choice(["Santiago", "SANTIAGO", "Maipu", "La Florida", None], rows))
+    return pd.DataFrame({
+        "comuna": comuna,
+        "zona": pd.Categorical(rng.choice(["NORTE", "norte", "SUR"], rows)),
+        "mes": rng.integers(1, 13, rows),
+        "anio": rng.choice([2024, 2025], rows),
+    })
+
+
+def _expected(df: pd.DataFrame, filters: dict) -> np.ndarray:
+    mask = pd.Series(True, index=df.index)
+    for col, value in filters.items():
+        if not value:
+            continue
+        if col in ("comuna", "zona"):
+            mask &= (df[col].astype(object).str.upper() == value.upper()).fillna(False)
+        else:
+            mask &= df[col] == value
+    return mask.to_numpy()
+
+
+FILTERS = [
+    {},
+    {"comuna": "santiago"},
+    {"comuna": "MAIPU", "mes": 3},
+    {"zona": "Norte", "anio": 2025},
+    {"zona": "SUR", "comuna": "la florida", "mes": 12, "anio": 2024},
+    {"comuna": "no existe"},
+    {"comuna": "", "mes": None},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_mask_matches_pandas(filters):
+    df = _frame()
+    index = FilterIndex(df, ["comuna", "zona", "mes", "anio"])
+    assert (index.mask(filters) == _expected(df, filters)).all()
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_extended_index_matches_a_new_one(filters):
+    df = pd.concat([_frame(300, seed=1), _frame(200, seed=2)], ignore_index=True)
+    columns = ["comuna", "zona", "mes", "anio"]
+    extended = FilterIndex(df.iloc[:300], columns).extend(df)
+    assert (extended.mask(filters) == FilterIndex(df, columns).mask(filters)).all()
+
+
+def test_filter_mask_ignores_missing_columns():
+    df = _frame()
+    mask = filter_mask(df, ["comuna", "sector"], {"comuna": "Maipu", "sector": "ORIENTE"})
+    assert mask.index.equals(df.index)
+    assert (mask.to_numpy() == _expected(df, {"comuna": "Maipu"})).all()
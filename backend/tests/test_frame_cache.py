@@ -0,0 +1,65 @@
+import gc
+import threading
+
+import pandas as pd
+
+from app.utils.frame_cache import get_cached, peek_cached
+
+
+def _run_with_timeout(func, seconds=10):
+    """Run `func` in a thread; fail instead of hanging if it deadlocks."""
+    errors = []
+
+    def target():
+        try:
+            func()
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(seconds)
+    assert not thread.is_alive(), "deadlock"
+    assert not errors, errors
+
+
+def test_builds_once_per_frame():
+    df = pd.DataFrame({"a": [1, 2, 3]})
+    calls = []
+
+    def build(frame):
+        calls.append(1)
+        return frame["a"].sum()
+
+    assert get_cached(df, "sum", build) == 6
+    assert get_cached(df, "sum", build) == 6
+    assert len(calls) == 1
+    assert peek_cached(df, "sum") == 6
+    assert peek_cached(pd.DataFrame(), "sum") is None
+
+
+def test_nested_cached_frames_are_released_without_deadlock():
+    def scenario():
+        df = pd.DataFrame({"a": range(10)})
+        # Estructura derivada que es a su vez un DataFrame con entradas propias
+        derived = get_cached(df, "derived", lambda frame: frame[frame["a"] > 3].reset_index(drop=True))
+        get_cached(derived, "inner", lambda frame: len(frame))
+        del derived
+        # Liberar el DataFrame original libera tambien el derivado
+        del df
+        gc.collect()
+
+    _run_with_timeout(scenario)
+
+
+def test_reload_with_nested_cached_frames():
+    def scenario():
+        for _ in range(3):
+            df = pd.DataFrame({"a": range(100)})
+            derived = get_cached(df, "derived", lambda frame: frame.groupby(frame["a"] % 5).size().reset_index())
+            get_cached(derived, "inner", lambda frame: frame.sum())
+            # "Recarga": el DataFrame anterior deja de estar referenciado
+            del df, derived
+            gc.collect()
+
+    _run_with_timeout(scenario)
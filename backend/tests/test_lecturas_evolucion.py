@@ -0,0 +1,71 @@
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import lecturas_service
+from app.services.dataset_registry import registry
+
+from test_frame_cache import _run_with_timeout
+
+
+def _lecturas_frame(seed: int, rows: int = 400) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    ingreso = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 120 * 24, rows), unit="h")
+    inspeccion = pd.Series(ingreso + pd.to_timedelta(rng.integers(0, 10, rows), unit="D"))
+    df = pd.DataFrame({
+        "id": range(1, rows + 1),
+        "fecha_ingreso": ingreso,
+        "fecha_inspeccion": inspeccion.where(rng.random(rows) > 0.3),
+        "sector": rng.choice(["ORIENTE", "PONIENTE"], rows),
+        "origen": rng.choice(["ORDENES", "SEC", "VISITA VIRTUAL"], rows),
+    })
+    df["mes"] = df["fecha_ingreso"].dt.month
+    df["anio"] = df["fecha_ingreso"].dt.year
+    return df
+
+
+def _expected(df, sector=None, origen=None, mes=None, dias=30):
+    mask = pd.Series(True, index=df.index)
+    if sector:
+        mask &= df["sector"].str.upper() == sector.upper()
+    if origen:
+        mask &= df["origen"].str.upper() == origen.upper()
+    if mes:
+        mask &= df["mes"] == mes
+    filtered = df[mask]
+    daily = filtered.groupby(filtered["fecha_ingreso"].dt.normalize()).agg(
+        total=("id", "size"), inspeccionadas=("fecha_inspeccion", "count")
+    ).tail(dias)
+    return [
+        {"dia": dia.strftime("%Y-%m-%d"), "total": int(row["total"]), "inspeccionadas": int(row["inspeccionadas"])}
+        for dia, row in daily.iterrows()
+    ]
+
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"sector": "oriente"},
+    {"origen": "SEC", "mes": 2},
+    {"sector": "PONIENTE", "origen": "ordenes"},
+])
+def test_evolucion_matches_pandas(filters):
+    df = _lecturas_frame(1)
+    registry.replace("lecturas", df)
+    for dias in (7, 30, 365):
+        assert lecturas_service.get_lecturas_evolucion(dias=dias, **filters) == _expected(df, dias=dias, **filters)
+
+
+def test_replace_after_stats_does_not_hang():
+    def scenario():
+        for seed in range(3):
+            df = _lecturas_frame(seed)
+            registry.replace("lecturas", df)
+            lecturas_service.get_lecturas_stats()
+            assert lecturas_service.get_lecturas_evolucion(sector="ORIENTE") == _expected(df, sector="ORIENTE")
+            del df
+        registry.replace("lecturas", _lecturas_frame(99))
+        gc.collect()
+
+    _run_with_timeout(scenario)
@@ -0,0 +1,39 @@
+from app.core.config import settings
+from app.services import lecturas_service
+from app.services.dataset_registry import registry
+from app.services.result_cache import ResultCache
+
+from test_lecturas_evolucion import _lecturas_frame
+
+
+def _uncached(monkeypatch, **filters):
+    monkeypatch.setattr(settings, "STATS_CACHE_ENABLED", False)
+    try:
+        return lecturas_service.get_lecturas_stats(**filters)
+    finally:
+        monkeypatch.setattr(settings, "STATS_CACHE_ENABLED", True)
+
+
+def test_cached_stats_match_uncached_and_follow_versions(monkeypatch):
+    registry.replace("lecturas", _lecturas_frame(1))
+    first = lecturas_service.get_lecturas_stats(sector="ORIENTE")
+    assert first == _uncached(monkeypatch, sector="ORIENTE")
+    # Mismo resultado para un filtro vacio que para None
+    assert lecturas_service.get_lecturas_stats(sector="ORIENTE", origen="") is first
+
+    registry.replace("lecturas", _lecturas_frame(2))
+    second = lecturas_service.get_lecturas_stats(sector="ORIENTE")
+    assert second is not first
+    assert second == _uncached(monkeypatch, sector="ORIENTE")
+
+
+def test_result_cache_is_bounded_and_invalidated_per_dataset():
+    cache = ResultCache(max_bytes=2000)
+    for i in range(20):
+        cache.put(("m", i), list(range(50)), ("a",) if i % 2 else ("b",))
+    assert cache.bytes <= 2000
+    assert cache.get(("m", 0)) is None and cache.get(("m", 19)) == list(range(50))
+
+    cache.invalidate("a")
+    assert cache.get(("m", 19)) is None
+    assert cache.get(("m", 18)) == list(range(50))
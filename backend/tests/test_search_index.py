@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.search_index import SearchIndex
+
+NOMBRES = ["Juan Perez", "MARIA GONZALEZ", "Jose Munoz", "Ana Maria Rojas", "Pedro Diaz", None]
+COMUNAS = ["Santiago", "San Miguel", "Las Condes", "Maipu", None]
+
+
+def _frame(rows: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "nombre": rng.choice(NOMBRES, rows),
+        "comuna": pd.Categorical(rng.choice(COMUNAS, rows)),
+        "cliente": rng.integers(1000, 1100, rows),
+    })
+
+
+def _expected(df: pd.DataFrame, columns: list, query: str) -> np.ndarray:
+    mask = pd.Series(False, index=df.index)
+    for col in columns:
+        mask |= df[col].astype(str).str.contains(query, case=False, regex=False) & df[col].notna()
+    return mask.to_numpy()
+
+
+QUERIES = ["san", "MARIA", "ma", "a", "ez", "10", "1050", "no existe", "maria gon", "s m"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_str_contains(query):
+    df = _frame()
+    columns = ["nombre", "comuna", "cliente"]
+    assert (SearchIndex(df, columns).search(query) == _expected(df, columns, query)).all()
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_extended_index_matches_a_new_one(query):
+    df = pd.concat([_frame(250, seed=1), _frame(150, seed=2)], ignore_index=True)
+    columns = ["nombre", "comuna", "cliente"]
+    extended = SearchIndex(df.iloc[:250], columns).extend(df)
+    assert (extended.search(query) == _expected(df, columns, query)).all()
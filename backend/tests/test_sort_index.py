@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services import lecturas_service
+from app.services.dataset_registry import registry
+from app.utils.sort_index import InvalidCursor, paginate
+
+from test_lecturas_evolucion import _lecturas_frame
+
+
+def _frame(seed: int, rows: int = 200) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    valor = pd.Series(rng.integers(0, 20, rows), dtype="float64")
+    return pd.DataFrame({
+        "id": range(rows),
+        "valor": valor.where(rng.random(rows) > 0.1),
+        "grupo": rng.choice(["A", "B", "C"], rows),
+    })
+
+
+@pytest.mark.parametrize("sort_by,order", [("valor", "asc"), ("valor", "desc"), ("grupo", "asc"), ("otra", "desc")])
+def test_pages_match_sort_values(sort_by, order):
+    df = _frame(0)
+    mask = df["grupo"] != "B"
+    filtered = df[mask]
+    if sort_by in df.columns:
+        filtered = filtered.sort_values(sort_by, ascending=order == "asc", kind="stable", na_position="last")
+    expected = filtered["id"].tolist()
+
+    first = paginate(df, mask, sort_by, order, 1, 25)
+    assert first.total == len(expected) and first.pages == (len(expected) + 24) // 25
+
+    offset_ids, cursor_ids = [], []
+    for page in range(1, first.pages + 1):
+        offset_ids += df["id"].to_numpy()[paginate(df, mask, sort_by, order, page, 25).positions].tolist()
+
+    result = first
+    while True:
+        cursor_ids += df["id"].to_numpy()[result.positions].tolist()
+        if not result.next_cursor:
+            break
+        result = paginate(df, mask, sort_by, order, 1, 25, result.next_cursor)
+
+    assert offset_ids == expected
+    assert cursor_ids == expected
+    assert result.page == first.pages
+
+
+def test_cursor_rejected_after_same_size_reload():
+    df = _frame(0)
+    mask = pd.Series(True, index=df.index)
+    cursor = paginate(df, mask, "valor", "desc", 1, 10).next_cursor
+    assert paginate(df, mask, "valor", "desc", 1, 10, cursor).page == 2
+
+    reloaded = _frame(1)
+    assert len(reloaded) == len(df)
+    with pytest.raises(InvalidCursor):
+        paginate(reloaded, mask, "valor", "desc", 1, 10, cursor)
+    with pytest.raises(InvalidCursor):
+        paginate(df, mask, "valor", "asc", 1, 10, cursor)
+    with pytest.raises(InvalidCursor):
+        paginate(df, mask, "valor", "desc", 1, 10, "no-es-un-cursor")
+
+
+def test_cursor_rejected_after_restart():
+    # Cursor de otro proceso sobre los mismos datos, como despues de reiniciar el servidor
+    code = (
+        "import pandas as pd; from test_sort_index import _frame; from app.utils.sort_index import paginate; "
+        "df = _frame(0); print(paginate(df, pd.Series(True, index=df.index), 'valor', 'desc', 1, 10).next_cursor)"
+    )
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([tests_dir, os.path.dirname(tests_dir)])}
+    cursor = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True,
+                            check=True).stdout.strip()
+
+    df = _frame(0)
+    with pytest.raises(InvalidCursor):
+        paginate(df, pd.Series(True, index=df.index), "valor", "desc", 1, 10, cursor)
+
+
+def test_service_cursor_expires_when_dataset_is_replaced():
+    registry.replace("lecturas", _lecturas_frame(1))
+    first = lecturas_service.get_lecturas_filtered_data(limit=20)
+    second = lecturas_service.get_lecturas_filtered_data(limit=20, cursor=first["next_cursor"])
+    assert second["page"] == 2
+
+    registry.replace("lecturas", _lecturas_frame(2))
+    with pytest.raises(InvalidCursor):
+        lecturas_service.get_lecturas_filtered_data(limit=20, cursor=first["next_cursor"])
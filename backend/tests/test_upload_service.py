@@ -0,0 +1,81 @@
+import os
+
+import pandas as pd
+import pytest
+
+from app.core.config import settings
+from app.services import data_service, upload_service
+from app.services.data_watcher import data_watcher, get_signature
+from app.services.dataset_registry import registry
+from app.utils.snapshot import read_snapshot_info
+from app.utils.source_files import PARQUET_AVAILABLE
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", False)
+    return tmp_path
+
+
+def _upload(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"cliente": [str(i) for i in range(rows)], "valor": range(rows)})
+
+
+def test_upload_replaces_the_csv_the_loader_reads(data_dir):
+    csv_path = data_dir / data_service.NNCC_FILENAME
+    _upload(1).to_csv(csv_path, index=False)
+
+    df_raw = _upload(3)
+    before = registry.version("nncc")
+    version = upload_service._swap_dataset(df_raw)
+
+    # Una sola version nueva: caches, ETags y cursores se invalidan una vez
+    assert version == registry.version("nncc") == before + 1
+    # Sin Parquet previo no se crea uno: un CSV dejado despues en data/ se sigue leyendo
+    assert not (data_dir / data_service.NNCC_FILENAME.replace(".csv", ".parquet")).exists()
+    assert data_service.get_source_files() == [str(csv_path)]
+    assert pd.read_csv(csv_path)["valor"].tolist() == [0, 1, 2]
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow no instalado")
+def test_upload_refreshes_an_existing_parquet_source(data_dir):
+    csv_path = data_dir / data_service.NNCC_FILENAME
+    parquet_path = os.path.splitext(csv_path)[0] + ".parquet"
+    _upload(1).to_csv(csv_path, index=False)
+    _upload(1).to_parquet(parquet_path, index=False)
+
+    df_raw = _upload(4)
+    upload_service._swap_dataset(df_raw)
+
+    assert data_service.get_source_files() == [parquet_path]
+    assert pd.read_parquet(parquet_path)["valor"].tolist() == [0, 1, 2, 3]
+
+
+def test_watcher_does_not_reload_the_upload(data_dir, monkeypatch):
+    csv_path = data_dir / data_service.NNCC_FILENAME
+    _upload(1).to_csv(csv_path, index=False)
+    # Mismo estado que deja `start`, sin el thread
+    monkeypatch.setattr(data_watcher, "_signatures", {
+        name: get_signature(registry.sources(name)) for name in registry.names()
+    })
+    monkeypatch.setattr(data_watcher, "_pending", {})
+
+    version = upload_service._swap_dataset(_upload(3))
+
+    assert "nncc" not in data_watcher.check_once()
+    assert "nncc" not in data_watcher.check_once()
+    assert registry.version("nncc") == version
+
+
+def test_upload_snapshot_keeps_the_source_layout(data_dir, monkeypatch):
+    monkeypatch.setattr(settings, "SNAPSHOT_ENABLED", True)
+    monkeypatch.setattr(settings, "SNAPSHOT_DIR", str(data_dir / ".snapshots"))
+    csv_path = data_dir / data_service.NNCC_FILENAME
+    _upload(1).to_csv(csv_path, index=False)
+
+    upload_service._swap_dataset(_upload(3))
+
+    info = read_snapshot_info("nncc", [str(csv_path)])
+    assert info is not None
+    assert "dtypes" in info["sources"][0]
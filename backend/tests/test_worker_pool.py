@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.services.worker_pool import WorkerPool
+
+
+def _login(client):
+    response = client.post(
+        f"{settings.API_V1_PREFIX}/auth/login",
+        json={"email": "admin@ocaglobal.com", "password": "admin123"},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["access_token"]
+
+
+def test_pool_works_across_lifespans(no_background):
+    for _ in range(2):
+        with TestClient(app) as client:
+            token = _login(client)
+            response = client.get(
+                f"{settings.API_V1_PREFIX}/dashboard/workers",
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            assert response.status_code == 200
+            assert response.json()["endpoints"]["auth.login"]["completed"] == 1
+
+
+def test_cancelled_call_keeps_its_slot_until_the_thread_finishes():
+    async def scenario():
+        pool = WorkerPool(max_workers=2, default_limit=1, limits={})
+        release = threading.Event()
+        try:
+            first = asyncio.create_task(pool.run("test.slow", release.wait))
+            await asyncio.sleep(0.05)
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+
+            # El thread sigue corriendo: la segunda llamada espera su turno
+            second = asyncio.create_task(pool.run("test.slow", lambda: "ok"))
+            await asyncio.sleep(0.05)
+            assert not second.done()
+            assert pool.info()["endpoints"]["test.slow"]["active"] == 1
+
+            release.set()
+            assert await asyncio.wait_for(second, 5) == "ok"
+            assert pool.info()["endpoints"]["test.slow"]["active"] == 0
+        finally:
+            release.set()
+            pool.shutdown()
+
+    asyncio.run(scenario())
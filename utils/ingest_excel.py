@@ -0,0 +1,240 @@
+"""
+Ingesta de las planillas Excel a Parquet.
+
+Reemplaza a los scripts informe_*_to_csv.py. Cada hoja se lee fila a fila con
+un workbook de solo lectura (openpyxl read_only) y se acumula por columnas en
+lotes Arrow, sin armar nunca un DataFrame completo ni pasar por texto CSV.
+El resultado es un .parquet tipado con el mismo nombre que el CSV que usaba
+el backend, que lo lee directamente y aplica los mismos mapeos de columnas.
+
+Uso:
+    python utils/ingest_excel.py all
+    python utils/ingest_excel.py nncc --excel "data/2025-05 INFORME NNCC (2024-2029) DIC 2025.xlsx"
+"""
+
+import argparse
+import os
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+# Rutas
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Filas por lote antes de convertirlas a columnas Arrow
+BATCH_SIZE = 50_000
+
+
+def safe_sheet_name(sheet_name):
+    """Limpiar el nombre de la hoja para usarlo como nombre de archivo."""
+    return sheet_name.replace("/", "-").replace("\\", "-").replace(":", "-")
+
+
+def unique_headers(header_row):
+    """Nombres de columna como los genera pandas (vacias -> Unnamed, duplicadas -> .1, .2)."""
+    headers = []
+    seen = {}
+    for i, value in enumerate(header_row):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        headers.append(name)
+    return headers
+
+
+def to_arrow(values):
+    """Convertir los valores de una columna a un array Arrow (texto si los tipos se mezclan)."""
+    try:
+        return pa.array(values, from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def common_type(types):
+    """Tipo comun de los lotes de una columna."""
+    types = [t for t in types if not pa.types.is_null(t)]
+    if not types:
+        return pa.null()
+    if all(t == types[0] for t in types):
+        return types[0]
+    if all(pa.types.is_integer(t) or pa.types.is_floating(t) for t in types):
+        return pa.float64()
+    if all(pa.types.is_timestamp(t) for t in types):
+        return pa.timestamp("us")
+    return pa.string()
+
+
+def cast_chunk(chunk, target):
+    if chunk.type == target:
+        return chunk
+    if pa.types.is_null(chunk.type):
+        return pa.nulls(len(chunk), type=target)
+    if pa.types.is_string(target):
+        # Mismo texto que escribia to_csv
+        return pa.array([None if v is None else str(v) for v in chunk.to_pylist()], type=pa.string())
+    return chunk.cast(target)
+
+
+def sheet_to_parquet(worksheet, output_path):
+    """Leer una hoja fila a fila y guardarla como Parquet. Retorna (filas, columnas)."""
+    rows = worksheet.iter_rows(values_only=True)
+
+    header_row = next(rows, None)
+    if header_row is None:
+        print("  Hoja vacia, se omite")
+        return 0, 0
+
+    headers = unique_headers(header_row)
+    # Eliminar columnas que empiezan con "Unnamed" (columnas vacias)
+    keep = [i for i, name in enumerate(headers) if not name.startswith("Unnamed")]
+    names = [headers[i] for i in keep]
+
+    chunks = {name: [] for name in names}
+    batch = []
+    total_rows = 0
+
+    def flush():
+        columns = list(zip(*batch)) if batch else [[] for _ in names]
+        for name, values in zip(names, columns):
+            chunks[name].append(to_arrow(list(values)))
+        batch.clear()
+
+    for row in rows:
+        values = [row[i] if i < len(row) else None for i in keep]
+        # Saltar filas completamente vacias
+        if all(v is None for v in values):
+            continue
+        batch.append(values)
+        total_rows += 1
+        if len(batch) >= BATCH_SIZE:
+            flush()
+    if batch or total_rows == 0:
+        flush()
+
+    arrays = []
+    for name in names:
+        target = common_type([chunk.type for chunk in chunks[name]])
+        arrays.append(pa.chunked_array([cast_chunk(chunk, target) for chunk in chunks[name]], type=target))
+    table = pa.Table.from_arrays(arrays, names=names)
+
+    # Escribir a un archivo temporal y reemplazar, para que el backend nunca lea un archivo a medias
+    tmp_path = f"{output_path}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, output_path)
+
+    return total_rows, len(names)
+
+
+def process_sheet(workbook, sheet_name, output_path):
+    print(f"\nProcesando hoja '{sheet_name}'...")
+    rows, columns = sheet_to_parquet(workbook[sheet_name], output_path)
+    print(f"  Filas: {rows}, columnas: {columns}")
+    print(f"  Parquet guardado en: {output_path}")
+
+
+def open_workbook(excel_path):
+    """Abrir un Excel en modo solo lectura (None si no existe)."""
+    if not Path(excel_path).exists():
+        print(f"  ERROR: Archivo no encontrado: {excel_path}")
+        return None
+    print(f"Leyendo archivo: {excel_path}")
+    return load_workbook(excel_path, read_only=True, data_only=True)
+
+
+def ingest_single_sheet(excel_path, sheet_name, output_name):
+    workbook = open_workbook(excel_path)
+    if workbook is None:
+        return
+    try:
+        process_sheet(workbook, sheet_name, DATA_DIR / output_name)
+    finally:
+        workbook.close()
+
+
+def ingest_nncc(excel_path=None):
+    excel_path = excel_path or DATA_DIR / "2025-05 INFORME NNCC (2024-2029) DIC 2025.xlsx"
+    ingest_single_sheet(excel_path, "BASE ACTUAL", "2025-05 INFORME NNCC (2024-2029) DIC 2025.parquet")
+
+
+def ingest_teleco(excel_path=None):
+    excel_path = excel_path or DATA_DIR / "CONTROL OPERACIONES TELCO.xlsx"
+    ingest_single_sheet(excel_path, "Base", "informe_teleco.parquet")
+
+
+def ingest_corte(excel_path=None):
+    excel_path = excel_path or DATA_DIR / "Consolidado Inspecciones Calidad Mayo 2024 - 2025 (Diego Bravo).xlsx"
+    ingest_single_sheet(excel_path, "Consolidado Calidad", "informe_corte.parquet")
+
+
+def ingest_lecturas(excel_path=None):
+    excel_path = excel_path or DATA_DIR / "Planilla Ordg 12 DICIEMBRE 2025 BASE ACT.xlsx"
+    workbook = open_workbook(excel_path)
+    if workbook is None:
+        return
+    try:
+        print(f"Hojas encontradas: {workbook.sheetnames}")
+        # Categoria -> texto que debe contener el nombre de la hoja
+        for category, key in [("SEC", "SEC"), ("ORDENES", "ORDEN"), ("VIRTUAL", "VIRTUAL")]:
+            for sheet_name in workbook.sheetnames:
+                if key in sheet_name.upper():
+                    output_path = DATA_DIR / f"informe_lectura_{category}_{safe_sheet_name(sheet_name)}.parquet"
+                    process_sheet(workbook, sheet_name, output_path)
+    finally:
+        workbook.close()
+
+
+def ingest_calidad():
+    files = [(DATA_DIR / "11_2025_calidad_mono.xlsx", "mono"), (DATA_DIR / "11_2025_calidad_tri.xlsx", "tri")]
+    for path, prefix in files:
+        workbook = open_workbook(path)
+        if workbook is None:
+            continue
+        try:
+            print(f"Hojas encontradas: {workbook.sheetnames}")
+            for sheet_name in workbook.sheetnames:
+                # Sheet1 suele ser la hoja por defecto, vacia
+                if sheet_name.lower() == "sheet1":
+                    print(f"\n  Saltando hoja '{sheet_name}' (hoja por defecto)")
+                    continue
+                output_path = DATA_DIR / f"informe_calidad_{prefix}_{safe_sheet_name(sheet_name).upper()}.parquet"
+                process_sheet(workbook, sheet_name, output_path)
+        finally:
+            workbook.close()
+
+
+INGESTORS = {
+    "nncc": ingest_nncc,
+    "lecturas": ingest_lecturas,
+    "teleco": ingest_teleco,
+    "calidad": ingest_calidad,
+    "corte": ingest_corte,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convertir las planillas Excel de cada modulo a Parquet")
+    parser.add_argument("modulo", choices=list(INGESTORS) + ["all"])
+    parser.add_argument("--excel", help="Ruta del Excel (solo para modulos con un unico archivo)")
+    args = parser.parse_args()
+
+    if args.modulo == "all":
+        for name, ingest in INGESTORS.items():
+            print(f"\n{'='*50}\n{name.upper()}\n{'='*50}")
+            ingest()
+    elif args.modulo == "calidad":
+        if args.excel:
+            parser.error("calidad usa dos archivos (mono y tri); no acepta --excel")
+        ingest_calidad()
+    else:
+        INGESTORS[args.modulo](args.excel)
+
+    print("\nProceso completado.")
+
+
+if __name__ == "__main__":
+    main()